@@ -0,0 +1,3 @@
+from .data import synthetic_candles
+from .context import stub_strategy, run_bars
+from .suite import Benchmark, BENCHMARKS, measure, compare
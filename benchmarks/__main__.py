@@ -0,0 +1,96 @@
+"""
+Benchmark suite for the custom indicators and the strategies' per-bar hot paths.
+
+    python -m benchmarks                                 # measure, compare with the baseline if there is one
+    python -m benchmarks --save                          # measure and store the results as the new baseline
+    python -m benchmarks --sizes 10k,1M,5M --filter vwap --threshold 0.1
+
+Histories are synthetic 1m candles. Whole-history benchmarks report candles per second;
+per-bar, streaming and strategy benchmarks run over the last --bars candles of each history
+and report bars per second. The exit status is 1 when any result regresses past the
+threshold against the baseline.
+
+Throughput depends on the machine, so no baseline is committed (benchmarks/baseline.json is
+git-ignored). CI measures both sides on the same runner: it checks out the target branch and
+runs `python -m benchmarks --save --baseline /tmp/baseline.json`. Then it checks out the
+change and runs `python -m benchmarks --baseline /tmp/baseline.json` with the same --sizes and
+--bars, which fails on a regression. Locally, `--save` once on the main branch gives the same
+comparison. Without a baseline file nothing is compared and a note says so.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+
+from .data import parse_size, synthetic_candles
+from .suite import BENCHMARKS, compare, measure, result_key
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark custom indicators and strategy hot paths')
+    parser.add_argument('--sizes', default='10k,100k,1M', help='comma separated history lengths, e.g. 10k,100k,1M,5M')
+    parser.add_argument('--bars', type=int, default=2_000, help='bars driven one at a time by per-bar benchmarks')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark, the best one counts')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='write the results into the baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative throughput drop')
+    parser.add_argument('--memory-threshold', type=float, default=None, help='allowed relative memory growth - default: --threshold')
+    args = parser.parse_args(argv)
+
+    baseline = _load(args.baseline)
+    if not baseline['results'] and not args.save:
+        print(f'no baseline at {args.baseline}: nothing to compare, run with --save on the reference commit first', file=sys.stderr)
+    benchmarks = [benchmark for benchmark in BENCHMARKS if args.filter.lower() in benchmark.name.lower()]
+    results = {}
+
+    print(f'{"benchmark":<48}{"bars/sec":>14}{"peak MiB":>10}{"allocs":>9}{"vs baseline":>13}')
+    for size in (parse_size(size) for size in args.sizes.split(',')):
+        candles = synthetic_candles(size, seed=args.seed)
+        for benchmark in benchmarks:
+            key = result_key(benchmark, size)
+            result = results[key] = measure(benchmark, candles, args.bars, args.repeat)
+            previous = baseline['results'].get(key)
+            change = f'{result["throughput"] / previous["throughput"] - 1:+.1%}' if previous else '-'
+            print(f'{key:<48}{result["throughput"]:>14,.0f}{result["peak_memory"] / 2 ** 20:>10.1f}{result["allocations"]:>9,}{change:>13}', flush=True)
+
+    regressions = compare(results, baseline['results'], args.threshold, args.memory_threshold)
+    for key, metric, before, after in regressions:
+        print(f'REGRESSION {key} {metric}: {before:,.0f} -> {after:,.0f}', file=sys.stderr)
+
+    if args.save:
+        baseline['results'].update(results)
+        baseline['environment'] = _environment()
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f'saved {len(results)} results to {args.baseline}')
+
+    return 1 if regressions else 0
+
+
+def _load(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'results': {}}
+
+
+def _environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system(),
+    }
+
+
+if __name__ == '__main__':
+    sys.exit(main())
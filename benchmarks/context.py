@@ -0,0 +1,148 @@
+from types import SimpleNamespace
+
+import numpy as np
+from jesse.exceptions import RouteNotFound
+
+
+def _last(column: int) -> property:
+    return property(lambda self: self.candles[-1, column])
+
+
+def _liquidate(self):
+    self.is_long = self.is_short = False
+    self.position.qty = 0
+    self.stop_loss = self.take_profit = None
+
+
+def _ignore(self, *args, **kwargs):
+    pass
+
+
+def _no_route(self, exchange: str, symbol: str, timeframe: str):
+    raise RouteNotFound(symbol, timeframe)
+
+
+# Shadow the parts of jesse's Strategy that go through the store, broker and chart state
+_OVERRIDES = {
+    'candles': None,
+    'hp': None,
+    'vars': None,
+    'index': 0,
+    'exchange': None,
+    'symbol': None,
+    'timeframe': None,
+    'fee_rate': 0.0,
+    'balance': 0.0,
+    'available_margin': 0.0,
+    'position': None,
+    'is_long': False,
+    'is_short': False,
+    'buy': None,
+    'sell': None,
+    'stop_loss': None,
+    'take_profit': None,
+    'price': _last(2),
+    'close': _last(2),
+    'open': _last(1),
+    'high': _last(3),
+    'low': _last(4),
+    'average_stop_loss': property(lambda self: self.stop_loss[1] if self.stop_loss else np.nan),
+    'get_candles': _no_route,
+    'liquidate': _liquidate,
+    'on_open_position': _ignore,
+    'on_close_position': _ignore,
+    'add_line_to_candle_chart': _ignore,
+    'add_extra_line_chart': _ignore,
+    'add_horizontal_line_to_candle_chart': _ignore,
+    'log': _ignore,
+}
+
+
+def stub_strategy(strategy_class, hyperparameters: dict = None, exchange: str = 'Binance Perpetual Futures',
+                  symbol: str = 'BTC-USDT', timeframe: str = '1m', balance: float = 10_000, fee_rate: float = 0.001):
+    """
+    Instance of a dynamic subclass of strategy_class that can run its decision methods without
+    jesse's store, broker or router. It is constructed like jesse constructs strategies, so the
+    strategy's own __init__ runs. Candles, price, hyperparameters and the position are plain
+    attributes set by the caller.
+    :param strategy_class: a jesse Strategy subclass
+    :param hyperparameters: dict - overrides of the hyperparameters() defaults
+    :return: the stub strategy
+    """
+    # whatever the strategy defines itself (e.g. Turtles' on_open_position) is kept
+    body = {name: value for name, value in _OVERRIDES.items() if name not in _defined_by_project(strategy_class)}
+    cls = type(f'Stub{strategy_class.__name__}', (strategy_class,), body)
+
+    strategy = cls()
+    defaults = {hp['name']: hp['default'] for hp in strategy.hyperparameters()}
+    strategy.__dict__.update(
+        hp={**defaults, **(hyperparameters or {})},
+        vars={},
+        exchange=exchange,
+        symbol=symbol,
+        timeframe=timeframe,
+        fee_rate=fee_rate,
+        balance=balance,
+        available_margin=balance,
+        position=SimpleNamespace(qty=0),
+        _cached_methods={},
+    )
+    return strategy
+
+
+def run_bars(strategy, candles: np.ndarray, first: int, last: int) -> int:
+    """
+    Drive the strategy over candles[first:last] one bar at a time, in the order jesse calls it:
+    before(), then update_position() for open positions or should_long()/should_short() and
+    go_long()/go_short() when flat, then after(). Stop-loss and take-profit are filled when a bar
+    touches them so positions keep cycling.
+    :return: int - number of bars processed
+    """
+    for t in range(first, last):
+        strategy.candles = candles[:t + 1]
+        strategy.index = t
+        strategy._cached_methods = {}
+
+        strategy.before()
+        if strategy.is_long or strategy.is_short:
+            _check_exits(strategy, candles[t])
+        if strategy.is_long or strategy.is_short:
+            strategy.update_position()
+        elif strategy.should_long():
+            strategy.go_long()
+            _open(strategy, strategy.buy, long=True)
+        elif strategy.should_short():
+            strategy.go_short()
+            _open(strategy, strategy.sell, long=False)
+        strategy.after()
+    return max(last - first, 0)
+
+
+def _open(strategy, order, long: bool) -> None:
+    if not order:
+        return
+    strategy.is_long, strategy.is_short = long, not long
+    strategy.position.qty = order[0]
+    strategy.buy = strategy.sell = None
+    strategy.on_open_position(order)
+
+
+def _check_exits(strategy, candle: np.ndarray) -> None:
+    stop = strategy.stop_loss[1] if strategy.stop_loss else None
+    target = strategy.take_profit[1] if strategy.take_profit else None
+    high, low = candle[3], candle[4]
+    if strategy.is_long:
+        hit = (stop is not None and low <= stop) or (target is not None and high >= target)
+    else:
+        hit = (stop is not None and high >= stop) or (target is not None and low <= target)
+    if hit:
+        strategy.liquidate()
+
+
+def _defined_by_project(strategy_class) -> set:
+    names = set()
+    for klass in strategy_class.__mro__:
+        if klass.__module__.split('.')[0] == 'jesse':
+            break
+        names.update(vars(klass))
+    return names
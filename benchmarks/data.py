@@ -0,0 +1,38 @@
+import numpy as np
+
+MINUTE_MS = 60_000
+DEFAULT_START = 1_609_459_200_000  # 2021-01-01 00:00 UTC
+
+
+def synthetic_candles(n: int, seed: int = 0, start: int = DEFAULT_START, price: float = 30_000.0) -> np.ndarray:
+    """
+    Reproducible 1m OHLCV history in jesse's column order. Prices follow a random walk with
+    slowly changing volatility and volume has an intraday cycle, so session-based indicators see
+    realistic day boundaries.
+    :param n: int - number of candles
+    :param seed: int - default: 0
+    :param start: int - timestamp of the first candle in milliseconds - default: 2021-01-01
+    :param price: float - first open - default: 30_000
+    :return: np.ndarray - (n, 6)
+    """
+    rng = np.random.default_rng(seed)
+    volatility = 0.0008 * np.exp(np.cumsum(rng.normal(0, 0.002, n)).clip(-1.5, 1.5))
+    close = price * np.exp(np.cumsum(rng.normal(0, 1, n) * volatility))
+    open_ = np.concatenate([[price], close[:-1]])
+    wick = np.abs(rng.normal(0, 1, (2, n))) * volatility * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+
+    minute_of_day = np.arange(n) % 1440
+    volume = rng.gamma(2.0, 5.0, n) * (1.5 + np.sin(minute_of_day / 1440 * 2 * np.pi))
+    timestamps = start + np.arange(n, dtype=np.float64) * MINUTE_MS
+    return np.column_stack([timestamps, open_, close, high, low, volume])
+
+
+def parse_size(size: str) -> int:
+    """
+    '10k' -> 10_000, '5M' -> 5_000_000, '2500' -> 2500
+    """
+    size = size.strip()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(size[-1].lower(), 1)
+    return int(float(size[:-1] if multiplier > 1 else size) * multiplier)
@@ -0,0 +1,171 @@
+import gc
+import importlib
+import time
+import tracemalloc
+from collections import namedtuple
+
+import custom_indicators as cta
+from custom_indicators import sessions
+from .context import run_bars, stub_strategy
+
+# prepare(candles, bars) does the untimed setup and returns a callable that runs the measured
+# work and returns the number of bars it processed
+Benchmark = namedtuple('Benchmark', ['name', 'mode', 'prepare'])
+
+# changes smaller than these are noise, whatever the relative threshold
+MIN_MEMORY_DELTA = 1 << 20
+MIN_ALLOCATION_DELTA = 1_000
+
+
+def _clear_caches() -> None:
+    cta.clear_caches()
+    sessions._cache.clear()
+
+
+def _whole_history(func, **params):
+    """
+    One call over the whole history
+    """
+    def prepare(candles, bars):
+        _clear_caches()
+
+        def run():
+            func(candles, **params)
+            return len(candles)
+        return run
+    return prepare
+
+
+def _per_bar(func, **params):
+    """
+    A sequential=False call for each of the last `bars` candles, the way a strategy reads it
+    """
+    def prepare(candles, bars):
+        _clear_caches()
+        first = max(len(candles) - bars, 1)
+
+        def run():
+            for t in range(first + 1, len(candles) + 1):
+                func(candles[:t], sequential=False, **params)
+            return len(candles) - first
+        return run
+    return prepare
+
+
+def _streaming(stream_class, history: int = 10_000, **params):
+    """
+    update() for each of the last `bars` candles after seeding on the preceding `history` ones
+    """
+    def prepare(candles, bars):
+        first = max(len(candles) - bars, 1)
+        stream = stream_class(**params)
+        stream.seed(candles[max(first - history, 0):first])
+
+        def run():
+            for candle in candles[first:]:
+                stream.update(candle)
+            return len(candles) - first
+        return run
+    return prepare
+
+
+def _strategy(module: str, class_name: str, hyperparameters: dict = None):
+    """
+    The strategy's decision methods for each of the last `bars` candles, through the stub context.
+    The first bar is run during setup so one-off stream seeding is not timed.
+    """
+    def prepare(candles, bars):
+        _clear_caches()
+        strategy_class = getattr(importlib.import_module(f'strategies.{module}'), class_name)
+        strategy = stub_strategy(strategy_class, hyperparameters)
+        first = max(len(candles) - bars, 1)
+        run_bars(strategy, candles, first - 1, first)
+        return lambda: run_bars(strategy, candles, first, len(candles))
+    return prepare
+
+
+BENCHMARKS = [
+    Benchmark('vwapbands', 'sequential', _whole_history(cta.vwapbands, sequential=True)),
+    Benchmark('vwapbands', 'per_bar', _per_bar(cta.vwapbands)),
+    Benchmark('vwapbands_week', 'sequential', _whole_history(cta.vwapbands, sequential=True, interval='Week')),
+    Benchmark('anchored_vwapbands', 'sequential', _whole_history(cta.anchored_vwapbands, sequential=True)),
+    Benchmark('anchored_vwapbands', 'per_bar', _per_bar(cta.anchored_vwapbands)),
+    Benchmark('donchian', 'sequential', _whole_history(cta.donchian, offset=1, sequential=True)),
+    Benchmark('donchian', 'per_bar', _per_bar(cta.donchian, offset=1)),
+    Benchmark('session_index', 'batch', _whole_history(cta.session_index)),
+    Benchmark('resample_candles_1h', 'batch', _whole_history(cta.resample_candles, timeframe='1h')),
+    Benchmark('VWAPBandsStream', 'streaming', _streaming(cta.VWAPBandsStream)),
+    Benchmark('SMAStream', 'streaming', _streaming(cta.SMAStream, period=52)),
+    Benchmark('ATRStream', 'streaming', _streaming(cta.ATRStream, period=14)),
+    Benchmark('MACDStream', 'streaming', _streaming(cta.MACDStream)),
+    Benchmark('SupertrendStream', 'streaming', _streaming(cta.SupertrendStream)),
+    Benchmark('DonchianStream', 'streaming', _streaming(cta.DonchianStream, offset=1)),
+    Benchmark('FirstStrategy', 'strategy', _strategy('FirstStrategy', 'FirstStrategy')),
+    Benchmark('MeaniePantsVwap', 'strategy', _strategy('MeaniePantsVwap', 'MeaniePantsVwap')),
+    Benchmark('VillianMovingAverages', 'strategy', _strategy('VillianMovingAverages', 'VillianMovingAverages')),
+    Benchmark('Turtles', 'strategy', _strategy('Turtles', 'Turtles')),
+    Benchmark('MACD_EMA', 'strategy', _strategy('MACDEMA', 'MACD_EMA')),
+]
+
+
+def measure(benchmark: Benchmark, candles, bars: int, repeat: int = 3) -> dict:
+    """
+    Best-of-`repeat` wall time, then one more run under tracemalloc for memory. Tracing slows
+    the code down, so it is kept out of the timed runs.
+    :return: dict - bars, seconds, throughput (bars/sec), peak_memory (bytes above the starting
+    point) and allocations (memory blocks still held after the run)
+    """
+    best = float('inf')
+    processed = 0
+    for _ in range(repeat):
+        run = benchmark.prepare(candles, bars)
+        gc.collect()
+        start = time.perf_counter()
+        processed = run()
+        best = min(best, time.perf_counter() - start)
+
+    run = benchmark.prepare(candles, bars)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'bars': int(processed),
+        'seconds': best,
+        'throughput': processed / best if best > 0 else float('inf'),
+        'peak_memory': peak - baseline,
+        'allocations': sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'lineno')),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.2, memory_threshold: float = None) -> list:
+    """
+    Regressions of results against a baseline, both keyed by result_key()
+    :param threshold: float - allowed relative drop in throughput - default: 0.2
+    :param memory_threshold: float - allowed relative growth in peak memory and allocations - default: threshold
+    :return: list of (key, metric, baseline value, current value)
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current['throughput'] < previous['throughput'] * (1 - threshold):
+            regressions.append((key, 'throughput', previous['throughput'], current['throughput']))
+        for metric, slack in (('peak_memory', MIN_MEMORY_DELTA), ('allocations', MIN_ALLOCATION_DELTA)):
+            if current[metric] > previous[metric] * (1 + memory_threshold) + slack:
+                regressions.append((key, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def result_key(benchmark: Benchmark, size: int) -> str:
+    return f'{benchmark.name}/{benchmark.mode}/{size}'
@@ -1 +1,10 @@
-from .vwapbands import vwapbands
\ No newline at end of file
+from .vwapbands import vwapbands
+from .anchored_vwap import anchored_vwapbands, AnchoredVWAPBands
+from .donchian import donchian
+from .sessions import session_index
+from .streaming import StreamMixin, VWAPBandsStream, SMAStream, EMAStream, ATRStream, MACDStream, SupertrendStream, DonchianStream, ResampledStream, resample_candles, TradeAggregator, replay_trades
+from .cache import indicator_cache, cache_stats, clear_caches
+from .shared_cache import RedisBackend, set_shared_cache, get_shared_cache
+from .profiling import ProfilingMixin, Profiler, instrument
+from .charts import ChartMixin, ChartPoints, ChartRecorder, decimate_minmax
+from .snapshots import SnapshotMixin
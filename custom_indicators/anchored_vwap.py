@@ -0,0 +1,131 @@
+from collections import namedtuple
+import numpy as np
+from jesse.helpers import get_candle_source
+
+from .sessions import DAY_MS, session_ids_from_days, session_start
+from .vwapbands import _bands
+
+AnchoredVWAPBands = namedtuple('AnchoredVWAPBands', ['anchor', 'vwap', 'dev', 'upper_bands', 'lower_bands'])
+
+INTERVALS = ('Day', 'Week', 'Month')
+
+
+def anchored_vwapbands(candles: np.ndarray, anchors: list = ('Day', 'Week', 'Month'), dev_multipliers: list = [1, 2, 3, 4, 5],
+                       source_type: str = "ohlc4", sequential: bool = False, dtype=np.float64) -> dict:
+    """
+    VWAP with Standard Deviation Bands for several anchors at once. Each anchor is either an
+    interval ('Day', 'Week', 'Month') that resets at every session, a timestamp (e.g. a swing
+    low) the VWAP runs from, or a list of timestamps it resets at. All anchors are read from
+    one set of price * volume, price ** 2 * volume and volume prefix sums; an anchor's sums are
+    the difference of the prefix sums at the bar and at its segment start. Bars before a
+    timestamp anchor are NaN.
+    :param candles: np.ndarray
+    :param anchors: list of intervals, timestamps (ms) or lists of timestamps - default: ('Day', 'Week', 'Month')
+    :param dev_multipliers: list of deviation multipliers for bands
+    :param source_type: str - default: ohlc4
+    :param sequential: bool - default: False. When False only the candles since the earliest
+        current segment start are read
+    :param dtype: dtype of the returned values, e.g. np.float32; sums are always float64 - default: np.float64
+    :return: dict - AnchoredVWAPBands per anchor, keyed by the anchor (lists become tuples).
+        Bands are one (k, n) array per side, or (k,) when not sequential
+    """
+    keys = [tuple(anchor) if isinstance(anchor, (list, tuple, np.ndarray)) else anchor for anchor in anchors]
+    for key in keys:
+        if isinstance(key, str) and key not in INTERVALS:
+            raise ValueError(f"Invalid anchor {key!r}. Choose 'Day', 'Week', 'Month', a timestamp or a list of timestamps.")
+
+    timestamps = candles[:, 0]
+    n = len(candles)
+    if sequential:
+        first = 0
+        starts = _segment_starts(timestamps, keys)
+    else:
+        # The last values only depend on the current segment of each anchor: binary search the
+        # segment starts and compute over the tail from the earliest one
+        last_starts = [_last_segment_start(timestamps, key) for key in keys]
+        first = min((start for start in last_starts if start >= 0), default=n)
+        starts = [np.array([start - first if start >= 0 else -1]) for start in last_starts]
+        candles = candles[first:]
+
+    source = get_candle_source(candles, source_type)
+    volume = candles[:, 5]
+    # Prices are centred on a reference so price ** 2 sums over a long history do not swamp
+    # the variance of a short segment
+    reference = np.median(source) if len(source) else 0.0
+    centred = source - reference
+
+    prefix_volume = _prefix_sum(volume)
+    prefix_pv = _prefix_sum(centred * volume)
+    prefix_p2v = _prefix_sum(centred * centred * volume)
+
+    ends = np.arange(1, len(candles) + 1) if sequential else np.array([len(candles)])
+    multipliers = np.asarray(dev_multipliers, dtype=np.float64)
+
+    result = {}
+    for key, start in zip(keys, starts):
+        before = start < 0
+        start = np.where(before, 0, start)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            segment_volume = prefix_volume[ends] - prefix_volume[start]
+            mean = (prefix_pv[ends] - prefix_pv[start]) / segment_volume
+            variance = (prefix_p2v[ends] - prefix_p2v[start]) / segment_volume - mean * mean
+        vwap = mean + reference
+        dev = np.sqrt(np.maximum(variance, 0))
+        vwap[before] = dev[before] = np.nan
+
+        upper_bands = _bands(vwap, dev, multipliers, 1, dtype)
+        lower_bands = _bands(vwap, dev, multipliers, -1, dtype)
+        vwap = vwap.astype(dtype, copy=False)
+        dev = dev.astype(dtype, copy=False)
+        if not sequential:
+            vwap, dev, upper_bands, lower_bands = vwap[0], dev[0], upper_bands[:, 0], lower_bands[:, 0]
+        result[key] = AnchoredVWAPBands(key, vwap, dev, upper_bands, lower_bands)
+    return result
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    prefix = np.empty(len(values) + 1)
+    prefix[0] = 0
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+def _segment_starts(timestamps: np.ndarray, keys: list) -> list:
+    """
+    Index of the segment start of every bar per anchor, -1 before the first anchor timestamp.
+    Interval anchors share one conversion of the timestamps to day numbers.
+    """
+    n = len(timestamps)
+    positions = np.arange(n)
+    days = None
+    starts = []
+    for key in keys:
+        is_start = np.zeros(n, dtype=bool)
+        if isinstance(key, str):
+            if days is None:
+                days = timestamps.astype(np.int64) // DAY_MS
+            session_ids = session_ids_from_days(days, key)
+            is_start[:1] = True
+            np.not_equal(session_ids[1:], session_ids[:-1], out=is_start[1:])
+        else:
+            anchor_index = np.searchsorted(timestamps, np.atleast_1d(np.asarray(key, dtype=np.float64)))
+            is_start[anchor_index[anchor_index < n]] = True
+        starts.append(np.maximum.accumulate(np.where(is_start, positions, -1)) if n else positions)
+    return starts
+
+
+def _last_segment_start(timestamps: np.ndarray, key) -> int:
+    """
+    Index of the segment start of the last bar, -1 when the last bar is before every anchor
+    timestamp
+    """
+    if not len(timestamps):
+        return -1
+    last = timestamps[-1]
+    if isinstance(key, str):
+        return int(np.searchsorted(timestamps, session_start(last, key)))
+    anchors = np.atleast_1d(np.asarray(key, dtype=np.float64))
+    anchors = anchors[anchors <= last]
+    if not len(anchors):
+        return -1
+    return int(np.searchsorted(timestamps, anchors.max()))
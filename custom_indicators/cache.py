@@ -0,0 +1,136 @@
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+import numpy as np
+
+from . import shared_cache
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# candles sampled by candle_fingerprint()
+FINGERPRINT_ROWS = 32
+
+_registry = {}
+
+
+def indicator_cache(func=None, *, maxsize: int = 128, shared: bool = True):
+    """
+    Memoize a strategy indicator property (or method) across calls. Unlike jesse's @cached,
+    which is cleared after every candle, entries are keyed on the indicator, its arguments,
+    the route, the candles (see candle_key()) and the hyperparameters, so the same value is
+    reused for as long as those stay the same. The least recently used entry is evicted once
+    maxsize is reached.
+
+    When a shared backend is configured (INDICATOR_CACHE_REDIS, or set_shared_cache()), local
+    misses are looked up there before computing and computed values are written back, so
+    workers trading the same route compute each candle's indicators once. shared=False keeps
+    an indicator local, e.g. when its value is cheap or not picklable.
+
+    Use it below @property:
+
+        @property
+        @indicator_cache
+        def sma_7(self):
+            return ta.sma(self.candles, period=7)
+
+    :param maxsize: int - default: 128
+    :param shared: bool - use the shared backend - default: True
+    """
+    if func is None:
+        return lambda f: indicator_cache(f, maxsize=maxsize, shared=shared)
+
+    entries = OrderedDict()
+    stats = {'hits': 0, 'misses': 0}
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items()))) + candle_key(self)
+        try:
+            value = entries[key]
+        except KeyError:
+            stats['misses'] += 1
+            backend = shared_cache._backend if shared else None
+            if backend is None:
+                value = func(self, *args, **kwargs)
+            else:
+                value = _shared_value(backend, func, key, self, args, kwargs)
+            entries[key] = value
+            if len(entries) > maxsize:
+                entries.popitem(last=False)
+        else:
+            stats['hits'] += 1
+            entries.move_to_end(key)
+        return value
+
+    def cache_info() -> CacheInfo:
+        return CacheInfo(stats['hits'], stats['misses'], maxsize, len(entries))
+
+    def cache_clear() -> None:
+        entries.clear()
+        stats['hits'] = stats['misses'] = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    _registry[func.__qualname__] = wrapper
+    return wrapper
+
+
+def _shared_value(backend, func, key: tuple, strategy, args: tuple, kwargs: dict):
+    redis_key = backend.key(func.__qualname__, key)
+    found, value = backend.get(redis_key)
+    if not found:
+        value = func(strategy, *args, **kwargs)
+        backend.set(redis_key, value)
+    return value
+
+
+def candle_key(strategy) -> tuple:
+    """
+    The part of a cache key that identifies the data an indicator was computed from: a
+    fingerprint of the candle values, the route, the last candle timestamp, the candle count
+    and the hyperparameters. The fingerprint covers the last candle and a fixed number of
+    evenly spaced earlier ones, so a forming candle that changes, or another backtest over
+    different prices with the same timestamps, gets its own entries without reading the whole
+    history on every call.
+    :param strategy: Strategy
+    :return: tuple
+    """
+    candles = strategy.candles
+    hp = getattr(strategy, 'hp', None)
+    return (
+        candle_fingerprint(candles),
+        getattr(strategy, 'exchange', None),
+        getattr(strategy, 'symbol', None),
+        getattr(strategy, 'timeframe', None),
+        candles[-1, 0] if len(candles) else None,
+        len(candles),
+        tuple(sorted(hp.items())) if hp else None,
+    )
+
+
+def candle_fingerprint(candles: np.ndarray) -> bytes:
+    """
+    Raw bytes of the last candle and up to FINGERPRINT_ROWS - 1 evenly spaced earlier ones,
+    O(1) in the history length. Plain bytes rather than a digest: hashing them as a dict key
+    is cheaper than any hash function, and they can not collide.
+    :param candles: np.ndarray
+    :return: bytes
+    """
+    n = len(candles)
+    # a strided view from the end, so the last candle is always part of it
+    step = max(-(-n // FINGERPRINT_ROWS), 1)
+    rows = candles[n - 1::-step] if n else candles
+    return np.ascontiguousarray(rows, dtype=np.float64).tobytes()
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters of every function decorated with indicator_cache
+    :return: dict - qualified name -> CacheInfo
+    """
+    return {name: wrapper.cache_info() for name, wrapper in _registry.items()}
+
+
+def clear_caches() -> None:
+    for wrapper in _registry.values():
+        wrapper.cache_clear()
@@ -0,0 +1,191 @@
+import jesse.helpers as jh
+import numpy as np
+from jesse.services.color import generate_unique_hex_color
+
+
+class ChartMixin:
+    """
+    Charts drawn once from whole indicator series instead of add_line_to_candle_chart() calls
+    in every after(). The strategy implements charts(), which runs at terminate():
+
+        class MyStrategy(cta.ChartMixin, Strategy):
+            def charts(self, chart):
+                chart.line('sma25', ta.sma(self.candles, 25, sequential=True), color='orange')
+
+            def chart_bar(self, chart):
+                chart.line('sma25', self.sma25, color='orange')
+
+    Every series is decimated to at most chart_points points, keeping each bucket's minimum
+    and maximum, so the chart payload has a fixed size whatever the backtest length. Only
+    candles of the trading period (from the first before() call on) are charted.
+
+    In live and paper sessions jesse calls terminate() only when the session stops, while the
+    chart is shown as it runs. There, chart_bar() is called in every after() instead, with the
+    same drawing methods taking the current bar's values, which should come from what the
+    strategy already computes (e.g. its streams) so the per-bar cost does not grow with the
+    history. charts() is not run. Strategies that override before(), after() or terminate()
+    must call super().
+    """
+    chart_points = 5000
+    _chart_start = None
+
+    def before(self) -> None:
+        if self._chart_start is None:
+            self._chart_start = self.candles[-1, 0]
+        super().before()
+
+    def charts(self, chart: 'ChartRecorder') -> None:
+        pass
+
+    def chart_bar(self, chart: 'ChartPoints') -> None:
+        pass
+
+    def after(self) -> None:
+        super().after()
+        if jh.is_live():
+            self.chart_bar(ChartPoints(self))
+
+    def terminate(self) -> None:
+        super().terminate()
+        if jh.is_live():
+            return
+        candles = self.candles
+        start = 0 if self._chart_start is None else np.searchsorted(candles[:, 0], self._chart_start)
+        chart = ChartRecorder(candles[:, 0], start, self.chart_points)
+        self.charts(chart)
+        chart.publish(self)
+
+
+class _Chart:
+    """
+    Drawing methods built on line(), shared by ChartRecorder and ChartPoints
+    """
+
+    def line(self, title: str, values, color=None) -> None:
+        raise NotImplementedError
+
+    def fill(self, title: str, start, end, count: int = 10, color=None) -> None:
+        """
+        count - 1 evenly spaced lines between two series, named f'{title}_{i}'
+        """
+        start = np.asarray(start, dtype=np.float64)
+        step = (np.asarray(end) - start) / count
+        for i in range(1, count):
+            self.line(f'{title}_{i}', start + step * i, color)
+
+    def bands(self, title: str, bands: list, color=None) -> None:
+        """
+        One line per series in bands, named f'{title} {i}' from 1, e.g. VWAP deviation bands
+        :param color: one colour for all, or a list with one per band
+        """
+        colors = color if isinstance(color, (list, tuple)) else [color] * len(bands)
+        for i, (band, band_color) in enumerate(zip(bands, colors), start=1):
+            self.line(f'{title} {i}', band, band_color)
+
+
+class ChartRecorder(_Chart):
+    """
+    Collects decimated chart series over a strategy's candles
+    :param timestamps: np.ndarray - candle timestamps in milliseconds
+    :param start: int - first index to chart - default: 0
+    :param max_points: int - points per series - default: 5000
+    """
+
+    def __init__(self, timestamps: np.ndarray, start: int = 0, max_points: int = 5000):
+        self.timestamps = timestamps
+        self.start = start
+        self.max_points = max_points
+        self.lines = {}
+        self.extra_lines = {}
+
+    def line(self, title: str, values: np.ndarray, color=None) -> None:
+        """
+        Line on the candle chart
+        :param values: np.ndarray - one value per candle, NaN for no point
+        :param color: str, or np.ndarray of str - one colour per candle
+        """
+        self.lines[title] = self._series(values, color)
+
+    def extra_line(self, chart_name: str, title: str, values: np.ndarray, color=None) -> None:
+        """
+        Line on a separate chart, like add_extra_line_chart()
+        """
+        self.extra_lines.setdefault(chart_name, {})[title] = self._series(values, color)
+
+    def publish(self, strategy) -> None:
+        """
+        Write the series into the strategy's chart values, in the layout add_line_to_candle_chart()
+        and add_extra_line_chart() produce
+        """
+        candle_chart = strategy.__dict__.setdefault('_add_line_to_candle_chart_values', {})
+        for title, series in self.lines.items():
+            candle_chart[title] = _chart_values(*series)
+
+        extra_chart = strategy.__dict__.setdefault('_add_extra_line_chart_values', {})
+        for chart_name, lines in self.extra_lines.items():
+            for title, series in lines.items():
+                extra_chart.setdefault(chart_name, {})[title] = _chart_values(*series)
+
+    def _series(self, values: np.ndarray, color) -> tuple:
+        values = np.asarray(values, dtype=np.float64)[self.start:]
+        index = decimate_minmax(values, self.max_points)
+        index = index[np.isfinite(values[index])]
+        colors = np.asarray(color)[self.start:][index] if isinstance(color, np.ndarray) else color
+        return self.timestamps[self.start:][index], values[index], colors
+
+
+class ChartPoints(_Chart):
+    """
+    The current bar's chart values, added straight through the strategy's
+    add_line_to_candle_chart() and add_extra_line_chart(). NaN values are skipped.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def line(self, title: str, value: float, color=None) -> None:
+        if np.isfinite(value):
+            self.strategy.add_line_to_candle_chart(title, float(value), color)
+
+    def extra_line(self, chart_name: str, title: str, value: float, color=None) -> None:
+        if np.isfinite(value):
+            self.strategy.add_extra_line_chart(chart_name, title, float(value), color)
+
+
+def decimate_minmax(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of at most max_points values that keep the shape of the series: it is cut into
+    max_points // 2 buckets and each bucket keeps its minimum and maximum, in time order.
+    NaN values are never picked over numbers.
+    :param values: np.ndarray
+    :param max_points: int
+    :return: np.ndarray - sorted indices into values
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = values
+    padded = padded.reshape(buckets, size)
+
+    missing = np.isnan(padded)
+    low = np.where(missing, np.inf, padded).argmin(axis=1)
+    high = np.where(missing, -np.inf, padded).argmax(axis=1)
+    offsets = np.arange(buckets) * size
+    index = np.unique(np.concatenate([offsets + low, offsets + high]))
+    return index[index < n]
+
+
+def _chart_values(timestamps: np.ndarray, values: np.ndarray, colors) -> dict:
+    times = (timestamps // 1000).astype(np.int64).tolist()
+    values = values.tolist()
+    if isinstance(colors, np.ndarray):
+        data = [{'time': t, 'value': v, 'color': c} for t, v, c in zip(times, values, colors.tolist())]
+        color = str(colors[-1]) if len(colors) else generate_unique_hex_color()
+    else:
+        color = colors if colors is not None else generate_unique_hex_color()
+        data = [{'time': t, 'value': v, 'color': color} for t, v in zip(times, values)]
+    return {'data': data, 'color': color}
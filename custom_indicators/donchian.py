@@ -0,0 +1,60 @@
+from collections import namedtuple
+import numpy as np
+from jesse.helpers import slice_candles
+
+DonchianChannel = namedtuple('DonchianChannel', ['upperband', 'middleband', 'lowerband'])
+
+
+def donchian(candles: np.ndarray, period: int = 20, offset: int = 0, sequential: bool = False) -> DonchianChannel:
+    """
+    Donchian Channels with a native bar offset. offset=1 gives the channel of the previous
+    `period` bars, the same as ta.donchian(candles[:-1]) but without slicing the array.
+    The sequential series is computed in O(n) regardless of period.
+    :param candles: np.ndarray
+    :param period: int - default: 20
+    :param offset: int - number of most recent bars left out of the window - default: 0
+    :param sequential: bool - default: False
+    :return: DonchianChannel(upperband, middleband, lowerband)
+    """
+    candles = slice_candles(candles, sequential)
+
+    if not sequential:
+        end = len(candles) - offset
+        if end < period:
+            return DonchianChannel(np.nan, np.nan, np.nan)
+        upper = candles[end - period:end, 3].max()
+        lower = candles[end - period:end, 4].min()
+        return DonchianChannel(upper, (upper + lower) / 2, lower)
+
+    upper = _shift(rolling_max(candles[:, 3], period), offset)
+    lower = _shift(-rolling_max(-candles[:, 4], period), offset)
+    return DonchianChannel(upper, (upper + lower) / 2, lower)
+
+
+def rolling_max(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Trailing window maximum in O(n) (van Herk/Gil-Werman). The series is cut into blocks of
+    `period`; every window spans at most two blocks, so its maximum is the larger of a suffix
+    maximum in the first block and a prefix maximum in the second.
+    :param values: np.ndarray
+    :param period: int
+    :return: np.ndarray - NaN for the first period - 1 values
+    """
+    n = len(values)
+    result = np.full(n, np.nan)
+    if n < period:
+        return result
+
+    blocks = np.concatenate([values, np.full(-n % period, -np.inf)]).reshape(-1, period)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    result[period - 1:] = np.maximum(suffix[:n - period + 1], prefix[period - 1:n])
+    return result
+
+
+def _shift(values: np.ndarray, offset: int) -> np.ndarray:
+    if offset == 0:
+        return values
+    shifted = np.full_like(values, np.nan)
+    shifted[offset:] = values[:-offset]
+    return shifted
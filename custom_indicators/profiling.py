@@ -0,0 +1,190 @@
+import os
+import time
+from datetime import datetime
+from functools import wraps
+
+LIFECYCLE_HOOKS = ('before', 'should_long', 'should_short', 'should_cancel_entry', 'go_long', 'go_short', 'update_position', 'after', 'terminate')
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'storage', 'profiles')
+
+# log2 buckets of nanoseconds: bucket b holds durations in [2 ** (b - 1), 2 ** b)
+_BUCKETS = 64
+
+
+class ProfilingMixin:
+    """
+    Opt-in timing of a strategy's lifecycle hooks (should_long, go_*, update_position, after,
+    on_*, ...) and of every property the strategy defines, e.g. its indicators:
+
+        class MyStrategy(cta.ProfilingMixin, Strategy):
+            ...
+
+    Nothing is wrapped unless the STRATEGY_PROFILE environment variable is set when the
+    strategy class is defined, or instrument(MyStrategy) is called before the run, so a
+    disabled profiler adds no per-bar cost. Calls are aggregated into fixed-size log2
+    histograms per name and call stack. At terminate() a report and a collapsed-stack file
+    (for flamegraph.pl, speedscope, ...) are written to STRATEGY_PROFILE_DIR, default:
+    storage/profiles.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if os.environ.get('STRATEGY_PROFILE'):
+            instrument(cls)
+
+    @property
+    def profiler(self) -> 'Profiler':
+        profiler = self.__dict__.get('_profiler')
+        if profiler is None:
+            profiler = self.__dict__['_profiler'] = Profiler(type(self).__name__)
+        return profiler
+
+
+class Profiler:
+    """
+    Call counts, wall time and duration histograms per hook/property, plus self time per call
+    stack
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = {}
+        self.stacks = {}
+        self._stack = []
+        self._children = []
+
+    def call(self, name: str, func, *args, **kwargs):
+        stack, children = self._stack, self._children
+        stack.append(name)
+        children.append(0)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            key = tuple(stack)
+            self.stacks[key] = self.stacks.get(key, 0) + elapsed - children.pop()
+            stack.pop()
+            if children:
+                children[-1] += elapsed
+
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = [0, 0, 0, [0] * _BUCKETS]
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+            stats[3][min(elapsed.bit_length(), _BUCKETS - 1)] += 1
+
+    def report(self) -> str:
+        """
+        One line per hook/property, slowest total first. Percentiles are interpolated within
+        their log2 histogram bucket, capped at the maximum, so they are within a factor of two
+        of the true value.
+        """
+        self_time = {}
+        for stack, elapsed in self.stacks.items():
+            self_time[stack[-1]] = self_time.get(stack[-1], 0) + elapsed
+        run_time = sum(elapsed for stack, elapsed in self.stacks.items()) or 1
+
+        lines = [
+            f'{self.name} profile',
+            f'{"name":<32}{"calls":>10}{"total ms":>12}{"self ms":>12}{"self %":>8}{"mean us":>10}{"p50 us":>10}{"p99 us":>10}{"max us":>10}',
+        ]
+        for name, (count, total, longest, histogram) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            lines.append(
+                f'{name:<32}{count:>10,}{total / 1e6:>12.1f}{self_time.get(name, 0) / 1e6:>12.1f}'
+                f'{self_time.get(name, 0) / run_time:>8.1%}{total / count / 1e3:>10.1f}'
+                f'{min(_percentile(histogram, count, 0.5), longest) / 1e3:>10.1f}{min(_percentile(histogram, count, 0.99), longest) / 1e3:>10.1f}{longest / 1e3:>10.1f}'
+            )
+        return '\n'.join(lines) + '\n'
+
+    def collapsed(self) -> str:
+        """
+        Self time per call stack in microseconds, one `Strategy;hook;property value` line each
+        """
+        return ''.join(f'{";".join((self.name,) + stack)} {elapsed // 1000}\n' for stack, elapsed in sorted(self.stacks.items()))
+
+    def dump(self, directory: str = None) -> tuple:
+        """
+        Write the report and the collapsed stacks
+        :param directory: str - default: STRATEGY_PROFILE_DIR or storage/profiles
+        :return: tuple - (report path, collapsed stacks path)
+        """
+        directory = directory or os.environ.get('STRATEGY_PROFILE_DIR') or DEFAULT_DIRECTORY
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f'{self.name}-{datetime.now():%Y%m%d-%H%M%S}')
+        with open(base + '.txt', 'w') as f:
+            f.write(self.report())
+        with open(base + '.folded', 'w') as f:
+            f.write(self.collapsed())
+        return base + '.txt', base + '.folded'
+
+
+def instrument(strategy_class) -> None:
+    """
+    Wrap a strategy class's lifecycle hooks and its own properties with the profiler, in place.
+    Already wrapped attributes are left alone, so instrumenting twice is harmless.
+    :param strategy_class: a Strategy subclass using ProfilingMixin
+    """
+    for name in dir(strategy_class):
+        if name in LIFECYCLE_HOOKS or name.startswith('on_'):
+            method = getattr(strategy_class, name)
+            if callable(method) and not getattr(method, '_profiled', False):
+                setattr(strategy_class, name, _profiled_method(name, method))
+
+    for name, value in _project_attributes(strategy_class).items():
+        if isinstance(value, property) and value.fget is not None and not getattr(value.fget, '_profiled', False):
+            setattr(strategy_class, name, property(_profiled_method(name, value.fget), value.fset, value.fdel, value.__doc__))
+
+    if not getattr(getattr(strategy_class, 'terminate', None), '_dumps', False):
+        strategy_class.terminate = _dumping_terminate(getattr(strategy_class, 'terminate', None))
+
+
+def _profiled_method(name: str, func):
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self.profiler.call(name, func, self, *args, **kwargs)
+    wrapper._profiled = True
+    return wrapper
+
+
+def _dumping_terminate(terminate):
+    def wrapper(self, *args, **kwargs):
+        try:
+            if terminate is not None:
+                return terminate(self, *args, **kwargs)
+        finally:
+            self.profiler.dump()
+    wrapper._profiled = wrapper._dumps = True
+    return wrapper
+
+
+def _project_attributes(strategy_class) -> dict:
+    """
+    Attributes defined by the strategy and its project mixins, not by jesse or ProfilingMixin
+    """
+    attributes = {}
+    for klass in strategy_class.__mro__:
+        if klass.__module__.split('.')[0] == 'jesse' or klass in (ProfilingMixin, object):
+            continue
+        for name, value in vars(klass).items():
+            attributes.setdefault(name, value)
+    return attributes
+
+
+def _percentile(histogram: list, count: int, q: float) -> float:
+    """
+    Estimate of the q quantile, linear between the bounds of the bucket it falls in
+    """
+    rank = q * count
+    seen = 0
+    for bucket, n in enumerate(histogram):
+        if n and seen + n >= rank:
+            if bucket == 0:
+                return 0.0
+            low = 1 << (bucket - 1)
+            return low + low * max(rank - seen, 0) / n
+        seen += n
+    return 0.0
@@ -0,0 +1,160 @@
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+SessionIndex = namedtuple('SessionIndex', ['session_id', 'bar_index', 'hour', 'weekday', 'new_session', 'last_weekday_of_month'])
+
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+
+_FIELDS = (
+    ('session_id', np.int64),
+    ('bar_index', np.int64),
+    ('hour', np.int8),
+    ('weekday', np.int8),
+    ('new_session', np.bool_),
+    ('last_weekday_of_month', np.bool_),
+)
+_CACHE_SIZE = 8
+_cache = OrderedDict()
+
+
+def session_index(candles: np.ndarray, interval: str = 'Day') -> SessionIndex:
+    """
+    Per-bar calendar arrays for a candle array, all in UTC: session id, bar index within the
+    session, hour of day, weekday (Monday is 0), new-session flag and last-weekday-of-month
+    flag. Results are cached by interval, first timestamp and bar spacing, so strategies and
+    indicators reading the same candles share one computation. When the candles grow by a few
+    bars (the next call of a backtest), only the new bars are computed.
+    :param candles: np.ndarray
+    :param interval: str - 'Day', 'Week', or 'Month' - default: 'Day'
+    :return: SessionIndex
+    """
+    n = len(candles)
+    if n == 0:
+        return SessionIndex(*(np.empty(0, dtype=dtype) for _, dtype in _FIELDS))
+
+    timestamps = candles[:, 0]
+    # the bar spacing keeps routes of different timeframes that start together apart
+    key = (interval, timestamps[0], timestamps[1] - timestamps[0] if n > 1 else 0)
+    entry = _cache.get(key)
+    if entry is None or not entry.covers(timestamps):
+        entry = _cache[key] = _SessionCache(interval)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+
+    if entry.size < n:
+        entry.extend(timestamps[entry.size:])
+    return entry.view(n)
+
+
+def session_ids_from_timestamps(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    """
+    Integer session id per timestamp (UTC). Days are counted from the epoch, weeks are ISO
+    weeks (starting Monday) and months are calendar months.
+    :param timestamps: np.ndarray - milliseconds
+    :param interval: str - 'Day', 'Week', or 'Month'
+    :return: np.ndarray
+    """
+    return session_ids_from_days(timestamps.astype(np.int64) // DAY_MS, interval)
+
+
+def session_ids_from_days(days: np.ndarray, interval: str) -> np.ndarray:
+    """
+    session_ids_from_timestamps() for day numbers since the epoch, so several intervals can
+    share one timestamp conversion
+    :param days: np.ndarray - int64, timestamps // DAY_MS
+    :param interval: str - 'Day', 'Week', or 'Month'
+    :return: np.ndarray
+    """
+    if interval == 'Day':
+        return days
+    elif interval == 'Week':
+        # 1970-01-01 was a Thursday, shifting by 3 days aligns weeks on Mondays
+        return (days + 3) // 7
+    elif interval == 'Month':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    else:
+        raise ValueError("Invalid interval. Choose 'Day', 'Week', or 'Month'.")
+
+
+def session_start(timestamp: float, interval: str) -> int:
+    """
+    Start of the session containing a timestamp, the inverse of session_ids_from_timestamps()
+    :param timestamp: float - milliseconds
+    :param interval: str - 'Day', 'Week', or 'Month'
+    :return: int - milliseconds
+    """
+    session_id = int(session_ids_from_timestamps(np.array([timestamp]), interval)[0])
+    if interval == 'Day':
+        return session_id * DAY_MS
+    elif interval == 'Week':
+        return (session_id * 7 - 3) * DAY_MS
+    return int(np.datetime64(session_id, 'M').astype('datetime64[ms]').astype(np.int64))
+
+
+class _SessionCache:
+    """
+    Growable per-bar arrays for one (interval, first timestamp, bar spacing) key. Capacity
+    doubles as bars are appended, so extending by one bar per call costs amortized O(1).
+    """
+
+    def __init__(self, interval: str):
+        self.interval = interval
+        self.size = 0
+        self.timestamps = np.empty(0)
+        self.arrays = {name: np.empty(0, dtype=dtype) for name, dtype in _FIELDS}
+
+    def covers(self, timestamps: np.ndarray) -> bool:
+        """
+        Whether `timestamps` (starting at the same first timestamp) is a prefix or an extension
+        of what is cached, judged by the last timestamp they have in common
+        """
+        common = min(self.size, len(timestamps))
+        return common == 0 or self.timestamps[common - 1] == timestamps[common - 1]
+
+    def extend(self, timestamps: np.ndarray) -> None:
+        count = len(timestamps)
+        self._reserve(self.size + count)
+
+        ts = timestamps.astype(np.int64)
+        days = ts // DAY_MS
+        session_id = session_ids_from_timestamps(ts, self.interval)
+
+        new_session = np.empty(count, dtype=bool)
+        new_session[0] = self.size == 0 or session_id[0] != self.arrays['session_id'][self.size - 1]
+        np.not_equal(session_id[1:], session_id[:-1], out=new_session[1:])
+
+        # bars since the latest session start; bars before the first start continue the cached session
+        position = np.arange(count)
+        last_start = np.maximum.accumulate(np.where(new_session, position, -1))
+        previous_index = self.arrays['bar_index'][self.size - 1] if self.size else -1
+        bar_index = np.where(last_start >= 0, position - last_start, previous_index + 1 + position)
+
+        month = ts.astype('datetime64[ms]').astype('datetime64[M]')
+        last_day = (month + 1).astype('datetime64[D]').astype(np.int64) - 1
+        last_weekday = last_day - np.maximum((last_day + 3) % 7 - 4, 0)
+
+        values = {
+            'session_id': session_id,
+            'bar_index': bar_index,
+            'hour': ts // HOUR_MS % 24,
+            'weekday': (days + 3) % 7,
+            'new_session': new_session,
+            'last_weekday_of_month': days == last_weekday,
+        }
+        end = self.size + count
+        self.timestamps[self.size:end] = timestamps
+        for name, array in self.arrays.items():
+            array[self.size:end] = values[name]
+        self.size = end
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self.timestamps):
+            return
+        capacity = max(size, 2 * len(self.timestamps))
+        self.timestamps = np.resize(self.timestamps, capacity)
+        self.arrays = {name: np.resize(array, capacity) for name, array in self.arrays.items()}
+
+    def view(self, n: int) -> SessionIndex:
+        return SessionIndex(*(self.arrays[name][:n] for name, _ in _FIELDS))
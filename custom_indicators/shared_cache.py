@@ -0,0 +1,157 @@
+import os
+import pickle
+import struct
+import time
+from hashlib import blake2b
+
+DEFAULT_TTL = 3600
+DEFAULT_PREFIX = 'warren:indicator:'
+
+# frame: buffer count, then the pickle length and each out-of-band buffer length
+_COUNT = struct.Struct('<I')
+_LENGTH = struct.Struct('<Q')
+
+
+class RedisBackend:
+    """
+    Indicator values shared between workers through Redis, e.g. the one docker-compose runs
+    next to Jesse. Values are pickled with protocol 5 and NumPy buffers are stored out of band,
+    so arrays are written and read as raw bytes. Entries expire after ttl seconds.
+
+    Redis is an optional extra: any error (redis not installed, connection refused, timeout)
+    disables the backend for retry_after seconds and indicator_cache computes locally meanwhile.
+    Pass client= to use an existing connection or an in-process fake with redis-py's get() and
+    set(name, value, ex=ttl).
+    :param url: str - e.g. redis://redis:6379/0, used when no client is given
+    :param client: redis.Redis-like client
+    :param ttl: int - seconds - default: 3600
+    :param prefix: str - key prefix - default: warren:indicator:
+    :param timeout: float - socket timeout in seconds for clients created from url - default: 0.05
+    :param retry_after: float - seconds without Redis after an error - default: 30
+    """
+
+    def __init__(self, url: str = None, client=None, ttl: int = DEFAULT_TTL, prefix: str = DEFAULT_PREFIX,
+                 timeout: float = 0.05, retry_after: float = 30):
+        self.url = url
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+        self._down_until = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'RedisBackend':
+        """
+        Backend configured by INDICATOR_CACHE_REDIS (URL) and INDICATOR_CACHE_TTL, None when the
+        URL is not set
+        """
+        url = os.environ.get('INDICATOR_CACHE_REDIS')
+        if not url:
+            return None
+        return cls(url=url, ttl=int(os.environ.get('INDICATOR_CACHE_TTL', DEFAULT_TTL)))
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def key(self, indicator: str, key: tuple) -> str:
+        """
+        Redis key of an indicator value. key is (params..., candle fingerprint, exchange,
+        symbol, timeframe, last timestamp, candle count, hyperparameters), as indicator_cache
+        builds it. The digest covers all of it, the fingerprint included, so workers only share
+        values computed from the same candle values.
+        """
+        exchange, symbol, timeframe, timestamp = key[-6:-2]
+        digest = blake2b(repr((indicator, key)).encode(), digest_size=12).hexdigest()
+        timestamp = 'none' if timestamp is None else int(timestamp)
+        return f'{self.prefix}{exchange}:{symbol}:{timeframe}:{indicator}:{timestamp}:{digest}'
+
+    def get(self, key: str):
+        """
+        :return: tuple - (True, value) on a hit, (False, None) otherwise
+        """
+        if not self.available:
+            return False, None
+        try:
+            data = self._client().get(key)
+            if data is None:
+                self.stats['misses'] += 1
+                return False, None
+            value = loads(data)
+        except Exception:
+            self._failed()
+            return False, None
+        self.stats['hits'] += 1
+        return True, value
+
+    def set(self, key: str, value) -> None:
+        if not self.available:
+            return
+        try:
+            data = dumps(value)
+        except Exception:
+            # not picklable: stays local, Redis itself is fine
+            self.stats['errors'] += 1
+            return
+        try:
+            self._client().set(key, data, ex=self.ttl)
+        except Exception:
+            self._failed()
+            return
+        self.stats['writes'] += 1
+
+    def _client(self):
+        if self.client is None:
+            import redis
+            self.client = redis.Redis.from_url(self.url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout)
+        return self.client
+
+    def _failed(self) -> None:
+        self.stats['errors'] += 1
+        self._down_until = time.monotonic() + self.retry_after
+
+
+def dumps(value) -> bytes:
+    """
+    Pickle protocol 5 with out-of-band buffers, framed as one bytes object
+    """
+    buffers = []
+    data = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    header = _COUNT.pack(len(raws)) + b''.join(_LENGTH.pack(len(part)) for part in [data, *raws])
+    return b''.join([header, data, *raws])
+
+
+def loads(data: bytes):
+    """
+    Inverse of dumps(). Arrays are views into one writable copy of data.
+    """
+    data = memoryview(bytearray(data))
+    count, = _COUNT.unpack_from(data)
+    offset = _COUNT.size
+    lengths = [_LENGTH.unpack_from(data, offset + i * _LENGTH.size)[0] for i in range(count + 1)]
+    offset += (count + 1) * _LENGTH.size
+
+    parts = []
+    for length in lengths:
+        parts.append(data[offset:offset + length])
+        offset += length
+    return pickle.loads(parts[0], buffers=parts[1:])
+
+
+def set_shared_cache(backend) -> None:
+    """
+    Backend consulted by indicator_cache on local misses, None to compute locally only.
+    Defaults to RedisBackend.from_env().
+    """
+    global _backend
+    _backend = backend
+
+
+def get_shared_cache():
+    return _backend
+
+
+_backend = RedisBackend.from_env()
@@ -0,0 +1,101 @@
+import os
+
+import jesse.helpers as jh
+
+from storage.snapshot_store import DEFAULT_ROOT, SnapshotStore
+from .streaming import CandleStream
+
+
+class SnapshotMixin:
+    """
+    Periodic snapshots of a strategy's incremental indicator state, so a restarted live
+    session resumes from them instead of replaying its whole warm-up history:
+
+        class MyStrategy(cta.SnapshotMixin, cta.StreamMixin, Strategy):
+            snapshot_attributes = ('candle_index',)
+
+    A snapshot holds the StreamMixin streams, every CandleStream attribute of the strategy,
+    self.vars and the attributes named in snapshot_attributes. It is written every
+    snapshot_every bars and at terminate(), to STRATEGY_SNAPSHOT_DIR, default: storage/snapshots.
+    On the first before() the snapshot is restored when its last candle is part of
+    self.candles and the hyperparameters and snapshot_version match, and the streams are
+    caught up on the candles since. By default this only happens in live and paper trading;
+    set snapshots = True or False to force it. Strategies that override before() or
+    terminate() must call super().
+    """
+    snapshots = None
+    snapshot_every = 60
+    snapshot_attributes = ()
+    snapshot_version = 1
+    snapshot_store = None
+
+    _snapshot_restored = None
+    _snapshot_bars = 0
+
+    def before(self) -> None:
+        if self._snapshots_enabled():
+            if self._snapshot_restored is None:
+                self._snapshot_restored = self.restore_snapshot()
+            else:
+                self._snapshot_bars += 1
+                if self._snapshot_bars >= self.snapshot_every and len(self.candles) > 1:
+                    # before() runs first, so the state is as of the previous candle
+                    self.save_snapshot(self.candles[-2, 0])
+        super().before()
+
+    def terminate(self) -> None:
+        super().terminate()
+        if self._snapshots_enabled() and len(self.candles):
+            self.save_snapshot(self.candles[-1, 0])
+
+    def snapshot_state(self) -> dict:
+        attributes = {name: value for name, value in self.__dict__.items() if isinstance(value, CandleStream)}
+        attributes.update((name, getattr(self, name)) for name in self.snapshot_attributes)
+        return {
+            'fingerprint': self._snapshot_fingerprint(),
+            'streams': self.__dict__.get('_streams', {}),
+            'attributes': attributes,
+            'vars': dict(self.vars),
+        }
+
+    def save_snapshot(self, timestamp: int) -> None:
+        self._snapshot_bars = 0
+        try:
+            self._snapshots().save(self._snapshot_key(), self.snapshot_state(), timestamp)
+        except OSError as e:
+            self.log(f'Strategy snapshot not saved: {e}', 'error')
+
+    def restore_snapshot(self) -> bool:
+        """
+        :return: bool - whether a snapshot was restored
+        """
+        loaded = self._snapshots().load(self._snapshot_key(), self.candles)
+        if loaded is None or loaded[0].get('fingerprint') != self._snapshot_fingerprint():
+            return False
+
+        state = loaded[0]
+        self.__dict__.setdefault('_streams', {}).update(state['streams'])
+        for name, value in state['attributes'].items():
+            setattr(self, name, value)
+        self.vars.update(state['vars'])
+
+        streams = [stream for _, stream in state['streams'].values()]
+        streams += [value for value in state['attributes'].values() if isinstance(value, CandleStream)]
+        for stream in streams:
+            stream.catch_up(self.candles)
+        return True
+
+    def _snapshots_enabled(self) -> bool:
+        return jh.is_live() if self.snapshots is None else self.snapshots
+
+    def _snapshots(self) -> SnapshotStore:
+        if self.snapshot_store is None:
+            type(self).snapshot_store = SnapshotStore(os.environ.get('STRATEGY_SNAPSHOT_DIR') or DEFAULT_ROOT)
+        return self.snapshot_store
+
+    def _snapshot_key(self) -> tuple:
+        return type(self).__name__, self.exchange, self.symbol, self.timeframe
+
+    def _snapshot_fingerprint(self) -> tuple:
+        hp = getattr(self, 'hp', None)
+        return self.snapshot_version, tuple(sorted(hp.items())) if hp else None
@@ -0,0 +1,12 @@
+from .base import CandleStream
+from .ring import RingBuffer, CandleRing
+from .mixin import StreamMixin
+from .vwapbands import VWAPBandsStream
+from .sma import SMAStream
+from .ema import EMAStream
+from .atr import ATRStream
+from .macd import MACDStream
+from .supertrend import SupertrendStream
+from .donchian import DonchianStream
+from .resample import ResampledStream, resample_candles
+from .trades import TradeAggregator, TradeUpdate, replay_trades
@@ -0,0 +1,46 @@
+import numpy as np
+
+from .base import CandleStream
+from .ring import RingBuffer
+
+
+class ATRStream(CandleStream):
+    """
+    Incremental ATR - Average True Range with Wilder's smoothing. The first value is the mean
+    true range of the first `period` candles, as in jesse's atr.
+    :param period: int - default: 14
+    :param history: int - number of recent values kept in self.values - default: 2
+    """
+
+    def __init__(self, period: int = 14, history: int = 2):
+        self.period = period
+        self.history = history
+        super().__init__()
+
+    def reset(self) -> None:
+        self.previous_close = np.nan
+        self.tr_sum = 0.0
+        self.count = 0
+        self.atr = np.nan
+        self.values = RingBuffer(self.history)
+
+    def _update(self, candle: np.ndarray) -> None:
+        high, low = candle[3], candle[4]
+        if self.count == 0:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = candle[2]
+        self.count += 1
+
+        if self.count < self.period:
+            self.tr_sum += tr
+        elif self.count == self.period:
+            self.atr = (self.tr_sum + tr) / self.period
+        else:
+            self.atr = (self.atr * (self.period - 1) + tr) / self.period
+        self.values.append(self.atr)
+
+    @property
+    def value(self) -> float:
+        return self.atr
@@ -0,0 +1,75 @@
+import copy
+
+import numpy as np
+
+
+class CandleStream:
+    """
+    Base class for indicators that consume one candle at a time.
+
+    Subclasses implement reset(), _update() and the value property. Candles whose timestamp
+    is not newer than the last consumed one are ignored, so feeding the same candle twice
+    is harmless.
+    """
+
+    def __init__(self):
+        self.timestamp = None
+        self.reset()
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def _update(self, candle: np.ndarray) -> None:
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        raise NotImplementedError
+
+    def update(self, candle: np.ndarray):
+        """
+        Consume a single candle in jesse's [timestamp, open, close, high, low, volume] layout
+        :param candle: np.ndarray
+        :return: the indicator value after this candle
+        """
+        if self.timestamp is not None and candle[0] <= self.timestamp:
+            return self.value
+
+        self._update(candle)
+        self.timestamp = candle[0]
+        return self.value
+
+    def peek(self, candle: np.ndarray):
+        """
+        The value the stream would have after `candle`, without consuming it. Costs a copy of
+        the stream's state rather than a recompute over history.
+        :param candle: np.ndarray
+        """
+        return copy.deepcopy(self).update(candle)
+
+    def seed(self, candles: np.ndarray):
+        """
+        Reset the state and rebuild it from a historical candle array
+        :param candles: np.ndarray
+        :return: the indicator value at the last candle
+        """
+        self.timestamp = None
+        self.reset()
+        for candle in candles:
+            self.update(candle)
+        return self.value
+
+    def catch_up(self, candles: np.ndarray):
+        """
+        Consume only the candles newer than the last one seen. Falls back to seed() when the
+        stream is empty or the array no longer overlaps with what was consumed.
+        :param candles: np.ndarray
+        :return: the indicator value at the last candle
+        """
+        if self.timestamp is None or len(candles) == 0 or candles[0, 0] > self.timestamp:
+            return self.seed(candles)
+
+        start = np.searchsorted(candles[:, 0], self.timestamp, side='right')
+        for candle in candles[start:]:
+            self.update(candle)
+        return self.value
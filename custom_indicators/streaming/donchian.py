@@ -0,0 +1,67 @@
+from collections import deque
+
+import numpy as np
+
+from .base import CandleStream
+from .ring import RingBuffer
+from ..donchian import DonchianChannel
+
+
+class DonchianStream(CandleStream):
+    """
+    Incremental Donchian Channels on monotonic max/min deques, amortized O(1) per candle
+    for any period. offset=1 leaves the newest candle out of the window, which is the
+    previous bar's channel.
+    :param period: int - default: 20
+    :param offset: int - number of most recent bars left out of the window - default: 0
+    :param history: int - number of recent values kept in self.upperband/lowerband - default: 2
+    """
+
+    def __init__(self, period: int = 20, offset: int = 0, history: int = 2):
+        self.period = period
+        self.offset = offset
+        self.history = history
+        super().__init__()
+
+    def reset(self) -> None:
+        self.pending = deque()
+        self.highs = deque()
+        self.lows = deque()
+        self.count = 0
+        self.upperband = RingBuffer(self.history)
+        self.lowerband = RingBuffer(self.history)
+
+    def _update(self, candle: np.ndarray) -> None:
+        self.pending.append((candle[3], candle[4]))
+        if len(self.pending) > self.offset:
+            self._push(*self.pending.popleft())
+
+        if self.count >= self.period:
+            self.upperband.append(self.highs[0][1])
+            self.lowerband.append(self.lows[0][1])
+        else:
+            self.upperband.append(np.nan)
+            self.lowerband.append(np.nan)
+
+    def _push(self, high: float, low: float) -> None:
+        index = self.count
+        self.count += 1
+
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((index, high))
+        if self.highs[0][0] <= index - self.period:
+            self.highs.popleft()
+
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((index, low))
+        if self.lows[0][0] <= index - self.period:
+            self.lows.popleft()
+
+    @property
+    def value(self) -> DonchianChannel:
+        if not len(self.upperband):
+            return DonchianChannel(np.nan, np.nan, np.nan)
+        upper, lower = self.upperband[-1], self.lowerband[-1]
+        return DonchianChannel(upper, (upper + lower) / 2, lower)
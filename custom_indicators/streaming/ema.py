@@ -0,0 +1,40 @@
+import numpy as np
+from jesse.helpers import get_candle_source
+
+from .base import CandleStream
+from .ring import RingBuffer
+
+
+class EMAStream(CandleStream):
+    """
+    Incremental EMA - Exponential Moving Average. Seeded with the first source value, like
+    jesse's ema, so the recursion produces the same numbers.
+    :param period: int - default: 5
+    :param source_type: str - default: "close"
+    :param history: int - number of recent values kept in self.values - default: 2
+    """
+
+    def __init__(self, period: int = 5, source_type: str = "close", history: int = 2):
+        self.period = period
+        self.source_type = source_type
+        self.history = history
+        self.alpha = 2 / (period + 1)
+        super().__init__()
+
+    def reset(self) -> None:
+        self.ema = np.nan
+        self.values = RingBuffer(self.history)
+
+    def _update(self, candle: np.ndarray) -> None:
+        self.ema = ema_step(self.ema, get_candle_source(candle[None, :], self.source_type)[0], self.alpha)
+        self.values.append(self.ema)
+
+    @property
+    def value(self) -> float:
+        return self.ema
+
+
+def ema_step(previous: float, source: float, alpha: float) -> float:
+    if np.isnan(previous):
+        return source
+    return alpha * source + (1 - alpha) * previous
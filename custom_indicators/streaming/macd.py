@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+import numpy as np
+from jesse.helpers import get_candle_source
+
+from .base import CandleStream
+from .ema import ema_step
+from .ring import RingBuffer
+
+MACD = namedtuple('MACD', ['macd', 'signal', 'hist'])
+
+
+class MACDStream(CandleStream):
+    """
+    Incremental MACD - Moving Average Convergence/Divergence, built from three EMA recursions
+    :param fast_period: int - default: 12
+    :param slow_period: int - default: 26
+    :param signal_period: int - default: 9
+    :param source_type: str - default: "close"
+    :param history: int - number of recent values kept in self.macd/signal/hist - default: 2
+    """
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9,
+                 source_type: str = "close", history: int = 2):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.source_type = source_type
+        self.history = history
+        super().__init__()
+
+    def reset(self) -> None:
+        self.fast_ema = self.slow_ema = self.signal_ema = np.nan
+        self.macd = RingBuffer(self.history)
+        self.signal = RingBuffer(self.history)
+        self.hist = RingBuffer(self.history)
+
+    def _update(self, candle: np.ndarray) -> None:
+        source = get_candle_source(candle[None, :], self.source_type)[0]
+        self.fast_ema = ema_step(self.fast_ema, source, 2 / (self.fast_period + 1))
+        self.slow_ema = ema_step(self.slow_ema, source, 2 / (self.slow_period + 1))
+        macd = self.fast_ema - self.slow_ema
+        self.signal_ema = ema_step(self.signal_ema, macd, 2 / (self.signal_period + 1))
+
+        self.macd.append(macd)
+        self.signal.append(self.signal_ema)
+        self.hist.append(macd - self.signal_ema)
+
+    @property
+    def value(self) -> MACD:
+        if not len(self.macd):
+            return MACD(np.nan, np.nan, np.nan)
+        return MACD(self.macd[-1], self.signal[-1], self.hist[-1])
@@ -0,0 +1,24 @@
+class StreamMixin:
+    """
+    Gives a strategy named indicator streams that are created on first use and caught up
+    with self.candles every time they are read:
+
+        class MyStrategy(StreamMixin, Strategy):
+            @property
+            def sma_7(self):
+                return self.stream('sma_7', cta.SMAStream, period=7).values
+
+    A stream is rebuilt when its parameters change, e.g. between optimization candidates.
+    stream_class can be any callable returning a stream, to pass arguments that are not part
+    of its parameters, such as a ResampledStream's history.
+    """
+
+    def stream(self, name: str, stream_class, /, **params):
+        streams = self.__dict__.setdefault('_streams', {})
+        entry = streams.get(name)
+        if entry is None or entry[0] != params:
+            entry = streams[name] = (params, stream_class(**params))
+
+        stream = entry[1]
+        stream.catch_up(self.candles)
+        return stream
@@ -0,0 +1,119 @@
+import numpy as np
+from jesse.helpers import timeframe_to_one_minutes
+
+from .base import CandleStream
+
+
+class ResampledStream(CandleStream):
+    """
+    Resamples base candles into a higher timeframe and feeds the closed higher-timeframe bars
+    to an indicator stream, so the indicator only does work when one of those bars closes.
+    The partially formed bar is kept in self.bar and its indicator value is available through
+    `current`, computed once per base candle from a copy of the indicator state.
+
+        daily = ResampledStream('1D', '5m', SupertrendStream, period=10, factor=3)
+
+    Without history the indicator only sees the bars resampled from the base candles, so it
+    needs as many higher-timeframe bars as its period before it has a value.
+
+    :param timeframe: str - the higher timeframe, e.g. '1D'
+    :param base_timeframe: str - timeframe of the candles being fed in
+    :param indicator_class: the CandleStream class computed on the higher timeframe
+    :param history: np.ndarray - higher-timeframe candles, e.g. get_candles(exchange, symbol, '1D').
+        Every seed first feeds the indicator the bars that start before the first base candle's
+        bar - default: None
+    :param params: passed on to indicator_class
+    """
+
+    def __init__(self, timeframe: str, base_timeframe: str, indicator_class, history: np.ndarray = None, **params):
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_one_minutes(timeframe) * 60_000
+        self.base_timeframe_ms = timeframe_to_one_minutes(base_timeframe) * 60_000
+        self.history = history
+        self.indicator = indicator_class(**params)
+        super().__init__()
+
+    def reset(self) -> None:
+        self.indicator.timestamp = None
+        self.indicator.reset()
+        self.bar = None
+        self._current = None
+
+    def seed(self, candles: np.ndarray):
+        self.timestamp = None
+        self.reset()
+        if self.history is not None and len(candles):
+            first = candles[0, 0] - candles[0, 0] % self.timeframe_ms
+            for bar in self.history[self.history[:, 0] < first]:
+                self.indicator.update(bar)
+        for candle in candles:
+            self.update(candle)
+        return self.value
+
+    def _update(self, candle: np.ndarray) -> None:
+        start = candle[0] - candle[0] % self.timeframe_ms
+        if self.bar is not None and self.bar[0] != start:
+            # a bar that never saw its last base candle (gap in data) closes when the next one starts
+            self.indicator.update(self.bar)
+            self.bar = None
+
+        if self.bar is None:
+            self.bar = np.array([start, candle[1], candle[2], candle[3], candle[4], candle[5]])
+        else:
+            self.bar[2] = candle[2]
+            self.bar[3] = max(self.bar[3], candle[3])
+            self.bar[4] = min(self.bar[4], candle[4])
+            self.bar[5] += candle[5]
+
+        if candle[0] + self.base_timeframe_ms >= start + self.timeframe_ms:
+            self.indicator.update(self.bar)
+            self.bar = None
+        self._current = None
+
+    @property
+    def closed(self):
+        """
+        Indicator value as of the last closed higher-timeframe bar
+        """
+        return self.indicator.value
+
+    @property
+    def current(self):
+        """
+        Indicator value including the partially formed higher-timeframe bar
+        """
+        if self.bar is None:
+            return self.indicator.value
+        if self._current is None:
+            self._current = self.indicator.peek(self.bar)
+        return self._current
+
+    @property
+    def value(self):
+        return self.closed
+
+
+def resample_candles(candles: np.ndarray, timeframe: str) -> np.ndarray:
+    """
+    Batch resampling of candles into a higher timeframe. Bars are aligned on multiples of the
+    timeframe since the epoch (UTC midnight for '1D'); the last bar may be partially formed.
+    :param candles: np.ndarray
+    :param timeframe: str
+    :return: np.ndarray
+    """
+    if len(candles) == 0:
+        return np.empty((0, 6))
+
+    timeframe_ms = timeframe_to_one_minutes(timeframe) * 60_000
+    starts = candles[:, 0] - candles[:, 0] % timeframe_ms
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:] - 1, len(candles) - 1]
+
+    resampled = np.empty((len(first), 6))
+    resampled[:, 0] = starts[first]
+    resampled[:, 1] = candles[first, 1]
+    resampled[:, 2] = candles[last, 2]
+    resampled[:, 3] = np.maximum.reduceat(candles[:, 3], first)
+    resampled[:, 4] = np.minimum.reduceat(candles[:, 4], first)
+    resampled[:, 5] = np.add.reduceat(candles[:, 5], first)
+    return resampled
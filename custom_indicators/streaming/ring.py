@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the most recent values. Indexing mirrors the tail of a sequential
+    indicator array: [-1] is the latest value, [-2] the one before it.
+    :param size: int - number of values kept
+    """
+
+    def __init__(self, size: int = 2):
+        self.size = size
+        self._data = np.full(size, np.nan)
+        self._count = 0
+
+    def append(self, value: float) -> None:
+        self._data[self._count % self.size] = value
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.size)
+
+    def __getitem__(self, index: int) -> float:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('RingBuffer index out of range')
+        return self._data[(self._count - length + index) % self.size]
+
+    def to_array(self) -> np.ndarray:
+        """
+        :return: np.ndarray - retained values, oldest first
+        """
+        length = len(self)
+        return np.roll(self._data, -(self._count % self.size))[self.size - length:] if length else np.empty(0)
+
+
+class CandleRing:
+    """
+    Fixed-size buffer of the most recent candles in jesse's [timestamp, open, close, high,
+    low, volume] layout, preallocated so appending never allocates
+    :param size: int - number of candles kept
+    """
+
+    def __init__(self, size: int = 1440):
+        self.size = size
+        self._data = np.full((size, 6), np.nan)
+        self._count = 0
+
+    def append(self, candle) -> None:
+        self._data[self._count % self.size] = candle
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.size)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('CandleRing index out of range')
+        return self._data[(self._count - length + index) % self.size]
+
+    def to_array(self) -> np.ndarray:
+        """
+        :return: np.ndarray - (n, 6) copy of the retained candles, oldest first
+        """
+        length = len(self)
+        start = (self._count - length) % self.size
+        return np.concatenate([self._data[start:], self._data[:start]])[:length] if length == self.size else self._data[:length].copy()
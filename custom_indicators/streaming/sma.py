@@ -0,0 +1,42 @@
+import numpy as np
+from jesse.helpers import get_candle_source
+
+from .base import CandleStream
+from .ring import RingBuffer
+
+
+class SMAStream(CandleStream):
+    """
+    Incremental SMA - Simple Moving Average, kept as a running sum over a fixed window. The
+    sum is rebuilt from the window once per period to stop floating point drift.
+    :param period: int - default: 5
+    :param source_type: str - default: "close"
+    :param history: int - number of recent values kept in self.values - default: 2
+    """
+
+    def __init__(self, period: int = 5, source_type: str = "close", history: int = 2):
+        self.period = period
+        self.source_type = source_type
+        self.history = history
+        super().__init__()
+
+    def reset(self) -> None:
+        self.window = np.zeros(self.period)
+        self.total = 0.0
+        self.count = 0
+        self.values = RingBuffer(self.history)
+
+    def _update(self, candle: np.ndarray) -> None:
+        source = get_candle_source(candle[None, :], self.source_type)[0]
+        slot = self.count % self.period
+        self.total += source - self.window[slot]
+        self.window[slot] = source
+        self.count += 1
+        if slot == self.period - 1:
+            self.total = self.window.sum()
+
+        self.values.append(self.total / self.period if self.count >= self.period else np.nan)
+
+    @property
+    def value(self) -> float:
+        return self.values[-1] if len(self.values) else np.nan
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .atr import ATRStream
+from .base import CandleStream
+from .ring import RingBuffer
+
+SuperTrend = namedtuple('SuperTrend', ['trend', 'changed'])
+
+
+class SupertrendStream(CandleStream):
+    """
+    Incremental SuperTrend. Follows jesse's supertrend: the trend is 0 until the ATR is
+    available, the upper band only falls during a downtrend and the lower band only rises
+    during an uptrend.
+    :param period: int - default: 10
+    :param factor: float - default: 3
+    :param history: int - number of recent values kept in self.trend/changed - default: 2
+    """
+
+    def __init__(self, period: int = 10, factor: float = 3, history: int = 2):
+        self.period = period
+        self.factor = factor
+        self.history = history
+        super().__init__()
+
+    def reset(self) -> None:
+        self.atr = ATRStream(self.period, history=1)
+        self.previous_close = np.nan
+        self.upper_band = self.lower_band = np.nan
+        self.current_trend = 0.0
+        self.trend = RingBuffer(self.history)
+        self.changed = RingBuffer(self.history)
+
+    def _update(self, candle: np.ndarray) -> None:
+        atr = self.atr.update(candle)
+        close = candle[2]
+        hl2 = (candle[3] + candle[4]) / 2
+        upper_band = hl2 + self.factor * atr
+        lower_band = hl2 - self.factor * atr
+        trend, changed = 0.0, 0.0
+
+        if not np.isnan(atr):
+            first = np.isnan(self.upper_band)
+            if self.previous_close <= self.upper_band:
+                upper_band = min(upper_band, self.upper_band)
+            if self.previous_close >= self.lower_band:
+                lower_band = max(lower_band, self.lower_band)
+
+            if first:
+                trend = upper_band if close <= upper_band else lower_band
+            elif self.current_trend == self.upper_band:
+                if close > upper_band:
+                    trend, changed = lower_band, 1.0
+                else:
+                    trend = upper_band
+            elif self.current_trend == self.lower_band:
+                if close < lower_band:
+                    trend, changed = upper_band, 1.0
+                else:
+                    trend = lower_band
+
+        self.previous_close = close
+        self.upper_band, self.lower_band = upper_band, lower_band
+        self.current_trend = trend
+        self.trend.append(trend)
+        self.changed.append(changed)
+
+    @property
+    def value(self) -> SuperTrend:
+        return SuperTrend(self.current_trend, self.changed[-1] if len(self.changed) else 0.0)
@@ -0,0 +1,194 @@
+import asyncio
+import csv
+from collections import namedtuple
+
+import numpy as np
+from jesse.helpers import timeframe_to_one_minutes
+
+from .ring import CandleRing
+from ..sessions import DAY_MS, session_ids_from_timestamps, session_start
+
+TradeUpdate = namedtuple('TradeUpdate', ['timestamp', 'price', 'qty', 'vwap', 'dev', 'closed'])
+
+
+class TradeAggregator:
+    """
+    Builds candles from a live trade stream and updates the session VWAP and its deviation
+    with every trade, so VWAP strategies can react intrabar instead of at candle closes:
+
+        aggregator = TradeAggregator('1m', interval='Day')
+        asyncio.create_task(aggregator.run(replay_trades('storage/trades/BTC-USDT.csv')))
+        async for update in aggregator:
+            ... update.vwap, update.dev, update.closed (the candle the trade closed, or None)
+
+    Closed candles are kept in a preallocated CandleRing and updates go through a bounded
+    queue: when consumers fall behind, put() waits until they catch up instead of buffering
+    without limit, so memory stays constant however long it runs. Minutes without trades are
+    filled with flat zero-volume candles, as jesse does. Trades older than the forming candle
+    are counted in late_trades and left out of the candles; they still count towards the VWAP
+    when they belong to the current session.
+    :param timeframe: str - candle timeframe - default: '1m'
+    :param capacity: int - closed candles kept - default: 1440
+    :param interval: str - VWAP session, 'Day', 'Week', or 'Month' - default: 'Day'
+    :param queue_size: int - updates waiting for consumers before put() blocks - default: 1024
+    """
+
+    def __init__(self, timeframe: str = '1m', capacity: int = 1440, interval: str = 'Day', queue_size: int = 1024):
+        self.timeframe_ms = timeframe_to_one_minutes(timeframe) * 60_000
+        self.interval = interval
+        self.candles = CandleRing(capacity)
+        self.candle = None
+        self.queue = asyncio.Queue(queue_size)
+        self.late_trades = 0
+
+        self.session_start = self.session_end = None
+        self.sum_pv = self.sum_v = self.sum_v2 = 0.0
+        self.vwap = self.dev = np.nan
+
+    def add(self, price: float, qty: float, timestamp: int) -> TradeUpdate:
+        """
+        Apply one trade without going through the queue
+        :param price: float
+        :param qty: float - base asset quantity
+        :param timestamp: int - milliseconds
+        :return: TradeUpdate
+        """
+        if self.session_end is None or timestamp >= self.session_end:
+            self._new_session(timestamp)
+        if timestamp >= self.session_start:
+            self.sum_pv += price * qty
+            self.sum_v += qty
+            self.sum_v2 += qty * (price * price)
+            if self.sum_v > 0:
+                self.vwap = self.sum_pv / self.sum_v
+                self.dev = np.sqrt(max(self.sum_v2 / self.sum_v - self.vwap * self.vwap, 0))
+
+        return TradeUpdate(timestamp, price, qty, self.vwap, self.dev, self._add_to_candle(price, qty, timestamp))
+
+    async def put(self, price: float, qty: float, timestamp: int) -> TradeUpdate:
+        """
+        Apply one trade and queue its update, waiting while the queue is full
+        """
+        update = self.add(price, qty, timestamp)
+        await self.queue.put(update)
+        return update
+
+    async def run(self, trades) -> None:
+        """
+        Feed an async iterable of (price, qty, timestamp) trades, then signal the end to consumers
+        """
+        try:
+            async for price, qty, timestamp in trades:
+                await self.put(price, qty, timestamp)
+        finally:
+            await self.queue.put(None)
+
+    async def get(self):
+        """
+        :return: TradeUpdate, or None once run() has finished
+        """
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> TradeUpdate:
+        update = await self.queue.get()
+        if update is None:
+            raise StopAsyncIteration
+        return update
+
+    def to_array(self) -> np.ndarray:
+        """
+        Retained closed candles followed by the forming one, in jesse's layout
+        :return: np.ndarray
+        """
+        closed = self.candles.to_array()
+        return closed if self.candle is None else np.vstack([closed, self.candle])
+
+    def _add_to_candle(self, price: float, qty: float, timestamp: int):
+        start = timestamp - timestamp % self.timeframe_ms
+        candle = self.candle
+        if candle is not None and start < candle[0]:
+            self.late_trades += 1
+            return None
+
+        closed = None
+        if candle is not None and start > candle[0]:
+            closed = candle.copy()
+            self.candles.append(candle)
+            # flat candles for the periods without trades, at most a ring's worth
+            gap = int((start - candle[0]) // self.timeframe_ms) - 1
+            for empty in range(max(gap - self.candles.size, 0) + 1, gap + 1):
+                close = candle[2]
+                self.candles.append((candle[0] + empty * self.timeframe_ms, close, close, close, close, 0.0))
+            candle = None
+
+        if candle is None:
+            self.candle = np.array([start, price, price, price, price, qty], dtype=np.float64)
+        else:
+            candle[2] = price
+            if price > candle[3]:
+                candle[3] = price
+            if price < candle[4]:
+                candle[4] = price
+            candle[5] += qty
+        return closed
+
+    def _new_session(self, timestamp: int) -> None:
+        self.session_start = session_start(timestamp, self.interval)
+        self.session_end = _session_end(self.session_start, self.interval)
+        self.sum_pv = self.sum_v = self.sum_v2 = 0.0
+        self.vwap = self.dev = np.nan
+
+
+def _session_end(start: int, interval: str) -> int:
+    if interval == 'Day':
+        return start + DAY_MS
+    elif interval == 'Week':
+        return start + 7 * DAY_MS
+    month = int(session_ids_from_timestamps(np.array([start]), interval)[0])
+    return int(np.datetime64(month + 1, 'M').astype('datetime64[ms]').astype(np.int64))
+
+
+async def replay_trades(path: str, speed: float = None, chunk_size: int = 65_536):
+    """
+    Recorded trades as an async iterator of (price, qty, timestamp), for testing offline.
+    .npy files hold an (n, 3) [timestamp, price, qty] array and are memory-mapped; anything
+    else is read as CSV with timestamp,price,qty columns and an optional header. Either way only
+    one chunk is in memory at a time.
+    :param path: str
+    :param speed: float - replay speed relative to the recorded timestamps, None for as fast as possible
+    :param chunk_size: int - trades read at a time
+    """
+    previous = None
+    for chunk in _trade_chunks(path, chunk_size):
+        for timestamp, price, qty in chunk:
+            if speed is not None and previous is not None and timestamp > previous:
+                await asyncio.sleep((timestamp - previous) / 1000 / speed)
+            previous = timestamp
+            yield float(price), float(qty), int(timestamp)
+        # hand control to consumers at least once per chunk
+        await asyncio.sleep(0)
+
+
+def _trade_chunks(path: str, chunk_size: int):
+    if path.endswith('.npy'):
+        trades = np.load(path, mmap_mode='r')
+        for start in range(0, len(trades), chunk_size):
+            yield np.array(trades[start:start + chunk_size]).tolist()
+        return
+
+    with open(path, newline='') as f:
+        chunk = []
+        for row in csv.reader(f):
+            try:
+                chunk.append((float(row[0]), float(row[1]), float(row[2])))
+            except ValueError:
+                # header
+                continue
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
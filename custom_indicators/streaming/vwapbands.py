@@ -0,0 +1,83 @@
+import numpy as np
+from jesse.helpers import get_candle_source
+
+from .base import CandleStream
+from ..sessions import session_ids_from_timestamps
+from ..vwapbands import VWAPBands
+
+
+class VWAPBandsStream(CandleStream):
+    """
+    Incremental VWAP with Standard Deviation Bands. Keeps running ΣPV, ΣV and ΣV·P² for the
+    current session and resets them when a new Day/Week/Month session starts. The sums are
+    accumulated in the same order as vwapbands(), so values are identical to the batch version.
+    :param dev_multipliers: list of deviation multipliers for bands
+    :param source_type: str - default: ohlc4
+    :param interval: str - 'Day', 'Week', or 'Month' - default: 'Day'
+    """
+
+    def __init__(self, dev_multipliers: list = [1, 2, 3, 4, 5], source_type: str = "ohlc4", interval: str = 'Day'):
+        self.dev_multipliers = list(dev_multipliers)
+        self.source_type = source_type
+        self.interval = interval
+        super().__init__()
+
+    def reset(self) -> None:
+        self.session_id = None
+        self.sum_pv = 0.0
+        self.sum_v = 0.0
+        self.sum_v2 = 0.0
+        self.vwap = np.nan
+        self.dev = np.nan
+
+    def _update(self, candle: np.ndarray) -> None:
+        session_id = session_ids_from_timestamps(candle[:1], self.interval)[0]
+        if session_id != self.session_id:
+            self.session_id = session_id
+            self.sum_pv = self.sum_v = self.sum_v2 = 0.0
+
+        source = get_candle_source(candle[None, :], self.source_type)[0]
+        volume = candle[5]
+
+        self.sum_pv += source * volume
+        self.sum_v += volume
+        # x * x rather than x ** 2: numpy's scalar power rounds differently from the array square
+        self.sum_v2 += volume * (source * source)
+        self._finish()
+
+    def seed(self, candles: np.ndarray) -> VWAPBands:
+        """
+        Rebuild the state from a historical candle array. Only the current session matters,
+        so the sums are taken over that tail in a single vectorized pass.
+        :param candles: np.ndarray
+        :return: VWAPBands
+        """
+        self.timestamp = None
+        self.reset()
+        if len(candles) == 0:
+            return self.value
+
+        session_ids = session_ids_from_timestamps(candles[:, 0], self.interval)
+        session = candles[np.searchsorted(session_ids, session_ids[-1]):]
+        source = get_candle_source(session, self.source_type)
+        volume = session[:, 5]
+
+        self.session_id = session_ids[-1]
+        self.sum_pv = np.cumsum(source * volume)[-1]
+        self.sum_v = np.cumsum(volume)[-1]
+        self.sum_v2 = np.cumsum(volume * source ** 2)[-1]
+        self.timestamp = candles[-1, 0]
+        self._finish()
+        return self.value
+
+    def _finish(self) -> None:
+        self.vwap = self.sum_pv / self.sum_v
+        self.dev = np.sqrt(np.maximum(self.sum_v2 / self.sum_v - self.vwap * self.vwap, 0))
+
+    @property
+    def value(self) -> VWAPBands:
+        return VWAPBands(
+            self.vwap,
+            [self.vwap + multiplier * self.dev for multiplier in self.dev_multipliers],
+            [self.vwap - multiplier * self.dev for multiplier in self.dev_multipliers],
+        )
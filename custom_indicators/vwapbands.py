@@ -1,67 +1,183 @@
 from collections import namedtuple
 import numpy as np
 from typing import Union
-from jesse.helpers import get_candle_source, slice_candles
-from datetime import datetime, timedelta
+from jesse.helpers import get_candle_source
+
+from .sessions import session_index, session_ids_from_timestamps, session_start
 
 VWAPBands = namedtuple('VWAPBands', ['vwap', 'upper_bands', 'lower_bands'])
 
-def vwapbands(candles: np.ndarray, dev_multipliers: list = [1, 2, 3, 4, 5], source_type: str = "ohlc4", sequential: bool = False, interval: str = 'Day') -> Union[VWAPBands, float]:
+OUTPUTS = ('list', 'array', 'lazy')
+
+# candles per block of whole sessions in _vwap_dev, bounds the temporary arrays
+_BLOCK_SIZE = 1 << 16
+
+
+def vwapbands(candles: np.ndarray, dev_multipliers: list = [1, 2, 3, 4, 5], source_type: str = "ohlc4", sequential: bool = False, interval: str = 'Day',
+              levels: list = None, output: str = 'list', dtype=np.float64) -> Union[VWAPBands, 'LazyVWAPBands']:
     """
     VWAP with Standard Deviation Bands, resetting based on specified interval
     :param candles: np.ndarray
     :param dev_multipliers: list of deviation multipliers for bands
     :param source_type: str - default: ohlc4
-    :param sequential: bool - default: False
+    :param sequential: bool - default: False. When False only the current session's candles are read, all of
+        them: unlike jesse's usual 240-candle window, sessions longer than 240 candles are not cut off
     :param interval: str - 'Day', 'Week', or 'Month' - default: 'Day'
-    :return: Union[VWAPBands, float]
+    :param levels: list - indices into dev_multipliers of the bands to build - default: all
+    :param output: str - 'list': a list of arrays per side, 'array': one (k, n) array per side,
+        'lazy': a LazyVWAPBands that builds a band when it is indexed - default: 'list'
+    :param dtype: dtype of the returned values, e.g. np.float32; sums are always float64 - default: np.float64
+    :return: Union[VWAPBands, LazyVWAPBands]
     """
-    candles = slice_candles(candles, sequential)
-
-    source = get_candle_source(candles, source_type)
-    volume = candles[:, 5]
-    
-    # Get timestamps and convert to datetime
-    timestamps = candles[:, 0]
-    dates = np.array([datetime.utcfromtimestamp(ts / 1000) for ts in timestamps])
-    
-    # Initialize arrays
-    vwap = np.zeros_like(source)
-    dev = np.zeros_like(source)
-    
-    # Define interval function
-    def get_interval_key(date):
-        if interval == 'Day':
-            return date.date()
-        elif interval == 'Week':
-            return date.isocalendar()[:2]  # Year and week number
-        elif interval == 'Month':
-            return (date.year, date.month)
-        else:
-            raise ValueError("Invalid interval. Choose 'Day', 'Week', or 'Month'.")
-    
-    # Calculate VWAP and deviation for each interval
-    interval_keys = np.array([get_interval_key(date) for date in dates])
-    
-    for key in np.unique(interval_keys):
-        mask = interval_keys == key
-        interval_source = source[mask]
-        interval_volume = volume[mask]
-        
-        cumulative_pv = np.cumsum(interval_source * interval_volume)
-        cumulative_volume = np.cumsum(interval_volume)
-        
-        interval_vwap = cumulative_pv / cumulative_volume
-        interval_v2sum = np.cumsum(interval_volume * interval_source ** 2)
-        interval_dev = np.sqrt(np.maximum(interval_v2sum / cumulative_volume - interval_vwap ** 2, 0))
-        
-        vwap[mask] = interval_vwap
-        dev[mask] = interval_dev
-
-    upper_bands = [vwap + multiplier * dev for multiplier in dev_multipliers]
-    lower_bands = [vwap - multiplier * dev for multiplier in dev_multipliers]
+    if output not in OUTPUTS:
+        raise ValueError(f"output must be one of {OUTPUTS}, got {output!r}")
 
+    # Session ids come straight from the ms timestamps, no per-candle datetime objects. Full
+    # histories go through the shared session index so strategies reuse the same arrays.
     if sequential:
-        return VWAPBands(vwap, upper_bands, lower_bands)
+        session_ids = session_index(candles, interval).session_id
     else:
-        return VWAPBands(vwap[-1], [ub[-1] for ub in upper_bands], [lb[-1] for lb in lower_bands])
\ No newline at end of file
+        # The last value only depends on the current session: binary search its first candle
+        # and compute over that tail, whatever the length of the history
+        if len(candles):
+            candles = candles[np.searchsorted(candles[:, 0], session_start(candles[-1, 0], interval)):]
+        session_ids = session_ids_from_timestamps(candles[:, 0], interval)
+
+    vwap, dev = _vwap_dev(candles, source_type, session_ids)
+
+    if not sequential:
+        # only the last candle is returned, so no band is built over the whole session
+        vwap, dev = vwap[-1:], dev[-1:]
+
+    multipliers = np.asarray(dev_multipliers, dtype=np.float64)
+    if levels is not None:
+        multipliers = multipliers[list(levels)]
+
+    if output == 'lazy':
+        return LazyVWAPBands(vwap if sequential else vwap[0], dev if sequential else dev[0], multipliers, dtype)
+
+    upper_bands = _bands(vwap, dev, multipliers, 1, dtype)
+    lower_bands = _bands(vwap, dev, multipliers, -1, dtype)
+    vwap = vwap.astype(dtype, copy=False)
+
+    if not sequential:
+        vwap, upper_bands, lower_bands = vwap[0], upper_bands[:, 0], lower_bands[:, 0]
+    if output == 'list':
+        upper_bands, lower_bands = list(upper_bands), list(lower_bands)
+    return VWAPBands(vwap, upper_bands, lower_bands)
+
+
+class LazyVWAPBands:
+    """
+    VWAP and deviation, with each band built only when it is indexed: upper_bands[i] is
+    vwap + multipliers[i] * dev and lower_bands[i] is vwap - multipliers[i] * dev. Unpacks
+    like VWAPBands.
+    """
+
+    def __init__(self, vwap, dev, multipliers: np.ndarray, dtype=np.float64):
+        self._vwap = vwap
+        self._dev = dev
+        self.multipliers = multipliers
+        self.dtype = dtype
+        self.vwap = vwap.astype(dtype, copy=False)
+        self.dev = dev.astype(dtype, copy=False)
+        self.upper_bands = _LazyBands(self, 1)
+        self.lower_bands = _LazyBands(self, -1)
+
+    def band(self, level: int, side: int = 1):
+        """
+        :param level: int - index into multipliers
+        :param side: int - 1 for the upper band, -1 for the lower one
+        """
+        return (self._vwap + side * self.multipliers[level] * self._dev).astype(self.dtype, copy=False)
+
+    def __iter__(self):
+        return iter((self.vwap, self.upper_bands, self.lower_bands))
+
+
+class _LazyBands:
+    def __init__(self, bands: LazyVWAPBands, side: int):
+        self._bands = bands
+        self._side = side
+
+    def __len__(self) -> int:
+        return len(self._bands.multipliers)
+
+    def __getitem__(self, level: int):
+        return self._bands.band(level, self._side)
+
+
+def _bands(vwap: np.ndarray, dev: np.ndarray, multipliers: np.ndarray, side: int, dtype) -> np.ndarray:
+    """
+    (k, n) bands vwap + side * multiplier * dev, written row by row into one array of the
+    requested dtype with a single float64 scratch row
+    """
+    bands = np.empty((len(multipliers), len(vwap)), dtype=dtype)
+    scaled = np.empty(len(dev))
+    for row, multiplier in zip(bands, multipliers):
+        np.multiply(dev, side * multiplier, out=scaled)
+        np.add(vwap, scaled, out=row, casting='same_kind')
+    return bands
+
+
+def _vwap_dev(candles: np.ndarray, source_type: str, session_ids: np.ndarray) -> tuple:
+    """
+    VWAP and volume-weighted standard deviation from cumulative sums that reset at every session
+    boundary. The history is processed in blocks of whole sessions, so the temporaries stay
+    around _BLOCK_SIZE candles long however long the history is.
+    """
+    n = len(candles)
+    vwap = np.empty(n)
+    dev = np.empty(n)
+    if n == 0:
+        return vwap, dev
+
+    starts = np.flatnonzero(np.concatenate([[True], session_ids[1:] != session_ids[:-1]]))
+    # each block starts at the last session start at or before every multiple of the block size
+    bounds = np.unique(starts[np.searchsorted(starts, np.arange(0, n, _BLOCK_SIZE), side='right') - 1])
+
+    for first, last in zip(bounds, np.append(bounds[1:], n)):
+        block = candles[first:last]
+        source = get_candle_source(block, source_type)
+        volume = block[:, 5]
+        layout = _session_layout(session_ids[first:last])
+
+        cumulative_pv = _segmented_cumsum(source * volume, layout)
+        cumulative_volume = _segmented_cumsum(volume, layout)
+        cumulative_v2 = _segmented_cumsum(volume * source ** 2, layout)
+
+        block_vwap = np.divide(cumulative_pv, cumulative_volume, out=vwap[first:last])
+        block_dev = np.divide(cumulative_v2, cumulative_volume, out=dev[first:last])
+        np.subtract(block_dev, np.square(block_vwap), out=block_dev)
+        np.sqrt(np.maximum(block_dev, 0, out=block_dev), out=block_dev)
+    return vwap, dev
+
+
+def _session_layout(session_ids: np.ndarray) -> tuple:
+    """
+    Row (session) and column (position in the session) of every candle, and the shape of the
+    padded (sessions, longest session) matrix
+    """
+    n = len(session_ids)
+    is_start = np.empty(n, dtype=bool)
+    is_start[0] = True
+    np.not_equal(session_ids[1:], session_ids[:-1], out=is_start[1:])
+
+    starts = np.flatnonzero(is_start)
+    row = np.cumsum(is_start) - 1
+    column = np.arange(n) - starts[row]
+    longest = np.diff(np.append(starts, n)).max()
+    return row, column, (len(starts), longest)
+
+
+def _segmented_cumsum(values: np.ndarray, layout: tuple) -> np.ndarray:
+    """
+    Cumulative sum that restarts whenever the session id changes. Values are scattered into a
+    (sessions, longest session) matrix and summed along rows, so each session is accumulated
+    in the same order as a plain np.cumsum over that session alone.
+    """
+    row, column, shape = layout
+    padded = np.zeros(shape, dtype=np.float64)
+    padded[row, column] = values
+    np.cumsum(padded, axis=1, out=padded)
+    return padded[row, column]
@@ -0,0 +1,8 @@
+from .batched import batched_sma, batched_ema, batched_atr, batched_supertrend
+from .sweep import hyperparameter_grid, strategy_hyperparameters, simulate_positions, score_positions, sweep_macd_ema, sweep_villian_moving_averages
+from .jesse_runner import run_backtest, backtest_candidates
+from .vector_backtest import Trade, BacktestResult, vector_backtest, parity_check
+from .signals import SIGNALS
+from .halving import successive_halving, sample_candidates, rung_lengths
+from .runner import Job, job_grid, run_jobs
+from .montecarlo import MonteCarloResult, monte_carlo, trade_arrays
@@ -0,0 +1,122 @@
+"""
+Indicator kernels that compute one column per parameter value in a single pass over the
+candles. Matrices are time-major, shape (n candles, k parameters), and match the
+corresponding jesse indicators with sequential=True.
+"""
+import numpy as np
+
+
+def batched_sma(source: np.ndarray, periods) -> np.ndarray:
+    """
+    SMA for every period at once from one cumulative sum
+    :param source: np.ndarray - (n,)
+    :param periods: list of int
+    :return: np.ndarray - (n, len(periods)), NaN before each window is full
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    n = len(source)
+    # summing distances from the first value keeps the running total small and precise
+    offset = source[0] if n else 0.0
+    cumulative = np.concatenate([[0.0], np.cumsum(source - offset)])
+    index = np.arange(n)[:, None]
+    start = index + 1 - periods
+    result = (cumulative[index + 1] - cumulative[np.maximum(start, 0)]) / periods + offset
+    result[start < 0] = np.nan
+    return result
+
+
+def batched_ema(source: np.ndarray, periods) -> np.ndarray:
+    """
+    EMA for every period at once, seeded with the first value like jesse's ema. The recursion
+    runs once over time with all periods updated together.
+    :param source: np.ndarray - (n,) shared by all periods, or (n, len(periods)) one column each
+    :param periods: list of int
+    :return: np.ndarray - (n, len(periods))
+    """
+    alpha = 2 / (np.asarray(periods, dtype=np.float64) + 1)
+    keep = 1 - alpha
+    source = source[:, None] if source.ndim == 1 else source
+    result = np.empty((len(source), len(alpha)))
+    if not len(source):
+        return result
+
+    result[0] = source[0]
+    for t in range(1, len(source)):
+        result[t] = alpha * source[t] + keep * result[t - 1]
+    return result
+
+
+def true_range(candles: np.ndarray) -> np.ndarray:
+    high, low, close = candles[:, 3], candles[:, 4], candles[:, 2]
+    tr = high - low
+    previous_close = close[:-1]
+    tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - previous_close), np.abs(low[1:] - previous_close)))
+    return tr
+
+
+def batched_atr(candles: np.ndarray, periods) -> np.ndarray:
+    """
+    Wilder ATR for every period at once, seeded with the mean true range like jesse's atr
+    :param candles: np.ndarray
+    :param periods: list of int
+    :return: np.ndarray - (n, len(periods)), NaN before each period is complete
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    tr = true_range(candles)
+    cumulative = np.cumsum(tr)
+    result = np.full((len(candles), len(periods)), np.nan)
+
+    for t in range(len(candles)):
+        seeding = periods - 1 == t
+        if seeding.any():
+            result[t, seeding] = cumulative[t] / periods[seeding]
+        smoothing = periods - 1 < t
+        if smoothing.any():
+            p = periods[smoothing]
+            result[t, smoothing] = (result[t - 1, smoothing] * (p - 1) + tr[t]) / p
+    return result
+
+
+def batched_supertrend(candles: np.ndarray, periods, factors) -> np.ndarray:
+    """
+    SuperTrend line for (period, factor) pairs at once, following jesse's supertrend
+    :param candles: np.ndarray
+    :param periods: list of int - one entry per column
+    :param factors: list of float - one entry per column, same length as periods
+    :return: np.ndarray - (n, len(periods)), 0 before the ATR is available
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    factors = np.asarray(factors, dtype=np.float64)
+    unique_periods, column_period = np.unique(periods, return_inverse=True)
+    atr = batched_atr(candles, unique_periods)
+
+    close = candles[:, 2]
+    hl2 = (candles[:, 3] + candles[:, 4]) / 2
+    k = len(periods)
+    result = np.zeros((len(candles), k))
+    upper_previous = np.full(k, np.nan)
+    lower_previous = np.full(k, np.nan)
+    trend_previous = np.zeros(k)
+    close_previous = np.nan
+
+    for t in range(len(candles)):
+        band_atr = atr[t, column_period]
+        valid = ~np.isnan(band_atr)
+        upper = hl2[t] + factors * band_atr
+        lower = hl2[t] - factors * band_atr
+        upper = np.where(close_previous <= upper_previous, np.minimum(upper, upper_previous), upper)
+        lower = np.where(close_previous >= lower_previous, np.maximum(lower, lower_previous), lower)
+
+        first = valid & np.isnan(upper_previous)
+        was_down = valid & ~first & (trend_previous == upper_previous)
+        was_up = valid & ~first & ~was_down & (trend_previous == lower_previous)
+
+        trend = np.zeros(k)
+        trend[first] = np.where(close[t] <= upper, upper, lower)[first]
+        trend[was_down] = np.where(close[t] > upper, lower, upper)[was_down]
+        trend[was_up] = np.where(close[t] < lower, upper, lower)[was_up]
+
+        result[t] = trend
+        upper_previous, lower_previous, trend_previous = upper, lower, trend
+        close_previous = close[t]
+    return result
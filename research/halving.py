@@ -0,0 +1,220 @@
+"""
+Successive halving over a strategy's hyperparameters() space. Many candidates are backtested
+on a short prefix of the date range, the best 1 / eta of them survive to a rung eta times
+longer, and so on until the last rung covers the whole range:
+
+    results = successive_halving('VillianMovingAverages', candles, '5m', hyperparameters,
+                                 candidates=243, eta=3, cache_dir='storage/halving/villian')
+
+Candidates are evaluated in a process pool; the candles are sent to each worker once. With a
+cache_dir every finished (candidate, rung) result is appended to a journal, so calling again
+with the same arguments resumes an interrupted search without rerunning completed rungs.
+"""
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+
+_worker = {}
+
+
+def successive_halving(strategy: str, candles: np.ndarray, timeframe: str, hyperparameters: list = None, candidates=81,
+                       eta: int = 3, rungs: int = None, min_candles: int = 10_000, rank_by: str = 'sharpe_ratio',
+                       workers: int = None, cache_dir: str = None, seed: int = 0, evaluate=None, **backtest_kwargs) -> list:
+    """
+    :param strategy: str - strategy name, as in routes
+    :param candles: np.ndarray - 1m candles of the whole date range
+    :param timeframe: str - the route's timeframe
+    :param hyperparameters: list - the strategy's hyperparameters(), needed when candidates is a number
+    :param candidates: int - number of random candidates, or a list of hyperparameter dicts - default: 81
+    :param eta: int - 1 / eta of the candidates survive each rung - default: 3
+    :param rungs: int - default: as many as the candidates allow, each at least min_candles long
+    :param min_candles: int - shortest date range of the first rung, in 1m candles - default: 10000
+    :param rank_by: str - metric to maximize - default: sharpe_ratio
+    :param workers: int - processes, 0 to run in this process - default: os.cpu_count()
+    :param cache_dir: str - journal directory for resuming - default: no journal
+    :param seed: int - for sampling candidates - default: 0
+    :param evaluate: picklable callable(hp, candles) -> metrics dict - default: jesse backtest
+    :param backtest_kwargs: passed on to research.jesse_runner.run_backtest
+    :return: list of dict - hp, rung (last rung reached), candles, score and metrics, best first
+    """
+    if isinstance(candidates, int):
+        candidates = sample_candidates(hyperparameters, candidates, seed)
+    if evaluate is None:
+        evaluate = partial(_backtest_metrics, strategy=strategy, timeframe=timeframe, backtest_kwargs=backtest_kwargs)
+    lengths = rung_lengths(len(candles), len(candidates), eta, rungs, min_candles)
+
+    journal = _Journal(cache_dir, {
+        'strategy': strategy,
+        'timeframe': timeframe,
+        'candidates': candidates,
+        'lengths': lengths,
+        'eta': eta,
+        'data': _data_fingerprint(candles),
+    }) if cache_dir else None
+    results = journal.results if journal else {}
+
+    alive = list(range(len(candidates)))
+    reached = {}
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(evaluate, candles)) if workers != 0 else None
+    if pool is None:
+        _init_worker(evaluate, candles)
+    try:
+        for rung, length in enumerate(lengths):
+            pending = [i for i in alive if (_key(candidates[i]), length) not in results]
+            for i, metrics in _run(pool, candidates, pending, length):
+                results[_key(candidates[i]), length] = metrics
+                if journal:
+                    journal.append(candidates[i], length, metrics)
+
+            for i in alive:
+                reached[i] = rung
+            scores = {i: _score(results[_key(candidates[i]), length], rank_by) for i in alive}
+            if rung < len(lengths) - 1:
+                keep = max(math.ceil(len(alive) / eta), 1)
+                alive = sorted(alive, key=lambda i: -scores[i])[:keep]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary = []
+    for i, rung in reached.items():
+        metrics = results[_key(candidates[i]), lengths[rung]]
+        summary.append({'hp': candidates[i], 'rung': rung, 'candles': lengths[rung], 'score': _score(metrics, rank_by), 'metrics': metrics})
+    return sorted(summary, key=lambda result: (-result['rung'], -result['score']))
+
+
+def sample_candidates(hyperparameters: list, count: int, seed: int = 0) -> list:
+    """
+    Distinct random points of a hyperparameters() space. Ints are drawn from [min, max],
+    floats uniformly and anything with 'options' from its options.
+    :return: list of dict
+    """
+    rng = np.random.default_rng(seed)
+    candidates, seen = [], set()
+    for _ in range(count * 20):
+        hp = {}
+        for parameter in hyperparameters:
+            if 'options' in parameter:
+                hp[parameter['name']] = parameter['options'][rng.integers(len(parameter['options']))]
+            elif parameter['type'] is int:
+                hp[parameter['name']] = int(rng.integers(parameter['min'], parameter['max'] + 1))
+            else:
+                hp[parameter['name']] = float(rng.uniform(parameter['min'], parameter['max']))
+        if _key(hp) not in seen:
+            seen.add(_key(hp))
+            candidates.append(hp)
+            if len(candidates) == count:
+                break
+    return candidates
+
+
+def rung_lengths(total: int, candidates: int, eta: int = 3, rungs: int = None, min_candles: int = 10_000) -> list:
+    """
+    Date range of each rung in candles, growing eta times per rung up to total
+    """
+    if rungs is None:
+        rungs = 1
+        while eta ** rungs <= candidates and total / eta ** rungs >= min_candles:
+            rungs += 1
+    return [max(int(total / eta ** (rungs - 1 - rung)), 1) for rung in range(rungs)]
+
+
+def _run(pool, candidates: list, pending: list, length: int):
+    if pool is None:
+        for i in pending:
+            yield i, _evaluate(candidates[i], length)
+        return
+
+    futures = {pool.submit(_evaluate, candidates[i], length): i for i in pending}
+    for future in as_completed(futures):
+        yield futures[future], future.result()
+
+
+def _init_worker(evaluate, candles: np.ndarray) -> None:
+    _worker['evaluate'] = evaluate
+    _worker['candles'] = candles
+
+
+def _evaluate(hp: dict, length: int) -> dict:
+    try:
+        return _plain(_worker['evaluate'](hp, _worker['candles'][:length]))
+    except Exception as e:
+        # a failing candidate ranks last instead of stopping the search
+        return {'error': f'{type(e).__name__}: {e}'}
+
+
+def _backtest_metrics(hp: dict, candles: np.ndarray, strategy: str, timeframe: str, backtest_kwargs: dict) -> dict:
+    from .jesse_runner import run_backtest
+    return run_backtest(strategy, candles, timeframe, hyperparameters=hp, **backtest_kwargs)['metrics']
+
+
+def _score(metrics: dict, rank_by: str) -> float:
+    value = metrics.get(rank_by) if metrics else None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return -math.inf
+    return value if math.isfinite(value) else -math.inf
+
+
+def _data_fingerprint(candles: np.ndarray) -> list:
+    """
+    Length, first and last timestamp and a digest of every candle value, so a journal is only
+    resumed on the same data
+    """
+    if not len(candles):
+        return [0]
+    digest = hashlib.blake2b(np.ascontiguousarray(candles, dtype=np.float64), digest_size=16).hexdigest()
+    return [len(candles), float(candles[0, 0]), float(candles[-1, 0]), digest]
+
+
+def _key(hp: dict) -> str:
+    return json.dumps(hp, sort_keys=True)
+
+
+def _plain(metrics: dict) -> dict:
+    """
+    JSON-safe copy of a metrics dict
+    """
+    return json.loads(json.dumps(metrics, default=lambda value: value.item() if isinstance(value, np.generic) else str(value)))
+
+
+class _Journal:
+    """
+    search.json describes the search, results.jsonl holds one line per finished (candidate,
+    rung). A journal written for a different search is refused rather than mixed in.
+    """
+
+    def __init__(self, directory: str, search: dict):
+        os.makedirs(directory, exist_ok=True)
+        self.results = {}
+        self.path = os.path.join(directory, 'results.jsonl')
+        search = json.loads(json.dumps(search))
+
+        search_path = os.path.join(directory, 'search.json')
+        if os.path.exists(search_path):
+            with open(search_path) as f:
+                if json.load(f) != search:
+                    raise ValueError(f'{directory} holds a different search, use another cache_dir')
+        else:
+            with open(search_path, 'w') as f:
+                json.dump(search, f)
+
+        if os.path.exists(self.path):
+            with open(self.path, 'rb+') as f:
+                data = f.read()
+                # the last line of an interrupted run may be cut short, drop it before appending
+                f.truncate(data.rfind(b'\n') + 1)
+            for line in data.splitlines(keepends=True):
+                if line.endswith(b'\n'):
+                    entry = json.loads(line)
+                    self.results[_key(entry['hp']), entry['candles']] = entry['metrics']
+
+    def append(self, hp: dict, length: int, metrics: dict) -> None:
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'hp': hp, 'candles': length, 'metrics': metrics}) + '\n')
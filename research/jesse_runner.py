@@ -0,0 +1,49 @@
+"""
+Thin wrapper around jesse's research backtest, used to confirm screened candidates with
+the full event-driven engine.
+"""
+import numpy as np
+
+DEFAULT_CONFIG = {
+    'starting_balance': 10_000,
+    'fee': 0.001,
+    'type': 'futures',
+    'futures_leverage': 1,
+    'futures_leverage_mode': 'cross',
+    'exchange': 'Binance Perpetual Futures',
+    'warm_up_candles': 210,
+}
+
+
+def run_backtest(strategy: str, candles: np.ndarray, timeframe: str, hyperparameters: dict = None,
+                 exchange: str = 'Binance Perpetual Futures', symbol: str = 'BTC-USDT', config: dict = None,
+                 warmup_candles: np.ndarray = None, **options) -> dict:
+    """
+    Backtest one strategy on one route
+    :param strategy: str - strategy name, as in routes
+    :param candles: np.ndarray - 1m candles of the trading period
+    :param timeframe: str - the route's timeframe
+    :param warmup_candles: np.ndarray - 1m candles preceding the trading period
+    :param options: passed on to jesse.research.backtest (generate_equity_curve, ...)
+    :return: dict - jesse's result, with 'metrics'
+    """
+    from jesse.research import backtest
+
+    config = {**DEFAULT_CONFIG, 'exchange': exchange, **(config or {})}
+    routes = [{'exchange': exchange, 'strategy': strategy, 'symbol': symbol, 'timeframe': timeframe}]
+    key = f'{exchange}-{symbol}'
+    trading = {key: {'exchange': exchange, 'symbol': symbol, 'candles': np.asarray(candles)}}
+    warmup = {key: {'exchange': exchange, 'symbol': symbol, 'candles': np.asarray(warmup_candles)}} if warmup_candles is not None else None
+    return backtest(config, routes, [], trading, warmup, hyperparameters=hyperparameters, **options)
+
+
+def backtest_candidates(candidates: list, strategy: str, candles: np.ndarray, timeframe: str, **kwargs) -> list:
+    """
+    Full backtests for screened candidates, e.g. the output of research.sweep
+    :param candidates: list of dict - each with an 'hp' dict
+    :return: list of dict - the candidates with jesse's metrics added under 'backtest'
+    """
+    return [
+        {**candidate, 'backtest': run_backtest(strategy, candles, timeframe, hyperparameters=candidate['hp'], **kwargs)['metrics']}
+        for candidate in candidates
+    ]
@@ -0,0 +1,150 @@
+"""
+Monte Carlo robustness of a backtest's trade list. Every simulated path is a row of a
+(paths, trades) matrix built in one NumPy operation per chunk:
+
+- shuffle: the same trades in a random order; the final balance is unchanged, drawdowns are not
+- bootstrap: trades drawn with replacement
+- slippage and fee perturbation: a random slippage cost on each trade's traded notional and a
+  random scale of its fee, on top of either method
+
+Chunks are sized from memory_limit, so 100k paths over thousands of trades run in bounded
+memory. Equity bands are kept at band_points evenly spaced trades rather than every trade.
+
+    result = monte_carlo(*trade_arrays(vector_backtest(candles, **signals).trades), paths=100_000)
+    result.max_drawdown, result.risk_of_ruin
+"""
+from collections import namedtuple
+
+import numpy as np
+
+MonteCarloResult = namedtuple('MonteCarloResult', ['percentiles', 'trade_index', 'equity', 'final_balance', 'max_drawdown', 'risk_of_ruin', 'paths'])
+
+METHODS = ('shuffle', 'bootstrap')
+
+# (chunk, trades) buffers: order, scratch, equity, peak
+_TEMPORARIES = 4
+_MAX_CHUNK = 512
+
+
+def monte_carlo(pnl: np.ndarray, notional: np.ndarray = None, fee: np.ndarray = None, method: str = 'bootstrap', paths: int = 10_000,
+                starting_balance: float = 10_000, slippage: float = 0.0, fee_jitter: float = 0.0, ruin_level: float = 0.5,
+                percentiles: tuple = (5, 25, 50, 75, 95), band_points: int = 100, memory_limit: int = 256 * 2 ** 20,
+                seed: int = 0) -> MonteCarloResult:
+    """
+    :param pnl: np.ndarray - net profit of each trade, in order
+    :param notional: np.ndarray - traded value of each trade (entry plus exit), needed for slippage
+    :param fee: np.ndarray - fee paid on each trade, needed for fee_jitter
+    :param method: str - 'shuffle' or 'bootstrap' - default: 'bootstrap'
+    :param paths: int - default: 10_000
+    :param starting_balance: float - default: 10_000
+    :param slippage: float - each trade loses a uniform [0, 2 * slippage) fraction of its notional - default: 0
+    :param fee_jitter: float - each fee is scaled by a uniform [1 - fee_jitter, 1 + fee_jitter) - default: 0
+    :param ruin_level: float - a path is ruined once its equity falls to this fraction of the starting balance - default: 0.5
+    :param percentiles: tuple - default: (5, 25, 50, 75, 95)
+    :param band_points: int - trades at which equity bands are kept - default: 100
+    :param memory_limit: int - bytes of temporaries per chunk - default: 256 MiB
+    :param seed: int - default: 0
+    :return: MonteCarloResult - equity is (percentiles, points) at trade_index; final_balance and
+        max_drawdown (negative percent, like jesse's metric) are one value per percentile;
+        risk_of_ruin is the fraction of ruined paths
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if slippage and notional is None:
+        raise ValueError('slippage needs the notional of each trade')
+    if fee_jitter and fee is None:
+        raise ValueError('fee_jitter needs the fee of each trade')
+
+    pnl = np.asarray(pnl, dtype=np.float64)
+    notional = None if notional is None else np.asarray(notional, dtype=np.float64)
+    fee = None if fee is None else np.asarray(fee, dtype=np.float64)
+    n = len(pnl)
+    trade_index = np.unique(np.linspace(0, n, min(band_points, n + 1)).round().astype(np.int64))
+    rng = np.random.default_rng(seed)
+
+    # one set of (chunk, trades) buffers is reused by every chunk; small chunks stay in cache
+    chunk_size = min(max(int(memory_limit // ((n + 1) * 8 * _TEMPORARIES)), 1), _MAX_CHUNK, max(paths, 1))
+    order = np.empty((chunk_size, n), dtype=np.intp)
+    order[:] = np.arange(n)
+    scratch = np.empty((chunk_size, n))
+    equity_buffer = np.empty((chunk_size, n + 1))
+    peak_buffer = np.empty((chunk_size, n + 1))
+
+    equity = np.empty((paths, len(trade_index)), dtype=np.float32)
+    final_balance = np.empty(paths)
+    max_drawdown = np.empty(paths)
+    ruined = np.empty(paths, dtype=bool)
+    for start in range(0, paths, chunk_size):
+        rows = min(chunk_size, paths - start)
+        path_equity = equity_buffer[:rows]
+        _sample(rng, pnl, method, notional, fee, slippage, fee_jitter, order[:rows], scratch[:rows], peak_buffer[:rows, 1:], path_equity[:, 1:])
+        chunk = slice(start, start + rows)
+        equity[chunk], final_balance[chunk], max_drawdown[chunk], ruined[chunk] = _simulate(path_equity, peak_buffer[:rows], starting_balance, ruin_level, trade_index)
+
+    q = np.asarray(percentiles)
+    return MonteCarloResult(
+        percentiles=q,
+        trade_index=trade_index,
+        equity=np.percentile(equity, q, axis=0),
+        final_balance=np.percentile(final_balance, q),
+        # the 95th percentile is the 95% worst case, i.e. the 5th percentile of negative drawdowns
+        max_drawdown=np.percentile(max_drawdown, 100 - q),
+        risk_of_ruin=float(ruined.mean()) if paths else 0.0,
+        paths=paths,
+    )
+
+
+def trade_arrays(trades: list) -> tuple:
+    """
+    (pnl, notional, fee) arrays of research.vector_backtest trades, in monte_carlo()'s argument order
+    """
+    pnl = np.array([trade.pnl for trade in trades], dtype=np.float64)
+    notional = np.array([trade.qty * (trade.entry_price + trade.exit_price) for trade in trades], dtype=np.float64)
+    fee = np.array([trade.fee for trade in trades], dtype=np.float64)
+    return pnl, notional, fee
+
+
+def _sample(rng, pnl: np.ndarray, method: str, notional, fee, slippage: float, fee_jitter: float,
+            order: np.ndarray, scratch: np.ndarray, gathered: np.ndarray, out: np.ndarray) -> None:
+    """
+    Perturbed trade results of a chunk of paths, written to out (rows, trades). order holds a
+    permutation per row on entry, permuting it again gives a new uniformly random one.
+    """
+    n = len(pnl)
+    if method == 'shuffle':
+        rng.permuted(order, axis=1, out=order)
+    else:
+        rng.random(out=scratch)
+        scratch *= n
+        np.copyto(order, scratch, casting='unsafe')
+
+    np.take(pnl, order, out=out)
+    if slippage:
+        rng.random(out=scratch)
+        scratch *= 2 * slippage
+        scratch *= np.take(notional, order, out=gathered)
+        out -= scratch
+    if fee_jitter:
+        # pnl is net of the fee already, only the change in fee is applied
+        rng.random(out=scratch)
+        scratch *= 2 * fee_jitter
+        scratch -= fee_jitter
+        scratch *= np.take(fee, order, out=gathered)
+        out -= scratch
+
+
+def _simulate(equity: np.ndarray, peak: np.ndarray, starting_balance: float, ruin_level: float, trade_index: np.ndarray) -> tuple:
+    """
+    Equity at trade_index, final balance, max drawdown (negative percent) and ruin of each row.
+    equity holds the trade results from column 1 on and is turned into the equity curve in
+    place; peak is scratch of the same shape.
+    """
+    equity[:, 0] = 0
+    np.cumsum(equity, axis=1, out=equity)
+    equity += starting_balance
+
+    np.maximum.accumulate(equity, axis=1, out=peak)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = (np.divide(equity, peak, out=peak).min(axis=1) - 1) * 100
+    ruined = equity.min(axis=1) <= starting_balance * ruin_level
+    return equity[:, trade_index], equity[:, -1].copy(), drawdown, ruined
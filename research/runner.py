@@ -0,0 +1,158 @@
+"""
+Parallel backtests of (strategy, symbol, timeframe, hyperparameters) jobs:
+
+    jobs = job_grid(['VillianMovingAverages'], [('Binance Perpetual Futures', 'BTC-USDT'), ...], ['5m', '15m'])
+    results = run_jobs(jobs)
+
+Candles come from the CandleStore (storage/candles). Every worker opens the store once and
+reads zero-copy views of the memory-mapped files, so all processes share the same page cache
+instead of holding their own copy. Jobs are submitted longest first by candle count, so a long
+job never starts last and leaves the other cores idle, and a summary row is printed as each
+job finishes.
+"""
+import itertools
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+from jesse.helpers import timeframe_to_one_minutes
+
+from storage import CandleStore
+from storage.candle_store import DEFAULT_ROOT
+
+# start/finish are timestamps in milliseconds, None for the whole series
+Job = namedtuple('Job', ['strategy', 'exchange', 'symbol', 'timeframe', 'hp', 'start', 'finish'], defaults=(None, None, None))
+
+DEFAULT_COLUMNS = ('total', 'win_rate', 'net_profit_percentage', 'max_drawdown', 'sharpe_ratio')
+
+_worker = {}
+
+
+def job_grid(strategies: list, symbols: list, timeframes: list, hyperparameters: list = (None,), start: int = None, finish: int = None) -> list:
+    """
+    Every combination of strategies, (exchange, symbol) pairs, timeframes and hyperparameter dicts
+    :return: list of Job
+    """
+    return [Job(strategy, exchange, symbol, timeframe, hp, start, finish)
+            for strategy, (exchange, symbol), timeframe, hp in itertools.product(strategies, symbols, timeframes, hyperparameters)]
+
+
+def run_jobs(jobs: list, root: str = DEFAULT_ROOT, workers: int = None, warmup_candles: int = 210, candle_timeframe: str = '1m',
+             evaluate=None, output=sys.stdout, columns: tuple = DEFAULT_COLUMNS, **backtest_kwargs) -> list:
+    """
+    :param jobs: list of Job
+    :param root: str - CandleStore directory - default: storage/candles
+    :param workers: int - processes, 0 to run in this process - default: os.cpu_count()
+    :param warmup_candles: int - warm-up candles of the route's timeframe taken before each job's start - default: 210
+    :param candle_timeframe: str - timeframe of the stored series the backtests read - default: 1m
+    :param evaluate: picklable callable(job, candles, warmup_candles) -> metrics dict - default: jesse backtest
+    :param output: file the summary table is written to as jobs finish, None for silence - default: stdout
+    :param columns: tuple - metrics shown in the table
+    :param backtest_kwargs: passed on to research.jesse_runner.run_backtest
+    :return: list of dict - job fields plus candles, seconds and metrics (or error), in completion order
+    """
+    if evaluate is None:
+        evaluate = partial(_backtest_metrics, backtest_kwargs=backtest_kwargs)
+
+    store = CandleStore(root)
+    sizes = [_count(store, job, warmup_candles, candle_timeframe) for job in jobs]
+    ordered = [jobs[i] for i in np.argsort([-size for size in sizes], kind='stable')]
+    table = SummaryTable(output, columns)
+
+    results = []
+    initargs = (root, evaluate, warmup_candles, candle_timeframe)
+    if workers == 0:
+        _init_worker(*initargs)
+        finished = (_run_job(job) for job in ordered)
+    else:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs)
+        finished = (future.result() for future in as_completed([pool.submit(_run_job, job) for job in ordered]))
+    try:
+        for result in finished:
+            table.add(result)
+            results.append(result)
+    finally:
+        if workers != 0:
+            pool.shutdown(cancel_futures=True)
+    return results
+
+
+class SummaryTable:
+    """
+    Fixed-width table written one row at a time
+    """
+
+    def __init__(self, output=sys.stdout, columns: tuple = DEFAULT_COLUMNS):
+        self.output = output
+        self.columns = columns
+        self.rows = 0
+
+    def add(self, result: dict) -> None:
+        if self.output is None:
+            return
+        if not self.rows:
+            self._write(f'{"strategy":<24}{"symbol":<16}{"tf":<6}{"candles":>12}{"seconds":>9}' + ''.join(f'{column:>24}' for column in self.columns))
+        route = f'{result["strategy"]:<24}{result["symbol"]:<16}{result["timeframe"]:<6}{result["candles"]:>12,}{result["seconds"]:>9.1f}'
+        if 'error' in result:
+            line = f'{route}  {result["error"]}'
+        else:
+            line = route + ''.join(f'{_format(result["metrics"].get(column)):>24}' for column in self.columns)
+        if result['hp']:
+            line += '  ' + ' '.join(f'{name}={value}' for name, value in result['hp'].items())
+        self._write(line)
+        self.rows += 1
+
+    def _write(self, line: str) -> None:
+        self.output.write(line + '\n')
+        self.output.flush()
+
+
+def _format(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f'{value:,.2f}'
+    return '-' if value is None else str(value)
+
+
+def _slices(store: CandleStore, job: Job, warmup_candles: int, candle_timeframe: str) -> tuple:
+    """
+    Zero-copy (trading, warm-up) candle views of a job. Without a start, the warm-up is taken
+    from the beginning of the series.
+    """
+    candles = store.get(job.exchange, job.symbol, candle_timeframe)
+    timestamps = candles[:, 0]
+    warmup = warmup_candles * timeframe_to_one_minutes(job.timeframe) // timeframe_to_one_minutes(candle_timeframe)
+    first = min(warmup, len(candles)) if job.start is None else np.searchsorted(timestamps, job.start)
+    last = len(candles) if job.finish is None else np.searchsorted(timestamps, job.finish, side='right')
+    first = min(first, last)
+    return candles[first:last], candles[max(first - warmup, 0):first]
+
+
+def _count(store: CandleStore, job: Job, warmup_candles: int, candle_timeframe: str) -> int:
+    return len(_slices(store, job, warmup_candles, candle_timeframe)[0])
+
+
+def _init_worker(root: str, evaluate, warmup_candles: int, candle_timeframe: str) -> None:
+    _worker.update(store=CandleStore(root), evaluate=evaluate, warmup_candles=warmup_candles, candle_timeframe=candle_timeframe)
+
+
+def _run_job(job: Job) -> dict:
+    started = time.perf_counter()
+    candles, warmup = _slices(_worker['store'], job, _worker['warmup_candles'], _worker['candle_timeframe'])
+    result = {**job._asdict(), 'candles': len(candles)}
+    try:
+        if not len(candles):
+            raise ValueError(f'no candles for {job.exchange} {job.symbol} in the store')
+        result['metrics'] = _worker['evaluate'](job, candles, warmup)
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _backtest_metrics(job: Job, candles: np.ndarray, warmup_candles: np.ndarray, backtest_kwargs: dict) -> dict:
+    from .jesse_runner import run_backtest
+    return run_backtest(job.strategy, candles, job.timeframe, hyperparameters=job.hp, exchange=job.exchange, symbol=job.symbol,
+                        warmup_candles=warmup_candles if len(warmup_candles) else None, **backtest_kwargs)['metrics']
@@ -0,0 +1,81 @@
+"""
+Whole-history signal builders for the bundled strategies, in the form vector_backtest()
+takes them. Each follows the strategy's should_long/should_short/update_position logic
+bar by bar; differences from the event-driven strategy are noted per builder.
+"""
+import numpy as np
+
+import custom_indicators as cta
+from .batched import batched_atr, batched_ema, batched_sma
+
+
+def first_strategy(candles: np.ndarray, hyperparameters: dict = None) -> dict:
+    """
+    FirstStrategy: SMA 7/25/52 alignment plus a candle body larger than the ATR, 2 ATR stop,
+    3 ATR take-profit, exit when the close crosses the SMA 25, 10% of the balance per trade.
+    The strategy's ATR is computed on the last 240 candles only; the full-history ATR used here
+    differs from it by far less than a tick.
+    """
+    close, open_ = candles[:, 2], candles[:, 1]
+    sma_7, sma_25, sma_52 = batched_sma(close, [7, 25, 52]).T
+    atr = batched_atr(candles, [14])[:, 0]
+
+    return {
+        'entry_long': (sma_7 > sma_25) & (sma_25 > sma_52) & (close > open_ + atr),
+        'entry_short': (sma_7 < sma_25) & (sma_25 < sma_52) & (close < open_ - atr),
+        'exit_long': close < sma_25,
+        'exit_short': close > sma_25,
+        'stop_loss': 2 * atr,
+        'take_profit': 3 * atr,
+        'position_size': 0.1,
+    }
+
+
+def turtles(candles: np.ndarray, hyperparameters: dict = None) -> dict:
+    """
+    Turtles: break of the previous 20-bar Donchian channel, 2.5 ATR trailing stop, 3% of the
+    balance risked per trade. The short side trails its stop down like the long side trails up.
+
+    This does not match jesse's backtest of the strategy. Its update_position sets a short's
+    stop at price - 2.5 ATR, below the price. jesse submits that as a buy order that never
+    fills, so the first short stays open until the end. Trade counts differ by orders of
+    magnitude (see research/README.md), so these signals only rank Turtles candidates against
+    each other.
+    """
+    close = candles[:, 2]
+    channel = cta.donchian(candles, period=20, offset=1, sequential=True)
+    atr = batched_atr(candles, [14])[:, 0]
+
+    return {
+        'entry_long': close > channel.upperband,
+        'entry_short': close < channel.lowerband,
+        'stop_loss': 2.5 * atr,
+        'trailing_stop': True,
+        'risk_per_capital': 3,
+    }
+
+
+def macd_ema(candles: np.ndarray, hyperparameters: dict = None) -> dict:
+    """
+    MACD_EMA: long while the close is above the EMA and the MACD above its signal line,
+    closed once both turn, the whole balance per trade
+    """
+    hp = {'ema': 100, 'fastperiod': 12, 'slowperiod': 26, 'signalperiod': 9, **(hyperparameters or {})}
+    close = candles[:, 2]
+    ema, fast, slow = batched_ema(close, [hp['ema'], hp['fastperiod'], hp['slowperiod']]).T
+    macd = fast - slow
+    signal = batched_ema(macd, [hp['signalperiod']])[:, 0]
+
+    return {
+        'entry_long': (close > ema) & (macd > signal),
+        'exit_long': (macd < signal) & (close < ema),
+        'position_size': 1.0,
+    }
+
+
+# keyed by strategy directory name, as used in routes
+SIGNALS = {
+    'FirstStrategy': first_strategy,
+    'Turtles': turtles,
+    'MACDEMA': macd_ema,
+}
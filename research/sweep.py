@@ -0,0 +1,210 @@
+"""
+Batched hyperparameter screening. Indicator arrays are computed once per parameter value,
+entry/exit signals for every combination are built as (time, combination) matrices and
+scored with a simple fill model:
+
+- orders fill at the close of the bar that signalled them
+- a position held at bar t earns the close-to-close return of bar t + 1
+- fee_rate is paid on the traded notional on every entry and exit
+- stop-loss and take-profit orders are not simulated
+
+This is meant to rank the hyperparameters() space quickly; only the top candidates need
+a full jesse backtest (see research.jesse_runner).
+"""
+import numpy as np
+
+from custom_indicators import resample_candles
+from .batched import batched_ema, batched_sma, batched_supertrend
+
+
+def hyperparameter_grid(hyperparameters: list, step: dict = None) -> dict:
+    """
+    Every combination of a strategy's hyperparameters() as flat arrays, one per name. The
+    last hyperparameter varies fastest.
+    :param hyperparameters: list - the strategy's hyperparameters()
+    :param step: dict - name -> step between values - default: 1 for every name
+    :return: dict - name -> np.ndarray
+    """
+    step = step or {}
+    axes = [np.arange(hp['min'], hp['max'] + step.get(hp['name'], 1) / 2, step.get(hp['name'], 1)).astype(hp['type']) for hp in hyperparameters]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return {hp['name']: values.ravel() for hp, values in zip(hyperparameters, mesh)}
+
+
+def strategy_hyperparameters(strategy_class) -> list:
+    """
+    hyperparameters() of a strategy class, without going through jesse's Strategy.__init__
+    """
+    return strategy_class.hyperparameters(strategy_class.__new__(strategy_class))
+
+
+def simulate_positions(entry_long: np.ndarray, exit_long: np.ndarray, entry_short: np.ndarray = None, exit_short: np.ndarray = None) -> np.ndarray:
+    """
+    Position held after each bar for every column, with jesse's order of decisions: entries
+    are only considered while flat (long before short) and exits only while in a position.
+    Runs once over time with all columns updated together.
+    :param entry_long: np.ndarray - (n, k) bool
+    :param exit_long: np.ndarray - (n, k) bool
+    :param entry_short: np.ndarray - (n, k) bool - default: never
+    :param exit_short: np.ndarray - (n, k) bool - default: never
+    :return: np.ndarray - (n, k) int8, 1 long, -1 short, 0 flat
+    """
+    positions = np.zeros(entry_long.shape, dtype=np.int8)
+    position = np.zeros(entry_long.shape[1], dtype=np.int8)
+
+    for t in range(len(entry_long)):
+        flat = position == 0
+        long_ = position == 1
+        short = position == -1
+        position = position.copy()
+        position[flat & entry_long[t]] = 1
+        if entry_short is not None:
+            position[flat & ~entry_long[t] & entry_short[t]] = -1
+        position[long_ & exit_long[t]] = 0
+        if exit_short is not None:
+            position[short & exit_short[t]] = 0
+        positions[t] = position
+    return positions
+
+
+def score_positions(positions: np.ndarray, close: np.ndarray, fee_rate: float = 0.001) -> dict:
+    """
+    Score position matrices with the simple fill model
+    :param positions: np.ndarray - (n, k) from simulate_positions()
+    :param close: np.ndarray - (n,)
+    :param fee_rate: float - default: 0.001
+    :return: dict - total_return, max_drawdown, trades; one value per column
+    """
+    bar_returns = np.zeros(len(close))
+    bar_returns[1:] = close[1:] / close[:-1] - 1
+
+    # one pass over time keeps memory at a few vectors of k instead of (n, k) float matrices
+    k = positions.shape[1]
+    equity = np.ones(k)
+    peak = np.ones(k)
+    max_drawdown = np.zeros(k)
+    trades = np.zeros(k, dtype=np.int64)
+    previous = np.zeros(k, dtype=np.int8)
+    for t in range(len(positions)):
+        position = positions[t]
+        equity *= 1 + previous * bar_returns[t] - np.abs(position - previous) * fee_rate
+        np.maximum(peak, equity, out=peak)
+        np.minimum(max_drawdown, equity / peak - 1, out=max_drawdown)
+        trades += (position != 0) & (position != previous)
+        previous = position
+
+    return {
+        'total_return': equity - 1,
+        'max_drawdown': max_drawdown,
+        'trades': trades,
+    }
+
+
+def sweep_macd_ema(candles: np.ndarray, hyperparameters: list, step: dict = None, fee_rate: float = 0.001,
+                   top: int = 20, rank_by: str = 'total_return', chunk_size: int = 2048) -> list:
+    """
+    Screen MACD_EMA's hyperparameter space: every EMA period and every MACD fast/slow period
+    is computed once for all combinations.
+    :param candles: np.ndarray - candles of the route's timeframe
+    :param hyperparameters: list - MACD_EMA's hyperparameters()
+    :return: list of dict - the best `top` combinations, best first
+    """
+    grid = hyperparameter_grid(hyperparameters, step)
+    close = candles[:, 2]
+    periods = np.unique(np.concatenate([grid['ema'], grid['fastperiod'], grid['slowperiod']]))
+    emas = batched_ema(close, periods)
+    column = {period: i for i, period in enumerate(periods)}
+
+    def signals(combination):
+        macd_keys = np.stack([grid['fastperiod'][combination], grid['slowperiod'][combination], grid['signalperiod'][combination]], axis=1)
+        unique_macd, macd_column = np.unique(macd_keys, axis=0, return_inverse=True)
+        macd = emas[:, [column[p] for p in unique_macd[:, 0]]] - emas[:, [column[p] for p in unique_macd[:, 1]]]
+        signal = batched_ema(macd, unique_macd[:, 2])
+
+        # compare on the distinct columns, then spread the (1 byte) results over the combinations
+        ema_columns = np.array([column[p] for p in grid['ema'][combination]])
+        unique_ema, ema_column = np.unique(ema_columns, return_inverse=True)
+        above_ema = close[:, None] > emas[:, unique_ema]
+        below_ema = close[:, None] < emas[:, unique_ema]
+
+        entry_long = above_ema[:, ema_column] & (macd > signal)[:, macd_column]
+        exit_long = (macd < signal)[:, macd_column] & below_ema[:, ema_column]
+        return entry_long, exit_long, None, None
+
+    return _sweep(grid, signals, close, fee_rate, top, rank_by, chunk_size)
+
+
+def sweep_villian_moving_averages(candles: np.ndarray, hyperparameters: list, step: dict = None, fee_rate: float = 0.001,
+                                  top: int = 20, rank_by: str = 'total_return', chunk_size: int = 2048) -> list:
+    """
+    Screen VillianMovingAverages' hyperparameter space. SMAs are computed once for every
+    period and the base and daily SuperTrend once for every (period, factor) pair. The daily
+    SuperTrend uses the last closed day, not the forming one the strategy reads.
+    :param candles: np.ndarray - candles of the route's timeframe
+    :param hyperparameters: list - VillianMovingAverages' hyperparameters()
+    :return: list of dict - the best `top` combinations, best first
+    """
+    grid = hyperparameter_grid(hyperparameters, step)
+    close = candles[:, 2]
+
+    sma_periods = np.unique(np.concatenate([grid['sma_period_7'], grid['sma_period_25'], grid['sma_period_52']]))
+    smas = batched_sma(close, sma_periods)
+    sma_column = {period: i for i, period in enumerate(sma_periods)}
+
+    trend_keys = np.stack([grid['supertrend_period'], grid['supertrend_factor']], axis=1)
+    unique_trend, trend_column = np.unique(trend_keys, axis=0, return_inverse=True)
+    trend = batched_supertrend(candles, unique_trend[:, 0], unique_trend[:, 1])
+    daily_trend = _closed_daily_trend(candles, unique_trend)
+
+    def signals(combination):
+        sma_7 = smas[:, [sma_column[p] for p in grid['sma_period_7'][combination]]]
+        sma_25 = smas[:, [sma_column[p] for p in grid['sma_period_25'][combination]]]
+        sma_52 = smas[:, [sma_column[p] for p in grid['sma_period_52'][combination]]]
+        base = trend[:, trend_column[combination]]
+        daily = daily_trend[:, trend_column[combination]]
+        price = close[:, None]
+
+        previous_7 = np.vstack([np.full((1, len(combination)), np.nan), sma_7[:-1]])
+        previous_25 = np.vstack([np.full((1, len(combination)), np.nan), sma_25[:-1]])
+        cross_over = (previous_7 <= previous_25) & (sma_7 > sma_25)
+        cross_under = (previous_7 >= previous_25) & (sma_7 < sma_25)
+
+        entry_long = (sma_25 > sma_52) & cross_over & (base < price) & (daily < price)
+        entry_short = (sma_25 < sma_52) & cross_under & (base > price) & (daily > price)
+        return entry_long, price < sma_25, entry_short, price > sma_25
+
+    return _sweep(grid, signals, close, fee_rate, top, rank_by, chunk_size)
+
+
+def _closed_daily_trend(candles: np.ndarray, trend_keys: np.ndarray) -> np.ndarray:
+    """
+    Daily SuperTrend of the last closed day at every base candle. Like jesse's supertrend it is
+    0 until enough days have closed.
+    """
+    daily = resample_candles(candles, '1D')
+    daily_trend = batched_supertrend(daily, trend_keys[:, 0], trend_keys[:, 1])
+    day = np.searchsorted(daily[:, 0], candles[:, 0], side='right') - 1
+    closed = np.vstack([np.zeros((1, len(trend_keys))), daily_trend])
+    return closed[day]
+
+
+def _sweep(grid: dict, signals, close: np.ndarray, fee_rate: float, top: int, rank_by: str, chunk_size: int) -> list:
+    names = list(grid)
+    total = len(grid[names[0]])
+    best_index = np.empty(0, dtype=np.int64)
+    best_metrics = {}
+
+    for start in range(0, total, chunk_size):
+        combination = np.arange(start, min(start + chunk_size, total))
+        metrics = score_positions(simulate_positions(*signals(combination)), close, fee_rate)
+
+        best_index = np.concatenate([best_index, combination])
+        best_metrics = {key: np.concatenate([best_metrics.get(key, value[:0]), value]) for key, value in metrics.items()}
+        keep = np.argsort(-best_metrics[rank_by], kind='stable')[:top]
+        best_index = best_index[keep]
+        best_metrics = {key: value[keep] for key, value in best_metrics.items()}
+
+    return [
+        {'hp': {name: grid[name][i].item() for name in names}, **{key: value[rank].item() for key, value in best_metrics.items()}}
+        for rank, i in enumerate(best_index)
+    ]
@@ -0,0 +1,202 @@
+"""
+Fast-path backtester for strategies whose decisions can be precomputed as arrays. Python
+only iterates over trades; finding each trade's exit (signal, stop-loss or take-profit) is
+a vectorized scan, so the cost is driven by the number of trades rather than candles.
+
+Fill model, kept close to jesse's backtest:
+
+- entries are market orders at the close of the signalling bar, only while flat
+- stop-loss and take-profit fill at their price during later bars; when both are touched in
+  the same bar the stop-loss is assumed to fill first
+- exit signals fill at the close of their bar
+- after a stop-loss/take-profit the strategy may enter again at the close of the same bar,
+  after an exit signal only from the next bar on
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from custom_indicators import resample_candles
+from .signals import SIGNALS
+
+Trade = namedtuple('Trade', ['side', 'entry_index', 'exit_index', 'entry_price', 'exit_price', 'qty', 'pnl', 'fee', 'exit_reason'])
+BacktestResult = namedtuple('BacktestResult', ['trades', 'equity', 'metrics'])
+
+_SCAN_WINDOW = 16
+
+
+def vector_backtest(candles: np.ndarray, entry_long: np.ndarray = None, entry_short: np.ndarray = None,
+                    exit_long: np.ndarray = None, exit_short: np.ndarray = None,
+                    stop_loss: np.ndarray = None, take_profit: np.ndarray = None, trailing_stop: bool = False,
+                    position_size: float = 1.0, risk_per_capital: float = None,
+                    starting_balance: float = 10_000, fee_rate: float = 0.001, start_index: int = 0) -> BacktestResult:
+    """
+    :param candles: np.ndarray
+    :param entry_long: np.ndarray - bool per candle
+    :param entry_short: np.ndarray - bool per candle
+    :param exit_long: np.ndarray - bool per candle, close a long at this bar's close
+    :param exit_short: np.ndarray - bool per candle, close a short at this bar's close
+    :param stop_loss: np.ndarray - stop distance from the close per candle, e.g. 2.5 * ATR
+    :param take_profit: np.ndarray - take-profit distance from the entry price per candle
+    :param trailing_stop: bool - move the stop to close -/+ stop_loss after every bar, never loosening it
+    :param position_size: float - fraction of the balance used as position notional - default: 1.0
+    :param risk_per_capital: float - percent of the balance risked down to the stop instead of position_size
+    :param starting_balance: float - default: 10_000
+    :param fee_rate: float - default: 0.001
+    :param start_index: int - first candle allowed to open a trade, e.g. the end of a warm-up period
+    :return: BacktestResult(trades, equity, metrics)
+    """
+    n = len(candles)
+    close, high, low = candles[:, 2], candles[:, 3], candles[:, 4]
+    never = np.zeros(n, dtype=bool)
+    entry_long = never if entry_long is None else np.asarray(entry_long, dtype=bool)
+    entry_short = never if entry_short is None else np.asarray(entry_short, dtype=bool)
+    exit_long = never if exit_long is None else np.asarray(exit_long, dtype=bool)
+    exit_short = never if exit_short is None else np.asarray(exit_short, dtype=bool)
+
+    next_entry = _next_true(entry_long | entry_short)
+    next_exit_long = _next_true(exit_long)
+    next_exit_short = _next_true(exit_short)
+
+    balance = starting_balance
+    equity = np.empty(n)
+    trades = []
+    i = start_index
+    equity[:i] = balance
+
+    while True:
+        j = next_entry[i]
+        if j == n:
+            break
+        equity[i:j + 1] = balance
+
+        side = 1 if entry_long[j] else -1
+        entry_price = close[j]
+        stop_distance = stop_loss[j] if stop_loss is not None else np.nan
+        if risk_per_capital is not None and stop_distance > 0:
+            qty = min(balance * risk_per_capital / 100 / stop_distance, balance / entry_price)
+        else:
+            qty = balance * position_size / entry_price
+        take_profit_price = entry_price + side * take_profit[j] if take_profit is not None else np.nan
+
+        signal_index = (next_exit_long if side == 1 else next_exit_short)[j + 1]
+        exit_index, exit_price, reason = _find_exit(
+            j, side, signal_index, close, high, low, stop_loss,
+            entry_price - side * stop_distance, trailing_stop, take_profit_price,
+        )
+
+        fee = fee_rate * qty * (entry_price + exit_price)
+        pnl = side * qty * (exit_price - entry_price) - fee
+        equity[j + 1:exit_index] = balance + side * qty * (close[j + 1:exit_index] - entry_price)
+        balance += pnl
+        equity[exit_index] = balance
+        trades.append(Trade('long' if side == 1 else 'short', j, exit_index, entry_price, exit_price, qty, pnl, fee, reason))
+
+        i = exit_index if reason in ('stop_loss', 'take_profit') else exit_index + 1
+
+    if i < n:
+        equity[i:] = balance
+    return BacktestResult(trades, equity, _metrics(trades, equity, starting_balance))
+
+
+def _find_exit(j: int, side: int, signal_index: int, close, high, low, stop_loss, stop_price: float, trailing_stop: bool, take_profit_price: float):
+    """
+    Exit of the trade entered at bar j: the first stop-loss or take-profit hit before the next
+    exit signal, scanned in growing vectorized windows, else the exit signal itself
+    """
+    n = len(close)
+    last = min(signal_index, n - 1)
+    start = j + 1
+    window = _SCAN_WINDOW
+    trailing = trailing_stop and stop_loss is not None
+
+    while start <= last:
+        end = min(start + window, last + 1)
+        if trailing:
+            # the stop active during bar k was set at the close of bar k - 1
+            trail = close[start - 1:end - 1] - side * stop_loss[start - 1:end - 1]
+            if side == 1:
+                stops = np.maximum(np.maximum.accumulate(trail), stop_price)
+            else:
+                stops = np.minimum(np.minimum.accumulate(trail), stop_price)
+            stop_price = stops[-1]
+        else:
+            stops = stop_price
+
+        if side == 1:
+            hit = (low[start:end] <= stops) | (high[start:end] >= take_profit_price)
+        else:
+            hit = (high[start:end] >= stops) | (low[start:end] <= take_profit_price)
+
+        if hit.any():
+            k = start + np.argmax(hit)
+            stop = stops[k - start] if trailing else stops
+            if (low[k] <= stop) if side == 1 else (high[k] >= stop):
+                return k, stop, 'stop_loss'
+            return k, take_profit_price, 'take_profit'
+
+        start = end
+        window *= 2
+
+    if signal_index < n:
+        return signal_index, close[signal_index], 'signal'
+    return n - 1, close[n - 1], 'end'
+
+
+def _next_true(flags: np.ndarray) -> np.ndarray:
+    """
+    Index of the first True at or after every position, n where there is none; length n + 1
+    """
+    n = len(flags)
+    index = np.where(flags, np.arange(n), n)
+    return np.append(np.minimum.accumulate(index[::-1])[::-1], n)
+
+
+def _metrics(trades: list, equity: np.ndarray, starting_balance: float) -> dict:
+    pnl = np.array([trade.pnl for trade in trades])
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    return {
+        'total': len(trades),
+        'win_rate': float((pnl > 0).mean()) if len(pnl) else 0.0,
+        'net_profit': float(pnl.sum()),
+        'net_profit_percentage': float(pnl.sum() / starting_balance * 100),
+        'max_drawdown': float(((equity - peak) / peak).min() * 100) if len(equity) else 0.0,
+        'fee': float(sum(trade.fee for trade in trades)),
+        'longs_count': sum(trade.side == 'long' for trade in trades),
+        'shorts_count': sum(trade.side == 'short' for trade in trades),
+    }
+
+
+def parity_check(strategy: str, candles: np.ndarray, timeframe: str, warmup_candles: np.ndarray = None,
+                 hyperparameters: dict = None, signals=None, starting_balance: float = 10_000, fee_rate: float = 0.001, **kwargs) -> dict:
+    """
+    Run the same strategy through jesse's backtest and through vector_backtest and compare
+    their core metrics. Measured results are in research/README.md; Turtles does not match.
+    :param strategy: str - strategy name, as in routes
+    :param candles: np.ndarray - 1m candles of the trading period
+    :param timeframe: str - the route's timeframe
+    :param warmup_candles: np.ndarray - 1m candles preceding the trading period
+    :param signals: callable(candles, hyperparameters) -> dict of vector_backtest arguments - default: research.signals.SIGNALS[strategy]
+    :param kwargs: passed on to research.jesse_runner.run_backtest
+    :return: dict - 'jesse' and 'vector' metrics plus their differences
+    """
+    from .jesse_runner import run_backtest
+
+    signals = signals or SIGNALS[strategy]
+
+    config = {'starting_balance': starting_balance, 'fee': fee_rate, 'warm_up_candles': 0, **kwargs.pop('config', {})}
+    jesse_metrics = run_backtest(strategy, candles, timeframe, hyperparameters=hyperparameters, config=config,
+                                 warmup_candles=warmup_candles, **kwargs)['metrics']
+
+    history = candles if warmup_candles is None else np.concatenate([warmup_candles, candles])
+    bars = resample_candles(history, timeframe)
+    start_index = 0 if warmup_candles is None else int(np.searchsorted(bars[:, 0], candles[0, 0]))
+    vector_metrics = vector_backtest(bars, **signals(bars, hyperparameters), starting_balance=starting_balance,
+                                     fee_rate=fee_rate, start_index=start_index).metrics
+
+    keys = ('total', 'win_rate', 'net_profit_percentage', 'max_drawdown')
+    return {
+        'jesse': {key: jesse_metrics.get(key) for key in keys},
+        'vector': {key: vector_metrics[key] for key in keys},
+        'difference': {key: vector_metrics[key] - (jesse_metrics.get(key) or 0) for key in keys},
+    }
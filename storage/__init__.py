@@ -0,0 +1,2 @@
+from .candle_store import CandleStore
+from .snapshot_store import SnapshotStore
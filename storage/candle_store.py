@@ -0,0 +1,220 @@
+import csv
+import itertools
+import json
+import os
+import warnings
+from typing import Iterable, Optional
+
+import numpy as np
+
+COLUMNS = ('timestamp', 'open', 'close', 'high', 'low', 'volume')
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'candles')
+
+
+class CandleStore:
+    """
+    Local, append-only candle store with one memory-mapped file per exchange/symbol/timeframe.
+
+    Each file holds the six OHLCV columns in jesse's order, column after column, with spare
+    capacity at the end of every column. get() returns a read-only (n, 6) view straight into
+    the mapped pages: no copy is made, and every process reading the same series shares the
+    same page cache. The timestamp column is sorted, so it doubles as the index for range
+    lookups.
+
+    The row count lives in a small meta.json next to the data and is only advanced after the
+    rows are written, so readers never see partial appends. There should be a single writer
+    per series.
+
+    :param root: str - directory holding the store - default: storage/candles
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self._maps = {}
+
+    def path(self, exchange: str, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, *(part.replace(os.sep, '_') for part in (exchange, symbol, timeframe)))
+
+    def series(self) -> list:
+        """
+        :return: list of (exchange, symbol, timeframe) present in the store
+        """
+        found = []
+        for directory, _, files in os.walk(self.root):
+            if 'meta.json' in files:
+                found.append(tuple(os.path.relpath(directory, self.root).split(os.sep)))
+        return sorted(found)
+
+    def count(self, exchange: str, symbol: str, timeframe: str, start: Optional[int] = None, finish: Optional[int] = None) -> int:
+        return len(self.get(exchange, symbol, timeframe, start, finish))
+
+    def get(self, exchange: str, symbol: str, timeframe: str, start: Optional[int] = None, finish: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy (n, 6) view of the candles with start <= timestamp <= finish
+        :param start: int - timestamp in milliseconds, inclusive - default: first candle
+        :param finish: int - timestamp in milliseconds, inclusive - default: last candle
+        :return: np.ndarray
+        """
+        path = self.path(exchange, symbol, timeframe)
+        meta = _read_meta(path)
+        if meta is None:
+            return np.empty((0, 6))
+
+        data = self._map(path, meta['capacity'])
+        count = meta['count']
+        timestamps = data[0, :count]
+        first = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        last = count if finish is None else np.searchsorted(timestamps, finish, side='right')
+        return data[:, first:last].T
+
+    def append(self, exchange: str, symbol: str, timeframe: str, candles: np.ndarray) -> int:
+        """
+        Append candles sorted by timestamp. Candles not newer than the last stored one are skipped.
+        :param candles: np.ndarray - (n, 6) in jesse's column order
+        :return: int - number of candles written
+        """
+        path = self.path(exchange, symbol, timeframe)
+        meta = _read_meta(path) or {'count': 0, 'capacity': 0}
+        count, capacity = meta['count'], meta['capacity']
+
+        candles = np.asarray(candles, dtype=np.float64).reshape(-1, 6)
+        if count:
+            last_timestamp = self._map(path, capacity)[0, count - 1]
+            candles = candles[candles[:, 0] > last_timestamp]
+        if not len(candles):
+            return 0
+
+        if count + len(candles) > capacity:
+            capacity = self._grow(path, count, capacity, max(count + len(candles), 2 * capacity, 1024))
+
+        data = np.memmap(_data_file(path), dtype=np.float64, mode='r+', shape=(6, capacity))
+        data[:, count:count + len(candles)] = candles.T
+        data.flush()
+        del data
+
+        _write_meta(path, {'count': count + len(candles), 'capacity': capacity})
+        return len(candles)
+
+    def import_csv(self, file_path: str, exchange: Optional[str] = None, symbol: Optional[str] = None, timeframe: str = '1m', chunk_size: int = 1_000_000) -> dict:
+        """
+        Bulk import a CSV file. A header row is used to find the columns, so both plain
+        timestamp,open,close,high,low,volume files and `COPY candle TO ... CSV HEADER` exports of
+        jesse's Postgres table work. Rows carrying exchange/symbol/timeframe columns are routed to
+        their own series; otherwise the arguments name the series. Rows may come in any order:
+        each series is sorted before it is written, so the whole file is held in memory (48 bytes
+        per candle). Rows with a duplicate timestamp, or not newer than the candles already stored,
+        are skipped with a warning.
+        :param chunk_size: int - rows parsed into an array at a time - default: 1,000,000
+        :return: dict - (exchange, symbol, timeframe) -> number of candles written
+        """
+        with open(file_path, newline='') as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                return {}
+            if _is_number(first[0]):
+                header, rows = list(COLUMNS), itertools.chain([first], reader)
+            else:
+                header, rows = [name.strip().lower() for name in first], reader
+            return self._import_rows(rows, header, exchange, symbol, timeframe, chunk_size)
+
+    def import_pg_dump(self, file_path: str, chunk_size: int = 1_000_000) -> dict:
+        """
+        Bulk import the candle table from a plain-text pg_dump (the `COPY ... FROM stdin;` block).
+        Rows are sorted and skipped like in import_csv().
+        :return: dict - (exchange, symbol, timeframe) -> number of candles written
+        """
+        with open(file_path) as f:
+            for line in f:
+                if line.startswith('COPY ') and ' FROM stdin' in line and 'candle' in line.split('(')[0]:
+                    header = [name.strip().strip('"') for name in line[line.index('(') + 1:line.index(')')].split(',')]
+                    rows = (row.rstrip('\n').split('\t') for row in _until_end_of_copy(f))
+                    return self._import_rows(rows, header, None, None, None, chunk_size)
+        return {}
+
+    def _import_rows(self, rows: Iterable, header: list, exchange, symbol, timeframe, chunk_size: int) -> dict:
+        value_columns = [header.index(name) for name in COLUMNS]
+        key_columns = [header.index(name) if name in header else None for name in ('exchange', 'symbol', 'timeframe')]
+        defaults = (exchange, symbol, timeframe)
+
+        # rows are parsed chunk_size at a time into arrays, and each series is sorted as a whole
+        # before it is appended: a chunk appended early would make older rows later in the file
+        # look stale to append()
+        chunks = {}
+        pending = {}
+        for row in rows:
+            key = tuple(row[column] if column is not None else default for column, default in zip(key_columns, defaults))
+            if None in key:
+                raise ValueError('exchange, symbol and timeframe must be given when the file has no such columns')
+            chunk = pending.setdefault(key, [])
+            chunk.append([float(row[column]) for column in value_columns])
+            if len(chunk) >= chunk_size:
+                chunks.setdefault(key, []).append(np.array(pending.pop(key), dtype=np.float64))
+
+        for key, chunk in pending.items():
+            chunks.setdefault(key, []).append(np.array(chunk, dtype=np.float64))
+        return {key: self._append_import(key, np.concatenate(parts)) for key, parts in chunks.items()}
+
+    def _append_import(self, key: tuple, candles: np.ndarray) -> int:
+        candles = candles[np.argsort(candles[:, 0], kind='stable')]
+        first = np.ones(len(candles), dtype=bool)
+        first[1:] = candles[1:, 0] != candles[:-1, 0]
+        written = self.append(*key, candles[first])
+        if written < len(candles):
+            warnings.warn(f'{"/".join(key)}: skipped {len(candles) - written} of {len(candles)} candles '
+                          f'with a duplicate timestamp or one not newer than the stored candles')
+        return written
+
+    def _map(self, path: str, capacity: int) -> np.memmap:
+        data = self._maps.get(path)
+        if data is None or data.shape[1] != capacity:
+            data = self._maps[path] = np.memmap(_data_file(path), dtype=np.float64, mode='r', shape=(6, capacity))
+        return data
+
+    def _grow(self, path: str, count: int, capacity: int, new_capacity: int) -> int:
+        os.makedirs(path, exist_ok=True)
+        temporary = _data_file(path) + '.tmp'
+        grown = np.memmap(temporary, dtype=np.float64, mode='w+', shape=(6, new_capacity))
+        if count:
+            grown[:, :count] = np.memmap(_data_file(path), dtype=np.float64, mode='r', shape=(6, capacity))[:, :count]
+        grown.flush()
+        del grown
+        # readers holding the old mapping keep a valid (stale) view until they remap
+        os.replace(temporary, _data_file(path))
+        self._maps.pop(path, None)
+        return new_capacity
+
+
+def _data_file(path: str) -> str:
+    return os.path.join(path, 'candles.f64')
+
+
+def _read_meta(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_meta(path: str, meta: dict) -> None:
+    temporary = os.path.join(path, 'meta.json.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temporary, os.path.join(path, 'meta.json'))
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _until_end_of_copy(f):
+    for line in f:
+        if line.startswith('\\.'):
+            return
+        yield line
@@ -0,0 +1,93 @@
+import os
+import pickle
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+
+MAGIC = b'WSNP'
+VERSION = 1
+
+# magic, format version, timestamp of the last candle, payload length, payload CRC32
+_HEADER = struct.Struct('<4sHxxqQI')
+
+
+class SnapshotStore:
+    """
+    Strategy state snapshots, one file per strategy/exchange/symbol/timeframe.
+
+    A file is a fixed binary header (magic, format version, last candle timestamp, payload
+    length and CRC32) followed by the state pickled with protocol 5, so NumPy arrays are
+    stored as raw buffers. Files are written to a temporary name and renamed, a crash mid-write
+    leaves the previous snapshot intact. load() returns None for anything it cannot trust:
+    no file, another format version, a bad checksum or a timestamp missing from the candles
+    it is restored against.
+
+    :param root: str - directory holding the snapshots - default: storage/snapshots
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+
+    def path(self, strategy: str, exchange: str, symbol: str, timeframe: str) -> str:
+        parts = (strategy, exchange, symbol, timeframe)
+        return os.path.join(self.root, *(part.replace(os.sep, '_') for part in parts)) + '.snap'
+
+    def save(self, key: tuple, state, timestamp: int) -> int:
+        """
+        :param key: tuple - (strategy, exchange, symbol, timeframe)
+        :param state: picklable state
+        :param timestamp: int - timestamp of the last candle the state includes
+        :return: int - bytes written
+        """
+        payload = pickle.dumps(state, protocol=5)
+        header = _HEADER.pack(MAGIC, VERSION, int(timestamp), len(payload), zlib.crc32(payload))
+
+        path = self.path(*key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(temporary, path)
+        return len(header) + len(payload)
+
+    def load(self, key: tuple, candles: np.ndarray = None) -> Optional[tuple]:
+        """
+        :param key: tuple - (strategy, exchange, symbol, timeframe)
+        :param candles: np.ndarray - when given, the snapshot's last timestamp must be one of
+            these candles, so a snapshot is never restored onto other data or a later history
+        :return: tuple - (state, timestamp), or None
+        """
+        try:
+            with open(self.path(*key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+
+        magic, version, timestamp, length, crc = _HEADER.unpack_from(data)
+        payload = memoryview(data)[_HEADER.size:]
+        if magic != MAGIC or version != VERSION or len(payload) != length or zlib.crc32(payload) != crc:
+            return None
+        if candles is not None and not _contains(candles[:, 0], timestamp):
+            return None
+        try:
+            return pickle.loads(payload), timestamp
+        except Exception:
+            return None
+
+    def delete(self, key: tuple) -> None:
+        try:
+            os.remove(self.path(*key))
+        except FileNotFoundError:
+            pass
+
+
+def _contains(timestamps: np.ndarray, timestamp: int) -> bool:
+    index = np.searchsorted(timestamps, timestamp)
+    return index < len(timestamps) and timestamps[index] == timestamp
@@ -1,6 +1,7 @@
 from jesse.strategies import Strategy, cached
 import jesse.indicators as ta
 from jesse import utils
+from custom_indicators import indicator_cache
 
 
 class FirstStrategy(Strategy):
@@ -10,18 +11,22 @@ class FirstStrategy(Strategy):
         self.vars['readyToSell'] = False
 
     @property
+    @indicator_cache
     def sma_7(self):
         return ta.sma(self.candles[:], period=7, source_type="close", sequential=False)
 
     @property
+    @indicator_cache
     def sma_25(self):
         return ta.sma(self.candles[:], period=25, source_type="close", sequential=False)
 
     @property
+    @indicator_cache
     def sma_52(self):
         return ta.sma(self.candles[:], period=52, source_type="close", sequential=False)
 
     @property
+    @indicator_cache
     def atr(self):
         return ta.atr(self.candles, period=14)
 
@@ -18,16 +18,17 @@ email       = "connormcd98@gmail.com"
 from jesse.strategies import Strategy, cached
 import jesse.indicators as ta
 from jesse import utils
+import custom_indicators as cta
 
 
-class MACD_EMA(Strategy):
+class MACD_EMA(cta.StreamMixin, Strategy):
     @property
     def macd(self): #this returns: macd, signal and hist which can be referenced as self.macd[0], self.macd[1] and self.macd[2], respectively
-        return ta.macd(self.candles, self.hp['fastperiod'],self.hp['slowperiod'],self.hp['signalperiod'])
+        return self.stream('macd', cta.MACDStream, fast_period=self.hp['fastperiod'], slow_period=self.hp['slowperiod'], signal_period=self.hp['signalperiod']).value
 
     @property
     def ema(self): #this returns a single value which is the 100EMA at the latest candle
-        return ta.ema(self.candles, self.hp['ema'])
+        return self.stream('ema', cta.EMAStream, period=self.hp['ema']).value
 
     def should_long(self):
         # return true if close is above EMA and MACD line is above signal line
@@ -3,16 +3,19 @@ import jesse.indicators as ta
 from jesse import utils
 import custom_indicators as cta
 import numpy as np
-from datetime import datetime, timezone, timedelta
 
-class MeaniePantsVwap(Strategy):
-    def init(self):
-        super().init()
+class MeaniePantsVwap(cta.SnapshotMixin, cta.ChartMixin, Strategy):
+    # live restarts resume the session VWAP stream from storage/snapshots
+    snapshot_attributes = ('candle_index',)
+
+    def __init__(self):
+        super().__init__()
         self.vwap_band_level = 2  # Use the 3rd band for entry signals (index 2 in 0-based list)
         self.candle_index = 0
         self.last_day_timestamp = 0
         self.interval = 'Day'
         self.warm_up_candles = 30
+        self.vwap_stream = cta.VWAPBandsStream(interval=self.interval)
 
     @property
     @cached
@@ -22,17 +25,24 @@ class MeaniePantsVwap(Strategy):
     @property
     @cached
     def vwap_bands(self):
-        return cta.vwapbands(self.candles, sequential=True, interval=self.interval)
+        # Only the candles since the last call are consumed, instead of the whole history
+        return self.vwap_stream.catch_up(self.candles)
+
+    @property
+    @cached
+    def calendar(self):
+        # Cached per timestamp range (shared with vwapbands), only new candles are converted on each call
+        return cta.session_index(self.candles, self.interval)
 
     def is_within_x_candles(self):
         # Assuming 1-minute candles, check if we're within the first 30 candles of the day
         return self.candle_index < self.warm_up_candles
 
     def should_long(self) -> bool:
-        return self.price < self.vwap_bands.lower_bands[self.vwap_band_level][-1] and not self.is_within_x_candles()
+        return self.price < self.vwap_bands.lower_bands[self.vwap_band_level] and not self.is_within_x_candles()
 
     def should_short(self) -> bool:
-        return self.price > self.vwap_bands.upper_bands[self.vwap_band_level][-1] and not self.is_within_x_candles()
+        return self.price > self.vwap_bands.upper_bands[self.vwap_band_level] and not self.is_within_x_candles()
 
     def should_cancel_entry(self) -> bool:
         return False
@@ -40,7 +50,7 @@ class MeaniePantsVwap(Strategy):
     def go_long(self):
         entry_price = self.price
         stop_loss = self.price - self.atr[-1] * 2.5
-        take_profit = self.vwap_bands.vwap[-1]
+        take_profit = self.vwap_bands.vwap
 
         qty = utils.risk_to_qty(capital=self.available_margin, risk_per_capital=3, entry_price=entry_price, stop_loss_price=stop_loss, fee_rate=self.fee_rate)
 
@@ -51,7 +61,7 @@ class MeaniePantsVwap(Strategy):
     def go_short(self):
         entry_price = self.price
         stop_loss = self.price + self.atr[-1] * 2.5
-        take_profit = self.vwap_bands.vwap[-1]
+        take_profit = self.vwap_bands.vwap
 
         qty = utils.risk_to_qty(capital=self.available_margin, risk_per_capital=3, entry_price=entry_price, stop_loss_price=stop_loss, fee_rate=self.fee_rate)
 
@@ -61,86 +71,44 @@ class MeaniePantsVwap(Strategy):
 
     def update_position(self):
 
-        # Get current timestamp
-        current_timestamp = self.candles[-1, 0]
-        current_datetime_utc = self.convert_timestamp_to_utc(current_timestamp)
+        # Calendar fields of the current candle
+        hour = self.calendar.hour[-1]
 
         # Check if its last hour of the day
         liquidating_time = False
         if self.interval == 'Day':
-            liquidating_time = current_datetime_utc.hour == 23
+            liquidating_time = hour == 23
         elif self.interval == 'Week':
-            liquidating_time = current_datetime_utc.weekday() == 4 and current_datetime_utc.hour == 23 # Today is Friday final hour
+            liquidating_time = self.calendar.weekday[-1] == 4 and hour == 23 # Today is Friday final hour
         elif self.interval == 'Month':
-            liquidating_time = self.is_last_weekday_of_month(current_datetime_utc) and current_datetime_utc.hou == 23
+            liquidating_time = self.calendar.last_weekday_of_month[-1] and hour == 23
 
         if liquidating_time:
             self.liquidate()
-        if self.is_long and (self.price >= self.vwap_bands.vwap[-1] or current_datetime_utc.hour == 23):
+        if self.is_long and (self.price >= self.vwap_bands.vwap or hour == 23):
             self.liquidate()
-        elif self.is_short and (self.price <= self.vwap_bands.vwap[-1] or current_datetime_utc.hour == 23):
+        elif self.is_short and (self.price <= self.vwap_bands.vwap or hour == 23):
             self.liquidate()
 
     def should_cancel(self) -> bool:
         return False
 
-    def is_last_weekday_of_month(self, dt):
-        # Get the last day of the current month
-        last_day = calendar.monthrange(dt.year, dt.month)[1]
-        last_date = dt.replace(day=last_day)
-
-        # If the last day is a weekend, adjust to the last weekday
-        while last_date.weekday() > 4:  # 4 is Friday
-            last_date -= timedelta(days=1)
-
-        # Check if the current date is the last weekday of the month
-        return dt.date() == last_date.date()
-
-    def convert_timestamp_to_utc(self, timestamp_ms):
-        # Convert milliseconds to seconds
-        timestamp_s = timestamp_ms / 1000.0
-
-        # Create a datetime object in UTC
-        return datetime.fromtimestamp(timestamp_s, tz=timezone.utc)
-
     def after(self) -> None:
-
-        current_timestamp = self.candles[-1, 0]
-        current_datetime_utc = self.convert_timestamp_to_utc(current_timestamp)
-        previous_timestamp = self.candles[-2, 0]
-        previous_datetime_utc = self.convert_timestamp_to_utc(previous_timestamp)
-
-        # Check if it's a new day/week/month
-        if self.interval == 'Day':
-            if (current_datetime_utc.date() - previous_datetime_utc.date()) == timedelta(days=1):
-                self.candle_index = 0
-            else:
-                self.candle_index += 1
-        elif self.interval == 'Week':
-            if (current_datetime_utc.date() - previous_datetime_utc.date()) == timedelta(weeks=1):
-                self.candle_index = 0
-            else:
-                self.candle_index += 1
-        elif self.interval == 'Month':
-            if (current_datetime_utc.date() - previous_datetime_utc.date()) == timedelta(months=1):
-                self.candle_index = 0
-            else:
-                self.candle_index += 1
-
-        # Add VWAP line
-        self.add_line_to_candle_chart('VWAP', self.vwap_bands.vwap[-1], color='white')
-
-        # Define colors for bands
-        band_colors = ['rgba(255,0,0,0.1)', 'rgba(255,0,0,0.2)', 'rgba(255,0,0,0.3)', 'rgba(255,0,0,0.4)', 'rgba(255,0,0,0.5)']
-
-        # Add bands
-        for i, color in enumerate(band_colors):
-            upper = self.vwap_bands.upper_bands[i][-1]
-            lower = self.vwap_bands.lower_bands[i][-1]
-
-            # Add upper and lower band lines
-            self.add_line_to_candle_chart(f'Upper Band {i+1}', upper, color='red')
-            self.add_line_to_candle_chart(f'Lower Band {i+1}', lower, color='green')
-
-    def terminate(self):
-        pass
\ No newline at end of file
+        super().after()
+
+        # Number of candles since the current day/week/month began
+        self.candle_index = self.calendar.bar_index[-1]
+
+    def charts(self, chart):
+        # VWAP and its bands, drawn once at the end of the backtest from the sequential series
+        bands = cta.vwapbands(self.candles, sequential=True, interval=self.interval)
+        chart.line('VWAP', bands.vwap, color='white')
+        chart.bands('Upper Band', bands.upper_bands, color='red')
+        chart.bands('Lower Band', bands.lower_bands, color='green')
+
+    def chart_bar(self, chart):
+        # Live: the current bar from the session VWAP stream
+        bands = self.vwap_bands
+        chart.line('VWAP', bands.vwap, color='white')
+        chart.bands('Upper Band', bands.upper_bands, color='red')
+        chart.bands('Lower Band', bands.lower_bands, color='green')
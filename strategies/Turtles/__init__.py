@@ -1,20 +1,28 @@
 from jesse.strategies import Strategy, cached
 import jesse.indicators as ta
 from jesse import utils
+import custom_indicators as cta
+from custom_indicators import indicator_cache
 
 
-class Turtles(Strategy):
+class Turtles(cta.ChartMixin, cta.StreamMixin, Strategy):
 
     @property
     def donchian(self):
-        return ta.donchian(self.candles[:-1], period=20)
+        # Channel of the previous 20 bars, maintained incrementally instead of rescanning self.candles[:-1]
+        return self.stream('donchian', cta.DonchianStream, period=20, offset=1).value
+
+    @property
+    @indicator_cache
+    def atr(self):
+        return ta.atr(self.candles)
 
     def should_long(self) -> bool:
         return self.price > self.donchian.upperband
 
     def go_long(self):
         entry = self.price
-        stop = self.price - ta.atr(self.candles) * 2.5
+        stop = self.price - self.atr * 2.5
         qty = utils.risk_to_qty(self.available_margin, 3, entry, stop, fee_rate=self.fee_rate)
         self.buy = qty, entry
 
@@ -24,7 +32,7 @@ class Turtles(Strategy):
 
     def go_short(self):
         entry = self.price
-        stop = self.price + ta.atr(self.candles) * 2.5
+        stop = self.price + self.atr * 2.5
         qty = utils.risk_to_qty(self.available_margin, 3, entry, stop, fee_rate=self.fee_rate)
         self.sell = qty, entry
 
@@ -33,16 +41,21 @@ class Turtles(Strategy):
 
     def on_open_position(self, order) -> None:
         if self.is_long:
-            self.stop_loss = self.position.qty, self.price - ta.atr(self.candles) * 2.5
+            self.stop_loss = self.position.qty, self.price - self.atr * 2.5
         elif self.is_short:
-            self.stop_loss = self.position.qty, self.price + ta.atr(self.candles) * 2.5
+            self.stop_loss = self.position.qty, self.price + self.atr * 2.5
 
     def update_position(self) -> None:
         if self.is_long:
-            self.stop_loss = self.position.qty, max(self.average_stop_loss, self.price - ta.atr(self.candles) * 2.5)
+            self.stop_loss = self.position.qty, max(self.average_stop_loss, self.price - self.atr * 2.5)
         elif self.is_short:
-            self.stop_loss = self.position.qty, min(self.average_stop_loss, self.price - ta.atr(self.candles) * 2.5)
+            self.stop_loss = self.position.qty, min(self.average_stop_loss, self.price - self.atr * 2.5)
 
-    def after(self) -> None:
-        self.add_line_to_candle_chart("Donchian", self.donchian)
+    def charts(self, chart):
+        channel = cta.donchian(self.candles, period=20, offset=1, sequential=True)
+        chart.line("Donchian Upper", channel.upperband)
+        chart.line("Donchian Lower", channel.lowerband)
 
+    def chart_bar(self, chart):
+        chart.line("Donchian Upper", self.donchian.upperband)
+        chart.line("Donchian Lower", self.donchian.lowerband)
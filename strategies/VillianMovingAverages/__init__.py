@@ -1,8 +1,11 @@
 from jesse.strategies import Strategy, cached
 import jesse.indicators as ta
 from jesse import utils
+from jesse.exceptions import RouteNotFound
+import custom_indicators as cta
+import numpy as np
 
-class VillianMovingAverages(Strategy):
+class VillianMovingAverages(cta.SnapshotMixin, cta.ChartMixin, cta.StreamMixin, Strategy):
     last_closed_index = 0
 
     def hyperparameters(self):
@@ -16,34 +19,53 @@ class VillianMovingAverages(Strategy):
 
     @property
     def supertrend(self):
-        return ta.supertrend(self.candles, period=self.hp['supertrend_period'], factor=self.hp['supertrend_factor'], sequential=False)
+        return self.stream('supertrend', cta.SupertrendStream, period=self.hp['supertrend_period'], factor=self.hp['supertrend_factor']).value
+
+    @property
+    def daily_supertrend(self):
+        # Daily bars are resampled from our own candles, the Supertrend only advances when a day closes
+        return self.stream('supertrend_daily', self._resampled_daily, timeframe='1D', base_timeframe=self.timeframe, indicator_class=cta.SupertrendStream, period=self.hp['supertrend_period'], factor=self.hp['supertrend_factor'])
+
+    def _resampled_daily(self, **params):
+        # Days before our first candle come from a 1D route when there is one, fetched once per stream
+        return cta.ResampledStream(history=self.daily_candles, **params)
 
     @property
     def supertrend_daily(self):
-        daily_candles = self.get_candles(self.exchange, self.symbol, "1D")
-        trend = ta.supertrend(daily_candles, period=self.hp['supertrend_period'], factor=self.hp['supertrend_factor'], sequential=False).trend
-        if trend < self.price:
+        # Like get_candles(..., "1D"), include the day that is still forming
+        trend = self.daily_supertrend.current.trend
+        if trend == 0:
+            # Not enough days for a Supertrend yet: no daily signal either way
+            return 0
+        elif trend < self.price:
             return 1
         elif trend > self.price:
             return -1
         else:
             return 0
 
+    @property
+    def daily_candles(self):
+        try:
+            return self.get_candles(self.exchange, self.symbol, '1D')
+        except RouteNotFound:
+            return np.empty((0, 6))
+
     @property
     def sma_7(self):
-        return ta.sma(self.candles, period=self.hp['sma_period_7'], source_type="close", sequential=True)
+        return self.stream('sma_7', cta.SMAStream, period=self.hp['sma_period_7']).values
 
     @property
     def sma_25(self):
-        return ta.sma(self.candles, period=self.hp['sma_period_25'], source_type="close", sequential=True)
+        return self.stream('sma_25', cta.SMAStream, period=self.hp['sma_period_25']).values
 
     @property
     def sma_52(self):
-        return ta.sma(self.candles, period=self.hp['sma_period_52'], source_type="close", sequential=True)
+        return self.stream('sma_52', cta.SMAStream, period=self.hp['sma_period_52']).values
 
     @property
     def atr(self):
-        return ta.atr(self.candles, period=14)
+        return self.stream('atr', cta.ATRStream, period=14).value
 
     @property
     def volume(self):
@@ -111,34 +133,38 @@ class VillianMovingAverages(Strategy):
         elif self.is_short and self.close > self.sma_25[-1]:
             self.liquidate()
 
-    def after(self) -> None:
-        self.add_line_to_candle_chart('sma7', self.sma_7[-1], color="red")
-        self.add_line_to_candle_chart('sma25', self.sma_25[-1], color="orange")
-        self.add_line_to_candle_chart('sma52', self.sma_52[-1], color="yellow")
-
-        # Extract the SuperTrend value
-        supertrend_value = self.supertrend.trend
-        close_price = self.candles[-1, 2]  # 2 is the index for closing price
-
-        # Determine the color based on whether the SuperTrend is above or below the close price
-        if supertrend_value > close_price:
-            line_color = "red"
-            fill_color = "rgba(255, 0, 0, 0.1)"  # Semi-transparent red
-        else:
-            line_color = "green"
-            fill_color = "rgba(0, 255, 0, 0.1)"  # Semi-transparent green
-
-        # Add the SuperTrend line to the chart
-        self.add_line_to_candle_chart('SuperTrend', supertrend_value, color=line_color)
-
-        # Create fill effect
-        num_fill_lines = 10
-        step = (supertrend_value - close_price) / num_fill_lines
-
-        for i in range(1, num_fill_lines):
-            fill_value = close_price + step * i
-            self.add_line_to_candle_chart(f'Fill_{i}', fill_value, color=fill_color)
-
-        self.add_extra_line_chart('Daily Supertrend', 'D ST', self.supertrend_daily)
-
-        
\ No newline at end of file
+    def charts(self, chart):
+        # Drawn once at the end of the backtest from the full series instead of ~14 calls per bar
+        candles = self.candles
+        close = candles[:, 2]
+        chart.line('sma7', ta.sma(candles, period=self.hp['sma_period_7'], sequential=True), color="red")
+        chart.line('sma25', ta.sma(candles, period=self.hp['sma_period_25'], sequential=True), color="orange")
+        chart.line('sma52', ta.sma(candles, period=self.hp['sma_period_52'], sequential=True), color="yellow")
+
+        # SuperTrend coloured by its side of the close, with a fill towards the close
+        supertrend = ta.supertrend(candles, period=self.hp['supertrend_period'], factor=self.hp['supertrend_factor'], sequential=True).trend
+        above = supertrend > close
+        chart.line('SuperTrend', supertrend, color=np.where(above, "red", "green"))
+        chart.fill('Fill', close, supertrend, 10, color=np.where(above, "rgba(255, 0, 0, 0.1)", "rgba(0, 255, 0, 0.1)"))
+
+        # Side of the last closed day's SuperTrend; the per-bar value used the forming day
+        daily = cta.resample_candles(candles, '1D')
+        daily_trend = ta.supertrend(daily, period=self.hp['supertrend_period'], factor=self.hp['supertrend_factor'], sequential=True).trend
+        day = np.searchsorted(daily[:, 0], candles[:, 0], side='right') - 1
+        closed_trend = np.concatenate([[0.0], daily_trend])[day]
+        chart.extra_line('Daily Supertrend', 'D ST', np.where(closed_trend == 0, 0, np.sign(close - closed_trend)))
+
+    def chart_bar(self, chart):
+        # Live: the current bar only, from the streams the strategy already keeps up to date
+        close = self.close
+        chart.line('sma7', self.sma_7[-1], color="red")
+        chart.line('sma25', self.sma_25[-1], color="orange")
+        chart.line('sma52', self.sma_52[-1], color="yellow")
+
+        supertrend = self.supertrend.trend
+        above = supertrend > close
+        chart.line('SuperTrend', supertrend, color="red" if above else "green")
+        chart.fill('Fill', close, supertrend, 10, color="rgba(255, 0, 0, 0.1)" if above else "rgba(0, 255, 0, 0.1)")
+
+        closed_trend = self.daily_supertrend.closed.trend
+        chart.extra_line('Daily Supertrend', 'D ST', 0 if closed_trend == 0 else np.sign(close - closed_trend))
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# the project root holds the custom_indicators, research and storage packages
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_candles(count: int, timeframe_minutes: int = 1, seed: int = 0, start: int = 1_609_459_200_000) -> np.ndarray:
+    """
+    Random-walk candles in jesse's [timestamp, open, close, high, low, volume] layout
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, count))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.3, (2, count)))
+    candles = np.empty((count, 6))
+    candles[:, 0] = start + np.arange(count) * timeframe_minutes * 60_000
+    candles[:, 1] = open_
+    candles[:, 2] = close
+    candles[:, 3] = np.maximum(open_, close) + spread[0]
+    candles[:, 4] = np.minimum(open_, close) - spread[1]
+    candles[:, 5] = rng.uniform(1, 10, count)
+    return candles
+
+
+@pytest.fixture
+def candles() -> np.ndarray:
+    return make_candles(5_000)
@@ -0,0 +1,46 @@
+import jesse.indicators as ta
+import numpy as np
+import pytest
+
+from conftest import make_candles
+from research.batched import batched_atr, batched_ema, batched_sma, batched_supertrend
+
+PERIODS = [2, 7, 25, 52]
+
+
+@pytest.fixture(scope='module')
+def candles() -> np.ndarray:
+    return make_candles(2_000, timeframe_minutes=5, seed=4)
+
+
+def test_sma(candles):
+    result = batched_sma(candles[:, 2], PERIODS)
+    for column, period in enumerate(PERIODS):
+        np.testing.assert_allclose(result[:, column], ta.sma(candles, period, sequential=True), rtol=1e-10)
+
+
+def test_ema(candles):
+    result = batched_ema(candles[:, 2], PERIODS)
+    for column, period in enumerate(PERIODS):
+        np.testing.assert_allclose(result[:, column], ta.ema(candles, period, sequential=True), rtol=1e-10)
+
+
+def test_ema_of_one_source_per_column(candles):
+    sources = np.column_stack([candles[:, 2], candles[:, 1]])
+    result = batched_ema(sources, [9, 9])
+    np.testing.assert_allclose(result[:, 0], ta.ema(candles, 9, sequential=True), rtol=1e-10)
+    np.testing.assert_allclose(result[:, 1], ta.ema(candles, 9, source_type='open', sequential=True), rtol=1e-10)
+
+
+def test_atr(candles):
+    result = batched_atr(candles, PERIODS)
+    for column, period in enumerate(PERIODS):
+        np.testing.assert_allclose(result[:, column], ta.atr(candles, period, sequential=True), rtol=1e-10)
+
+
+def test_supertrend(candles):
+    periods, factors = [10, 10, 4, 25], [3, 2, 5, 3]
+    result = batched_supertrend(candles, periods, factors)
+    for column, (period, factor) in enumerate(zip(periods, factors)):
+        expected = ta.supertrend(candles, period, factor, sequential=True).trend
+        np.testing.assert_allclose(result[:, column], expected, rtol=1e-10)
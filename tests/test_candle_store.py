@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from conftest import make_candles
+from storage import CandleStore
+
+KEY = ('Binance', 'BTC-USDT', '1m')
+
+
+def write_csv(path, candles: np.ndarray) -> str:
+    with open(path, 'w') as f:
+        f.write('timestamp,open,close,high,low,volume\n')
+        for candle in candles:
+            f.write(','.join(repr(float(value)) for value in candle) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def candles() -> np.ndarray:
+    return make_candles(500)
+
+
+def test_append_and_get_range(tmp_path, candles):
+    store = CandleStore(str(tmp_path))
+    assert store.append(*KEY, candles[:300]) == 300
+    assert store.append(*KEY, candles[200:]) == 200
+    np.testing.assert_array_equal(store.get(*KEY), candles)
+    np.testing.assert_array_equal(store.get(*KEY, candles[10, 0], candles[19, 0]), candles[10:20])
+    assert store.series() == [KEY]
+
+
+def test_import_sorts_rows_across_chunks(tmp_path, candles):
+    store = CandleStore(str(tmp_path / 'store'))
+    # newest half first: appending chunk by chunk would drop the older half
+    shuffled = np.concatenate([candles[250:], candles[:250]])
+    written = store.import_csv(write_csv(tmp_path / 'candles.csv', shuffled), *KEY, chunk_size=100)
+    assert written == {KEY: 500}
+    np.testing.assert_array_equal(store.get(*KEY), candles)
+
+
+def test_import_warns_about_skipped_rows(tmp_path, candles):
+    store = CandleStore(str(tmp_path / 'store'))
+    store.append(*KEY, candles[:100])
+    rows = np.concatenate([candles, candles[300:310]])
+    with pytest.warns(UserWarning, match='skipped 110 of 510'):
+        written = store.import_csv(write_csv(tmp_path / 'candles.csv', rows), *KEY, chunk_size=64)
+    assert written == {KEY: 400}
+    np.testing.assert_array_equal(store.get(*KEY), candles)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import custom_indicators as cta
+from custom_indicators import charts
+from conftest import make_candles
+
+
+def villian_stub():
+    # imported inside the test: outside a running test jesse's models connect to Postgres on
+    # import when the working directory is a project
+    from benchmarks.context import stub_strategy
+    from strategies.VillianMovingAverages import VillianMovingAverages
+    return stub_strategy(VillianMovingAverages)
+
+
+@pytest.fixture(scope='module')
+def candles() -> np.ndarray:
+    # 15 days, so the daily Supertrend has a value; ends mid-day
+    return make_candles(1440 * 15 + 600, seed=6)
+
+
+def test_decimate_minmax_keeps_extremes():
+    values = np.sin(np.linspace(0, 20, 10_000))
+    values[1234] = 5
+    index = cta.decimate_minmax(values, 200)
+    assert len(index) <= 200 and np.all(np.diff(index) > 0)
+    assert 1234 in index and values[index].min() == values.min()
+
+
+def test_live_bars_chart_the_current_values(candles, monkeypatch):
+    from benchmarks.context import run_bars
+
+    monkeypatch.setattr(charts.jh, 'is_live', lambda: True)
+    strategy = villian_stub()
+    points = {}
+    strategy.add_line_to_candle_chart = lambda title, value, color=None: points.__setitem__(title, (value, color))
+    strategy.add_extra_line_chart = lambda chart_name, title, value, color=None: points.__setitem__(title, (value, color))
+    strategy.charts = None  # whole-history charts must not run per bar
+
+    run_bars(strategy, candles, len(candles) - 50, len(candles))
+    strategy.terminate()
+
+    # the last points are the last values of the backtest's full series
+    recorder = cta.ChartRecorder(candles[:, 0], len(candles) - 1, 1)
+    type(strategy).charts(strategy, recorder)
+    lines = {**recorder.lines, **recorder.extra_lines['Daily Supertrend']}
+    assert set(points) == set(lines)
+    for title, (_, values, colors) in lines.items():
+        value, color = points[title]
+        assert value == pytest.approx(values[-1], rel=1e-9)
+        assert color == (colors[-1] if isinstance(colors, np.ndarray) else colors)
+
+
+def test_backtest_publishes_at_terminate(candles):
+    from benchmarks.context import run_bars
+
+    strategy = villian_stub()
+    run_bars(strategy, candles, len(candles) - 50, len(candles))
+    strategy.terminate()
+    lines = strategy._add_line_to_candle_chart_values
+    assert {'sma7', 'SuperTrend', 'Fill_9'} <= set(lines)
+    # only the bars of the trading period, from the first before() on
+    assert len(lines['sma7']['data']) == 50
+    assert strategy._add_extra_line_chart_values['Daily Supertrend']['D ST']['data'][-1]['value'] in (-1, 1)
@@ -0,0 +1,39 @@
+import jesse.indicators as ta
+import numpy as np
+import pytest
+
+import custom_indicators as cta
+from conftest import make_candles
+
+
+@pytest.fixture(scope='module')
+def candles() -> np.ndarray:
+    return make_candles(1_000, seed=3)
+
+
+@pytest.mark.parametrize('period', [1, 5, 20, 55])
+def test_offset_matches_sliced_candles(candles, period):
+    # Turtles' ta.donchian(self.candles[:-1], period) form
+    for end in range(period + 1, len(candles), 37):
+        expected = ta.donchian(candles[:end - 1], period)
+        assert tuple(cta.donchian(candles[:end], period, offset=1)) == pytest.approx(tuple(expected))
+
+
+@pytest.mark.parametrize('period', [1, 5, 20, 55])
+def test_sequential_matches_jesse(candles, period):
+    expected = ta.donchian(candles, period, sequential=True)
+    result = cta.donchian(candles, period, sequential=True)
+    for ours, theirs in zip(result, expected):
+        np.testing.assert_allclose(ours, theirs, equal_nan=True)
+
+
+def test_sequential_offset_is_the_previous_window(candles):
+    result = cta.donchian(candles, 20, offset=1, sequential=True)
+    expected = ta.donchian(candles, 20, sequential=True)
+    for ours, theirs in zip(result, expected):
+        assert np.isnan(ours[0])
+        np.testing.assert_allclose(ours[1:], theirs[:-1], equal_nan=True)
+
+
+def test_not_enough_candles(candles):
+    assert np.isnan(cta.donchian(candles[:20], 20, offset=1).upperband)
@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_candles
+from research.halving import rung_lengths, successive_halving
+
+CANDIDATES = [{'period': period} for period in range(1, 28)]
+
+calls = []
+
+
+def objective(hp: dict, candles: np.ndarray) -> dict:
+    """
+    Cheap stand-in for a backtest: best at period 20, a little better on longer ranges
+    """
+    calls.append((hp['period'], len(candles)))
+    return {'sharpe_ratio': len(candles) / 1e4 - abs(hp['period'] - 20)}
+
+
+def interrupted(after: int):
+    def evaluate(hp: dict, candles: np.ndarray) -> dict:
+        if len(calls) == after:
+            raise KeyboardInterrupt
+        return objective(hp, candles)
+    return evaluate
+
+
+def search(candles: np.ndarray, cache_dir: str, evaluate=objective, candidates=CANDIDATES) -> list:
+    return successive_halving('Stub', candles, '1m', candidates=candidates, eta=3, min_candles=200,
+                              workers=0, cache_dir=cache_dir, evaluate=evaluate)
+
+
+@pytest.fixture
+def candles() -> np.ndarray:
+    return make_candles(2_700, seed=9)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def test_survivors_get_longer_ranges(candles):
+    results = search(candles, None)
+    assert rung_lengths(len(candles), len(CANDIDATES), 3, None, 200) == [300, 900, 2700]
+    # 27 candidates, then 9, then 3
+    assert len(calls) == 27 + 9 + 3
+    assert results[0]['hp'] == {'period': 20} and results[0]['rung'] == 2
+    assert sorted(length for _, length in calls[27:36]) == [900] * 9
+
+
+def test_resume_skips_completed_rungs(candles, tmp_path):
+    cache_dir = str(tmp_path / 'search')
+    with pytest.raises(KeyboardInterrupt):
+        search(candles, cache_dir, evaluate=interrupted(after=30))
+    finished = list(calls)
+    assert len(finished) == 30
+
+    # a line cut short by the interruption is dropped, not parsed
+    with open(os.path.join(cache_dir, 'results.jsonl'), 'a') as f:
+        f.write('{"hp": {"per')
+
+    calls.clear()
+    results = search(candles, cache_dir)
+    assert set(calls).isdisjoint(finished)
+    assert len(calls) == 27 + 9 + 3 - 30
+    assert results == search(candles, None)
+
+    # everything is journaled now: nothing runs again
+    calls.clear()
+    assert search(candles, cache_dir) == results
+    assert calls == []
+
+
+def test_changed_search_space_refuses_the_journal(candles, tmp_path):
+    cache_dir = str(tmp_path / 'search')
+    search(candles, cache_dir)
+    with pytest.raises(ValueError, match='different search'):
+        search(candles, cache_dir, candidates=CANDIDATES[:-1])
+    with open(os.path.join(cache_dir, 'search.json')) as f:
+        assert json.load(f)['candidates'] == CANDIDATES
+
+
+@pytest.mark.parametrize('change', ['prices', 'timestamps', 'length'])
+def test_changed_data_refuses_the_journal(candles, tmp_path, change):
+    cache_dir = str(tmp_path / 'search')
+    search(candles, cache_dir)
+    other = candles.copy()
+    if change == 'prices':
+        other[1_000, 2] += 1
+    elif change == 'timestamps':
+        other[:, 0] += 60_000
+    else:
+        other = other[:-1]
+    with pytest.raises(ValueError, match='different search'):
+        search(other, cache_dir)
@@ -0,0 +1,33 @@
+import jesse.helpers as jh
+
+import custom_indicators as cta
+from conftest import make_candles
+
+EXCHANGE = 'Binance Perpetual Futures'
+
+
+def strategy_class():
+    # imported inside the test: outside a running test jesse's models connect to Postgres on
+    # import when the working directory is a project
+    from strategies.MeaniePantsVwap import MeaniePantsVwap
+    return MeaniePantsVwap
+
+
+def test_state_is_set_up_on_construction():
+    strategy = strategy_class()()
+    assert isinstance(strategy.vwap_stream, cta.VWAPBandsStream)
+    assert strategy.interval == 'Day' and strategy.candle_index == 0
+
+
+def test_runs_in_a_jesse_backtest():
+    from jesse.research import backtest
+
+    candles = make_candles(1440 * 3, seed=5)
+    result = backtest(
+        {'starting_balance': 10_000, 'fee': 0.001, 'type': 'futures', 'futures_leverage': 1,
+         'futures_leverage_mode': 'cross', 'exchange': EXCHANGE, 'warm_up_candles': 0},
+        [{'exchange': EXCHANGE, 'strategy': strategy_class(), 'symbol': 'BTC-USDT', 'timeframe': '1m'}],
+        [],
+        {jh.key(EXCHANGE, 'BTC-USDT'): {'exchange': EXCHANGE, 'symbol': 'BTC-USDT', 'candles': candles}},
+    )
+    assert result['metrics']['total'] > 0
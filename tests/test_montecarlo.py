@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from research.montecarlo import monte_carlo
+
+# two losses and a win on 10_000. The three orders, each a third of the shuffles:
+#   loss, loss, win: 7_000, 4_000, 10_000   drawdown -60%, ruined at 0.5
+#   loss, win, loss: 7_000, 13_000, 10_000  drawdown -30%
+#   win, loss, loss: 16_000, 13_000, 10_000 drawdown -37.5%
+PNL = np.array([-3_000.0, -3_000.0, 6_000.0])
+
+
+@pytest.mark.parametrize('memory_limit', [256 * 2 ** 20, 1])
+def test_shuffle_matches_the_hand_computed_case(memory_limit):
+    result = monte_carlo(PNL, method='shuffle', paths=3_000, memory_limit=memory_limit, seed=7)
+
+    # the 5% best, median and 5% worst paths
+    assert result.max_drawdown[[0, 2, 4]] == pytest.approx([-30, -37.5, -60])
+    assert result.risk_of_ruin == pytest.approx(1 / 3, abs=0.03)
+    # a shuffle only reorders, every path ends where the backtest did
+    np.testing.assert_allclose(result.final_balance, 10_000)
+    np.testing.assert_array_equal(result.trade_index, [0, 1, 2, 3])
+    np.testing.assert_allclose(result.equity[:, 0], 10_000)
+
+
+def test_ruin_level_is_inclusive():
+    # the lowest equity of any path is 4_000
+    assert monte_carlo(PNL, method='shuffle', paths=500, ruin_level=0.4).risk_of_ruin > 0
+    assert monte_carlo(PNL, method='shuffle', paths=500, ruin_level=0.39).risk_of_ruin == 0
+
+
+def test_same_seed_same_result():
+    first = monte_carlo(PNL, paths=1_000, seed=3)
+    second = monte_carlo(PNL, paths=1_000, seed=3)
+    np.testing.assert_array_equal(first.max_drawdown, second.max_drawdown)
+    assert first.risk_of_ruin == second.risk_of_ruin
+
+
+def test_bootstrap_draws_with_replacement():
+    # three losses in a row, the worst path, is 1 in 27 of the draws
+    result = monte_carlo(PNL, method='bootstrap', paths=5_000, percentiles=(1, 99), seed=1)
+    assert result.final_balance[0] == pytest.approx(1_000)
+    assert result.max_drawdown[1] == pytest.approx(-90)
+    # three wins never draw down
+    assert result.final_balance[1] == pytest.approx(28_000)
+    assert result.max_drawdown[0] == 0
+
+
+def test_slippage_and_fee_jitter_are_bounded():
+    notional = np.full(3, 10_000.0)
+    fee = np.full(3, 10.0)
+    result = monte_carlo(PNL, notional, fee, method='shuffle', paths=2_000, slippage=0.001, fee_jitter=0.5, percentiles=(0, 100))
+    # slippage costs up to 20 a trade, the fee moves by up to 5 either way
+    assert 10_000 - 3 * 25 <= result.final_balance[0] < result.final_balance[1] <= 10_000 + 3 * 5
+
+
+def test_perturbations_need_their_arrays():
+    with pytest.raises(ValueError):
+        monte_carlo(PNL, slippage=0.001)
+    with pytest.raises(ValueError):
+        monte_carlo(PNL, fee_jitter=0.1)
+    with pytest.raises(ValueError):
+        monte_carlo(PNL, method='jackknife')
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from custom_indicators.profiling import _BUCKETS, Profiler, _percentile
+
+
+def histogram(durations) -> list:
+    counts = [0] * _BUCKETS
+    for elapsed in durations:
+        counts[min(int(elapsed).bit_length(), _BUCKETS - 1)] += 1
+    return counts
+
+
+@pytest.mark.parametrize('q', [0.5, 0.9, 0.99])
+def test_percentile_is_within_the_bucket_of_the_true_value(q):
+    durations = np.random.default_rng(0).lognormal(10, 1.5, 10_000).astype(np.int64)
+    estimate = _percentile(histogram(durations), len(durations), q)
+    exact = np.quantile(durations, q)
+    assert exact / 2 < estimate < exact * 2
+
+
+def test_percentile_interpolates_within_a_bucket():
+    # 1024..2047 land in one bucket, spread evenly
+    durations = range(1024, 2048)
+    assert _percentile(histogram(durations), 1024, 0.5) == pytest.approx(1536, rel=1e-3)
+    assert _percentile(histogram([0, 0, 0]), 3, 0.5) == 0
+
+
+def test_report_caps_percentiles_at_the_maximum():
+    profiler = Profiler('Strategy')
+    for _ in range(10):
+        profiler.call('should_long', lambda: None)
+    line = profiler.report().splitlines()[2].split()
+    assert line[0] == 'should_long' and line[1] == '10'
+    p50, p99, longest = map(float, line[-3:])
+    assert p50 <= p99 <= longest
@@ -0,0 +1,84 @@
+import io
+
+import numpy as np
+import pytest
+
+from conftest import make_candles
+from research.runner import Job, job_grid, run_jobs
+from storage import CandleStore
+
+BTC = ('Binance Perpetual Futures', 'BTC-USDT')
+ETH = ('Binance Perpetual Futures', 'ETH-USDT')
+
+
+@pytest.fixture
+def store(tmp_path) -> CandleStore:
+    store = CandleStore(str(tmp_path))
+    store.append(*BTC, '1m', make_candles(1_000, seed=1))
+    store.append(*ETH, '1m', make_candles(3_000, seed=2))
+    return store
+
+
+def run(store: CandleStore, jobs: list, **kwargs) -> tuple:
+    """
+    run_jobs in this process with an evaluate that records the candles each job was given
+    """
+    seen = []
+
+    def evaluate(job, candles, warmup):
+        seen.append((job, candles, warmup))
+        if job.hp and job.hp.get('fail'):
+            raise RuntimeError('boom')
+        return {'total': len(candles), 'net_profit_percentage': float(candles[-1, 2])}
+
+    results = run_jobs(jobs, root=store.root, workers=0, warmup_candles=10, evaluate=evaluate, **kwargs)
+    return results, seen
+
+
+def test_jobs_run_longest_first(store):
+    jobs = job_grid(['A'], [BTC, ETH], ['1m', '5m'])
+    results, seen = run(store, jobs, output=None)
+
+    # a 5m route takes 50 1m candles of warm-up, so ETH 1m > ETH 5m > BTC 1m > BTC 5m
+    assert [(job.symbol, job.timeframe) for job, _, _ in seen] == [
+        ('ETH-USDT', '1m'), ('ETH-USDT', '5m'), ('BTC-USDT', '1m'), ('BTC-USDT', '5m')]
+    assert [result['candles'] for result in results] == [2_990, 2_950, 990, 950]
+    assert [result['metrics']['total'] for result in results] == [2_990, 2_950, 990, 950]
+
+
+def test_jobs_are_sliced_from_the_store(store):
+    eth = store.get(*ETH, '1m')
+    jobs = [Job('A', *ETH, '5m'), Job('A', *ETH, '1m', None, eth[2_000, 0], eth[2_099, 0]), Job('A', *ETH, '1m', None, eth[5, 0])]
+    _, seen = run(store, jobs, output=None)
+    slices = {job: (candles, warmup) for job, candles, warmup in seen}
+    (whole, whole_warmup), (ranged, ranged_warmup), (early, early_warmup) = (slices[job] for job in jobs)
+
+    # without a start the warm-up comes from the beginning of the series
+    np.testing.assert_array_equal(whole, eth[50:])
+    np.testing.assert_array_equal(whole_warmup, eth[:50])
+    # start and finish are inclusive, the warm-up ends right before start
+    np.testing.assert_array_equal(ranged, eth[2_000:2_100])
+    np.testing.assert_array_equal(ranged_warmup, eth[1_990:2_000])
+    # a start too early for a full warm-up gets what there is
+    np.testing.assert_array_equal(early, eth[5:])
+    np.testing.assert_array_equal(early_warmup, eth[:5])
+    # views of the mapped file, not copies
+    assert not whole.flags.owndata and not whole.flags.writeable
+
+
+def test_errors_are_reported_per_job(store):
+    jobs = [Job('A', *BTC, '1m', {'fail': True}), Job('A', 'Binance', 'XRP-USDT', '1m'), Job('A', *ETH, '1m')]
+    output = io.StringIO()
+    results, seen = run(store, jobs, output=output)
+
+    by_symbol = {result['symbol']: result for result in results}
+    assert by_symbol['BTC-USDT']['error'] == 'RuntimeError: boom'
+    assert by_symbol['XRP-USDT']['error'] == 'ValueError: no candles for Binance XRP-USDT in the store'
+    assert by_symbol['ETH-USDT']['metrics']['total'] == 2_990
+    # the missing series never reaches evaluate
+    assert len(seen) == 2
+
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 4 and lines[0].startswith('strategy')
+    assert lines[1].startswith('A') and 'ETH-USDT' in lines[1] and '2,990' in lines[1]
+    assert lines[2].endswith('fail=True')
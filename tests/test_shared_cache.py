@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from custom_indicators import shared_cache
+from custom_indicators.cache import clear_caches, indicator_cache
+from custom_indicators.shared_cache import RedisBackend, dumps, get_shared_cache, loads, set_shared_cache
+
+
+class FakeRedis:
+    """
+    In-process stand-in for redis.Redis with the two calls RedisBackend makes. While down is
+    set, every call fails like a refused connection.
+    """
+
+    def __init__(self, down: bool = False):
+        self.data = {}
+        self.calls = 0
+        self.down = down
+
+    def get(self, name):
+        self._call()
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self._call()
+        self.data[name] = value
+
+    def _call(self):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('connection refused')
+
+
+class Strategy:
+    exchange = 'Binance Perpetual Futures'
+    symbol = 'BTC-USDT'
+    timeframe = '5m'
+    computed = 0
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.hp = {'period': 3}
+
+    @property
+    @indicator_cache
+    def doubled_close(self):
+        Strategy.computed += 1
+        return self.candles[:, 2] * 2
+
+
+@pytest.fixture
+def backend():
+    """
+    Installs a shared backend for one test and restores the previous one after it
+    """
+    previous = get_shared_cache()
+    Strategy.computed = 0
+    clear_caches()
+
+    def install(client, **kwargs):
+        installed = RedisBackend(client=client, **kwargs)
+        set_shared_cache(installed)
+        return installed
+
+    yield install
+    set_shared_cache(previous)
+    clear_caches()
+
+
+def test_dumps_loads_round_trip():
+    value = {'trend': np.arange(10.0), 'changed': np.zeros(3, dtype=bool), 'period': 3}
+    restored = loads(dumps(value))
+    assert restored['period'] == 3
+    np.testing.assert_array_equal(restored['trend'], value['trend'])
+    np.testing.assert_array_equal(restored['changed'], value['changed'])
+
+
+def test_miss_then_hit_across_workers(backend, candles):
+    redis = backend(FakeRedis())
+    first = Strategy(candles).doubled_close
+    assert Strategy.computed == 1
+    assert redis.stats == {'hits': 0, 'misses': 1, 'writes': 1, 'errors': 0}
+
+    # another worker: empty local cache, same candles
+    clear_caches()
+    second = Strategy(candles.copy()).doubled_close
+    assert Strategy.computed == 1
+    assert redis.stats['hits'] == 1
+    np.testing.assert_array_equal(first, second)
+
+
+def test_different_prices_do_not_share(backend, candles):
+    redis = backend(FakeRedis())
+    Strategy(candles).doubled_close
+
+    clear_caches()
+    perturbed = candles.copy()
+    perturbed[:, 1:5] *= 1.01
+    value = Strategy(perturbed).doubled_close
+    assert Strategy.computed == 2
+    assert redis.stats['hits'] == 0
+    np.testing.assert_array_equal(value, perturbed[:, 2] * 2)
+
+
+def test_falls_back_to_local_cache_when_redis_fails(backend, candles):
+    redis = backend(FakeRedis(down=True))
+    strategy = Strategy(candles)
+    np.testing.assert_array_equal(strategy.doubled_close, candles[:, 2] * 2)
+    assert Strategy.computed == 1
+    assert redis.stats['errors'] == 1
+    assert not redis.available
+
+    # the local tier still works while Redis is down
+    strategy.doubled_close
+    assert Strategy.computed == 1
+
+
+def test_retry_after_disables_redis_for_a_while(backend, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shared_cache.time, 'monotonic', lambda: now[0])
+    client = FakeRedis(down=True)
+    redis = backend(client, retry_after=30)
+
+    assert redis.get('key') == (False, None)
+    assert client.calls == 1
+
+    now[0] += 29
+    assert redis.get('key') == (False, None)
+    redis.set('key', 1)
+    assert client.calls == 1
+
+    now[0] += 1
+    client.down = False
+    redis.set('key', 1)
+    assert redis.get('key') == (True, 1)
+    assert client.calls == 3
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+import custom_indicators as cta
+from conftest import make_candles
+from storage import SnapshotStore
+from storage.snapshot_store import _HEADER
+
+KEY = ('MeaniePantsVwap', 'Binance', 'BTC-USDT', '1m')
+
+
+@pytest.fixture
+def store(tmp_path) -> SnapshotStore:
+    return SnapshotStore(str(tmp_path))
+
+
+@pytest.fixture(scope='module')
+def candles() -> np.ndarray:
+    return make_candles(3_000, seed=8)
+
+
+def test_round_trip(store, candles):
+    stream = cta.VWAPBandsStream([1, 2])
+    stream.seed(candles[:500])
+    state = {'stream': stream, 'values': np.arange(5.0), 'vars': {'a': 1}}
+    store.save(KEY, state, candles[499, 0])
+
+    loaded, timestamp = store.load(KEY, candles)
+    assert timestamp == candles[499, 0]
+    np.testing.assert_array_equal(loaded['values'], state['values'])
+    assert loaded['vars'] == {'a': 1}
+    assert tuple(loaded['stream'].value) == pytest.approx(tuple(stream.value))
+    # the restored stream carries on like the original
+    assert loaded['stream'].catch_up(candles[:600]).vwap == stream.catch_up(candles[:600]).vwap
+
+
+def test_rejects_a_timestamp_missing_from_the_candles(store, candles):
+    store.save(KEY, {}, candles[499, 0] + 1)
+    assert store.load(KEY) is not None
+    assert store.load(KEY, candles) is None
+    # nor a snapshot taken after the last candle it is restored against
+    store.save(KEY, {}, candles[499, 0])
+    assert store.load(KEY, candles[:400]) is None
+
+
+@pytest.mark.parametrize('damage', ['payload', 'header', 'truncated', 'empty'])
+def test_rejects_corrupt_files(store, damage):
+    store.save(KEY, {'values': np.arange(100.0)}, 1_000)
+    path = store.path(*KEY)
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    if damage == 'payload':
+        data[-5] ^= 0xFF
+    elif damage == 'header':
+        data[4] += 1  # format version
+    elif damage == 'truncated':
+        data = data[:-10]
+    else:
+        data = data[:_HEADER.size - 1]
+    with open(path, 'wb') as f:
+        f.write(data)
+    assert store.load(KEY) is None
+
+
+def test_missing_and_deleted(store):
+    assert store.load(KEY) is None
+    store.save(KEY, {}, 1)
+    store.delete(KEY)
+    assert store.load(KEY) is None
+
+
+def meanie_stub(store, **hyperparameters):
+    # imported inside the test: outside a running test jesse's models connect to Postgres on
+    # import when the working directory is a project
+    from benchmarks.context import stub_strategy
+    from strategies.MeaniePantsVwap import MeaniePantsVwap
+    strategy = stub_strategy(MeaniePantsVwap, hyperparameters)
+    strategy.snapshots = True
+    strategy.snapshot_store = store
+    return strategy
+
+
+def test_strategy_resumes_from_its_snapshot(store, candles):
+    from benchmarks.context import run_bars
+
+    first = meanie_stub(store)
+    run_bars(first, candles, 1_000, 1_500)
+    first.terminate()
+
+    restarted = meanie_stub(store)
+    run_bars(restarted, candles, 1_700, 1_701)
+    assert restarted._snapshot_restored
+    assert restarted.candle_index == cta.session_index(candles[:1_701], 'Day').bar_index[-1]
+
+    fresh = meanie_stub(SnapshotStore(store.root + '-empty'))
+    run_bars(fresh, candles, 1_700, 1_701)
+    assert not fresh._snapshot_restored
+    assert tuple(restarted.vwap_bands) == pytest.approx(tuple(fresh.vwap_bands), rel=1e-12)
+
+
+def test_strategy_ignores_a_snapshot_of_other_candles(store, candles):
+    from benchmarks.context import run_bars
+
+    first = meanie_stub(store)
+    run_bars(first, candles, 1_000, 1_500)
+    first.terminate()
+
+    shifted = candles.copy()
+    shifted[:, 0] += 30_000
+    restarted = meanie_stub(store)
+    run_bars(restarted, shifted, 1_700, 1_701)
+    assert not restarted._snapshot_restored
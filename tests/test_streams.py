@@ -0,0 +1,134 @@
+import jesse.indicators as ta
+import numpy as np
+import pytest
+
+import custom_indicators as cta
+from conftest import make_candles
+
+
+@pytest.fixture(scope='module')
+def candles() -> np.ndarray:
+    return make_candles(3_000, timeframe_minutes=5, seed=2)
+
+
+def stream_series(stream, candles: np.ndarray, read) -> np.ndarray:
+    """
+    read(stream) after every candle fed one at a time
+    """
+    values = []
+    for candle in candles:
+        stream.update(candle)
+        values.append(read(stream))
+    return np.array(values, dtype=np.float64)
+
+
+@pytest.mark.parametrize('period', [1, 7, 52])
+def test_sma(candles, period):
+    values = stream_series(cta.SMAStream(period), candles, lambda s: s.value)
+    np.testing.assert_allclose(values, ta.sma(candles, period, sequential=True), rtol=1e-10)
+
+
+@pytest.mark.parametrize('period', [5, 50])
+def test_ema(candles, period):
+    values = stream_series(cta.EMAStream(period), candles, lambda s: s.value)
+    np.testing.assert_allclose(values, ta.ema(candles, period, sequential=True), rtol=1e-10)
+
+
+@pytest.mark.parametrize('period', [1, 14])
+def test_atr(candles, period):
+    values = stream_series(cta.ATRStream(period), candles, lambda s: s.value)
+    np.testing.assert_allclose(values, ta.atr(candles, period, sequential=True), rtol=1e-10)
+
+
+def test_macd(candles):
+    stream = cta.MACDStream(12, 26, 9)
+    values = stream_series(stream, candles, lambda s: tuple(s.value))
+    expected = ta.macd(candles, 12, 26, 9, sequential=True)
+    for column, series in enumerate(expected):
+        np.testing.assert_allclose(values[:, column], series, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('period, factor', [(10, 3), (4, 2)])
+def test_supertrend(candles, period, factor):
+    values = stream_series(cta.SupertrendStream(period, factor), candles, lambda s: s.value.trend)
+    expected = ta.supertrend(candles, period, factor, sequential=True).trend
+    np.testing.assert_allclose(values, expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize('period, offset', [(20, 0), (20, 1), (1, 0)])
+def test_donchian_stream(candles, period, offset):
+    values = stream_series(cta.DonchianStream(period, offset), candles, lambda s: tuple(s.value))
+    expected = cta.donchian(candles, period, offset, sequential=True)
+    for column, series in enumerate(expected):
+        np.testing.assert_array_equal(values[:, column], series)
+
+
+def test_catch_up_matches_feeding_every_candle(candles):
+    stream = cta.SupertrendStream(10, 3)
+    for end in range(100, len(candles), 250):
+        stream.catch_up(candles[:end])
+        assert stream.value.trend == ta.supertrend(candles[:end], 10, 3, sequential=True).trend[-1]
+
+
+def test_resampled_supertrend_matches_daily_candles(candles):
+    stream = cta.ResampledStream('1h', '5m', cta.SupertrendStream, period=10, factor=3)
+    for end in range(300, len(candles), 97):
+        stream.catch_up(candles[:end])
+        hourly = cta.resample_candles(candles[:end], '1h')
+        # current includes the forming bar, closed only the finished ones
+        expected = ta.supertrend(hourly, 10, 3, sequential=True).trend
+        assert stream.current.trend == pytest.approx(expected[-1], rel=1e-12)
+        closed = expected[-1] if stream.bar is None else expected[-2]
+        assert stream.closed.trend == pytest.approx(closed, rel=1e-12)
+
+
+def test_resampled_history_comes_before_the_base_candles(candles):
+    hourly = cta.resample_candles(candles, '1h')
+    # base candles start at hour 100, the hours before come from history
+    stream = cta.ResampledStream('1h', '5m', cta.SupertrendStream, history=hourly, period=10, factor=3)
+    stream.catch_up(candles[1_200:])
+    expected = ta.supertrend(hourly, 10, 3, sequential=True).trend
+    assert stream.current.trend == pytest.approx(expected[-1], rel=1e-12)
+
+
+def test_streams_can_be_built_by_a_factory(candles):
+    from custom_indicators.streaming import StreamMixin
+
+    hourly = cta.resample_candles(candles, '1h')
+    built = []
+
+    class Strategy(StreamMixin):
+        def daily(self, **params):
+            built.append(params)
+            return cta.ResampledStream(history=hourly, **params)
+
+    strategy = Strategy()
+    for end in (1_300, 1_301, 1_400):
+        strategy.candles = candles[1_200:end]
+        stream = strategy.stream('daily', strategy.daily, timeframe='1h', base_timeframe='5m', indicator_class=cta.SupertrendStream, period=10)
+    # built once and seeded with its history from the start
+    assert len(built) == 1
+    expected = ta.supertrend(cta.resample_candles(candles[:1_400], '1h'), 10, 3, sequential=True).trend
+    assert stream.current.trend == pytest.approx(expected[-1], rel=1e-12)
+
+
+def test_villian_seeds_its_daily_stream_once(monkeypatch):
+    # imported inside the test: outside a running test jesse's models connect to Postgres on
+    # import when the working directory is a project
+    from benchmarks.context import run_bars, stub_strategy
+    from strategies.VillianMovingAverages import VillianMovingAverages
+
+    seeds = []
+    seed = cta.ResampledStream.seed
+    monkeypatch.setattr(cta.ResampledStream, 'seed', lambda self, candles: seeds.append(len(candles)) or seed(self, candles))
+
+    full = make_candles(1440 * 20, seed=3)
+    base = full[1440 * 15:]
+    strategy = stub_strategy(VillianMovingAverages)
+    strategy.get_candles = lambda exchange, symbol, timeframe: cta.resample_candles(full, '1D')
+    run_bars(strategy, base, len(base) - 20, len(base))
+
+    assert len(seeds) == 1
+    # the 15 days before the first candle come from the 1D history
+    expected = ta.supertrend(cta.resample_candles(full, '1D'), 10, 3, sequential=True).trend
+    assert strategy.daily_supertrend.current.trend == pytest.approx(expected[-1], rel=1e-12)
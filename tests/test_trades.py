@@ -0,0 +1,117 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import custom_indicators as cta
+
+START = 1_609_459_200_000  # 2021-01-01 00:00 UTC
+MINUTE = 60_000
+
+
+def record_trades(path, trades: np.ndarray) -> str:
+    """
+    Write (n, 3) [timestamp, price, qty] trades as a recorded CSV file with a header
+    """
+    with open(path, 'w') as f:
+        f.write('timestamp,price,qty\n')
+        for timestamp, price, qty in trades:
+            f.write(f'{int(timestamp)},{price!r},{qty!r}\n')
+    return str(path)
+
+
+def replay(aggregator: cta.TradeAggregator, path: str) -> list:
+    async def main():
+        producer = asyncio.create_task(aggregator.run(cta.replay_trades(path, chunk_size=7)))
+        updates = [update async for update in aggregator]
+        await producer
+        return updates
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def trades() -> np.ndarray:
+    # a few trades a minute over 10 minutes, nothing in minutes 4 to 6
+    rng = np.random.default_rng(0)
+    minutes = np.r_[np.repeat(np.arange(4), 5), np.repeat(np.arange(7, 10), 5)]
+    timestamps = START + minutes * MINUTE + np.tile(np.arange(5) * 10_000 + 17, len(minutes) // 5)
+    return np.column_stack([timestamps, 100 + rng.normal(0, 1, len(minutes)), rng.uniform(0.1, 2, len(minutes))])
+
+
+def test_replay_buckets_trades_into_candles(tmp_path, trades):
+    aggregator = cta.TradeAggregator('1m')
+    updates = replay(aggregator, record_trades(tmp_path / 'trades.csv', trades))
+    assert len(updates) == len(trades)
+
+    candles = aggregator.to_array()
+    np.testing.assert_array_equal(candles[:, 0], START + np.arange(10) * MINUTE)
+    for candle in candles:
+        bucket = trades[(trades[:, 0] >= candle[0]) & (trades[:, 0] < candle[0] + MINUTE)]
+        if len(bucket):
+            expected = [bucket[0, 1], bucket[-1, 1], bucket[:, 1].max(), bucket[:, 1].min(), bucket[:, 2].sum()]
+            np.testing.assert_allclose(candle[1:], expected, rtol=1e-12)
+
+    # each traded candle is handed out once, with the first trade of the next one
+    closed = [update.closed for update in updates if update.closed is not None]
+    np.testing.assert_array_equal(np.array(closed), candles[[0, 1, 2, 3, 7, 8]])
+
+
+def test_gaps_are_filled_with_flat_candles(tmp_path, trades):
+    aggregator = cta.TradeAggregator('1m')
+    replay(aggregator, record_trades(tmp_path / 'trades.csv', trades))
+    candles = aggregator.to_array()
+    last_close = candles[3, 2]
+    np.testing.assert_array_equal(candles[4:7, 1:5], np.full((3, 4), last_close))
+    np.testing.assert_array_equal(candles[4:7, 5], 0)
+
+
+def test_ring_keeps_a_fixed_number_of_candles(tmp_path, trades):
+    aggregator = cta.TradeAggregator('1m', capacity=3)
+    replay(aggregator, record_trades(tmp_path / 'trades.csv', trades))
+    candles = aggregator.to_array()
+    # three closed candles and the forming one
+    np.testing.assert_array_equal(candles[:, 0], START + np.arange(6, 10) * MINUTE)
+
+
+def test_npy_recording_replays_the_same(tmp_path, trades):
+    np.save(tmp_path / 'trades.npy', trades)
+    from_npy = cta.TradeAggregator('1m')
+    replay(from_npy, str(tmp_path / 'trades.npy'))
+    from_csv = cta.TradeAggregator('1m')
+    replay(from_csv, record_trades(tmp_path / 'trades.csv', trades))
+    np.testing.assert_array_equal(from_npy.to_array(), from_csv.to_array())
+
+
+def test_vwap_matches_vwapbands_on_the_same_candles(tmp_path):
+    # one trade per minute across a day boundary: each candle is that trade, so the candle's
+    # price is the trade price and vwapbands sees the same prices and volumes
+    rng = np.random.default_rng(1)
+    count = 1500
+    trades = np.column_stack([START + 60 * MINUTE * 22 + np.arange(count) * MINUTE + 5,
+                              100 + np.cumsum(rng.normal(0, 0.2, count)), rng.uniform(0.1, 2, count)])
+    aggregator = cta.TradeAggregator('1m', capacity=count)
+    updates = replay(aggregator, record_trades(tmp_path / 'trades.csv', trades))
+
+    candles = aggregator.to_array()
+    vwap, upper, _ = cta.vwapbands(candles, [1], source_type='close', sequential=True)
+    np.testing.assert_allclose([update.vwap for update in updates], vwap, rtol=1e-10)
+    np.testing.assert_allclose([update.dev for update in updates], upper[0] - vwap, rtol=1e-6, atol=1e-9)
+
+
+def test_put_waits_for_slow_consumers(tmp_path, trades):
+    path = record_trades(tmp_path / 'trades.csv', trades)
+
+    async def main():
+        aggregator = cta.TradeAggregator('1m', queue_size=4)
+        producer = asyncio.create_task(aggregator.run(cta.replay_trades(path)))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # nobody consumed: the producer is parked on a full queue
+        assert aggregator.queue.full() and not producer.done()
+        assert aggregator.queue.qsize() == 4
+
+        updates = [update async for update in aggregator]
+        await producer
+        return updates
+
+    assert len(asyncio.run(main())) == len(trades)
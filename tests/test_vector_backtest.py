@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from research.vector_backtest import vector_backtest
+
+
+def flat_candles(count: int, price: float = 100.0) -> np.ndarray:
+    """
+    Candles closing at price with a high/low one point either side; tests move single bars
+    """
+    candles = np.empty((count, 6))
+    candles[:, 0] = 1_609_459_200_000 + np.arange(count) * 60_000
+    candles[:, 1:3] = price
+    candles[:, 3] = price + 1
+    candles[:, 4] = price - 1
+    candles[:, 5] = 1
+    return candles
+
+
+def flags(count: int, *indices) -> np.ndarray:
+    result = np.zeros(count, dtype=bool)
+    result[list(indices)] = True
+    return result
+
+
+def test_take_profit_fills_at_its_price():
+    candles = flat_candles(10)
+    candles[5, 3] = 106
+    result = vector_backtest(candles, entry_long=flags(10, 1), stop_loss=np.full(10, 5.0), take_profit=np.full(10, 5.0))
+
+    trade, = result.trades
+    assert (trade.side, trade.entry_index, trade.exit_index, trade.exit_reason) == ('long', 1, 5, 'take_profit')
+    assert trade.exit_price == 105
+    # 100 units of 100: 5 points each, fees on both legs
+    assert trade.fee == pytest.approx(0.001 * 100 * (100 + 105))
+    assert trade.pnl == pytest.approx(500 - trade.fee)
+    assert result.equity[-1] == pytest.approx(10_000 + trade.pnl)
+
+
+def test_stop_loss_fills_first_when_both_are_touched():
+    candles = flat_candles(10)
+    candles[3, 3], candles[3, 4] = 103, 96
+    result = vector_backtest(candles, entry_short=flags(10, 1), stop_loss=np.full(10, 2.0), take_profit=np.full(10, 3.0))
+
+    trade, = result.trades
+    assert (trade.side, trade.exit_index, trade.exit_price, trade.exit_reason) == ('short', 3, 102, 'stop_loss')
+    assert trade.pnl == pytest.approx(-100 * 2 - 0.001 * 100 * (100 + 102))
+    assert result.metrics['win_rate'] == 0 and result.metrics['shorts_count'] == 1
+
+
+def test_reentry_on_the_stop_loss_bar():
+    candles = flat_candles(10)
+    candles[4, 4] = 97
+    entries = flags(10, 1, 4)
+    result = vector_backtest(candles, entry_long=entries, stop_loss=np.full(10, 2.0))
+    assert [(t.entry_index, t.exit_index, t.exit_reason) for t in result.trades] == [(1, 4, 'stop_loss'), (4, 9, 'end')]
+
+
+def test_no_reentry_on_an_exit_signal_bar():
+    candles = flat_candles(10)
+    result = vector_backtest(candles, entry_long=flags(10, 1, 4, 6), exit_long=flags(10, 4))
+    assert [(t.entry_index, t.exit_index, t.exit_reason) for t in result.trades] == [(1, 4, 'signal'), (6, 9, 'end')]
+
+
+def test_entry_on_the_last_candle_closes_at_the_end():
+    candles = flat_candles(10)
+    result = vector_backtest(candles, entry_long=flags(10, 9), stop_loss=np.full(10, 2.0))
+
+    trade, = result.trades
+    assert (trade.entry_index, trade.exit_index, trade.exit_reason) == (9, 9, 'end')
+    assert trade.pnl == pytest.approx(-trade.fee)
+    assert result.metrics['total'] == 1
+
+
+def test_trailing_stop_follows_the_close():
+    candles = flat_candles(10)
+    candles[2:6, 2] = [102, 104, 106, 106]
+    candles[2:6, 3] = candles[2:6, 2] + 1
+    candles[2:6, 4] = candles[2:6, 2] - 1
+    candles[6, 4] = 103
+    result = vector_backtest(candles, entry_long=flags(10, 1), stop_loss=np.full(10, 2.0), trailing_stop=True)
+
+    trade, = result.trades
+    # the stop was raised to 106 - 2 at the close of bar 4
+    assert (trade.exit_index, trade.exit_price, trade.exit_reason) == (6, 104, 'stop_loss')
+
+
+def test_start_index_and_drawdown():
+    candles = flat_candles(10)
+    candles[3:6, 2] = [95, 90, 110]
+    candles[3:6, 3] = [101, 96, 111]
+    candles[3:6, 4] = [94, 89, 95]
+    result = vector_backtest(candles, entry_long=flags(10, 0, 2), exit_long=flags(10, 5), start_index=1, fee_rate=0)
+
+    trade, = result.trades
+    assert (trade.entry_index, trade.exit_index, trade.pnl) == (2, 5, pytest.approx(1_000))
+    # marked to the close of every bar: the low point is 10% under the starting balance
+    assert result.metrics['max_drawdown'] == pytest.approx(-10)
+    assert result.metrics['net_profit_percentage'] == pytest.approx(10)
@@ -0,0 +1,124 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from jesse.helpers import get_candle_source
+
+import custom_indicators as cta
+from custom_indicators.sessions import session_ids_from_timestamps
+from conftest import make_candles
+
+INTERVALS = ('Day', 'Week', 'Month')
+MULTIPLIERS = [1, 2, 3]
+
+
+def reference_vwapbands(candles: np.ndarray, dev_multipliers: list, source_type: str = 'ohlc4', interval: str = 'Day') -> tuple:
+    """
+    The original per-session loop over datetime keys, sequential output
+    """
+    source = get_candle_source(candles, source_type)
+    volume = candles[:, 5]
+    dates = [datetime.fromtimestamp(ts / 1000, tz=timezone.utc) for ts in candles[:, 0]]
+    if interval == 'Day':
+        keys = [date.date() for date in dates]
+    elif interval == 'Week':
+        keys = [date.isocalendar()[:2] for date in dates]
+    else:
+        keys = [(date.year, date.month) for date in dates]
+
+    vwap = np.zeros(len(candles))
+    dev = np.zeros(len(candles))
+    keys = np.array([str(key) for key in keys])
+    for key in np.unique(keys):
+        mask = keys == key
+        pv = np.cumsum(source[mask] * volume[mask])
+        v = np.cumsum(volume[mask])
+        v2 = np.cumsum(volume[mask] * source[mask] ** 2)
+        vwap[mask] = pv / v
+        dev[mask] = np.sqrt(np.maximum(v2 / v - (pv / v) ** 2, 0))
+    return vwap, [vwap + m * dev for m in dev_multipliers], [vwap - m * dev for m in dev_multipliers]
+
+
+@pytest.fixture(scope='module')
+def candles_15m() -> np.ndarray:
+    # about 104 days, so every interval has several sessions and a partial last one
+    return make_candles(10_000, timeframe_minutes=15, seed=1)
+
+
+@pytest.mark.parametrize('interval', INTERVALS)
+def test_sequential_matches_reference(candles_15m, interval):
+    vwap, upper, lower = cta.vwapbands(candles_15m, MULTIPLIERS, sequential=True, interval=interval)
+    ref_vwap, ref_upper, ref_lower = reference_vwapbands(candles_15m, MULTIPLIERS, interval=interval)
+    np.testing.assert_allclose(vwap, ref_vwap, rtol=1e-12)
+    np.testing.assert_allclose(upper, ref_upper, rtol=1e-12)
+    np.testing.assert_allclose(lower, ref_lower, rtol=1e-12)
+
+
+@pytest.mark.parametrize('interval', INTERVALS)
+def test_last_value_matches_the_original_window(candles_15m, interval):
+    # the original non-sequential call read jesse's default 240-candle window, which holds the
+    # whole session when the session is at most 240 candles long (every 15m Day)
+    session_ids = session_ids_from_timestamps(candles_15m[:, 0], interval)
+    checked = 0
+    for end in range(1, len(candles_15m), 173):
+        if np.count_nonzero(session_ids[:end] == session_ids[end - 1]) > 240:
+            continue
+        window = candles_15m[max(end - 240, 0):end]
+        vwap, upper, lower = cta.vwapbands(candles_15m[:end], MULTIPLIERS, sequential=False, interval=interval)
+        ref_vwap, ref_upper, ref_lower = reference_vwapbands(window, MULTIPLIERS, interval=interval)
+        assert vwap == pytest.approx(ref_vwap[-1], rel=1e-12)
+        assert upper == pytest.approx([band[-1] for band in ref_upper], rel=1e-12)
+        assert lower == pytest.approx([band[-1] for band in ref_lower], rel=1e-12)
+        checked += 1
+    assert checked
+
+
+@pytest.mark.parametrize('interval', INTERVALS)
+def test_last_value_is_the_whole_session_value(candles_15m, interval):
+    # Week and Month sessions of 15m candles are longer than 240 candles: the value covers the
+    # whole session, not the original 240-candle window
+    for end in (1, 95, 96, 97, 5_000, len(candles_15m)):
+        vwap, upper, lower = cta.vwapbands(candles_15m[:end], MULTIPLIERS, sequential=False, interval=interval)
+        ref_vwap, ref_upper, ref_lower = reference_vwapbands(candles_15m[:end], MULTIPLIERS, interval=interval)
+        assert vwap == pytest.approx(ref_vwap[-1], rel=1e-12)
+        assert upper == pytest.approx([band[-1] for band in ref_upper], rel=1e-12)
+        assert lower == pytest.approx([band[-1] for band in ref_lower], rel=1e-12)
+
+
+@pytest.mark.parametrize('output', ['array', 'lazy'])
+def test_outputs_and_levels_match_list_output(candles_15m, output):
+    vwap, upper, lower = cta.vwapbands(candles_15m, MULTIPLIERS, sequential=True)
+    selected = cta.vwapbands(candles_15m, MULTIPLIERS, sequential=True, levels=[0, 2], output=output)
+    np.testing.assert_array_equal(selected.vwap, vwap)
+    for i, level in enumerate([0, 2]):
+        np.testing.assert_array_equal(selected.upper_bands[i], upper[level])
+        np.testing.assert_array_equal(selected.lower_bands[i], lower[level])
+
+    single = cta.vwapbands(candles_15m, MULTIPLIERS, sequential=False, output=output, dtype=np.float32)
+    assert single.upper_bands[1] == pytest.approx(upper[1][-1], rel=1e-6)
+
+
+@pytest.mark.parametrize('interval', INTERVALS)
+def test_stream_matches_reference_bar_by_bar(candles_15m, interval):
+    candles = candles_15m[:4_000]
+    ref_vwap, ref_upper, ref_lower = reference_vwapbands(candles, MULTIPLIERS, interval=interval)
+    stream = cta.VWAPBandsStream(MULTIPLIERS, interval=interval)
+    for i, candle in enumerate(candles):
+        vwap, upper, lower = stream.update(candle)
+        assert vwap == pytest.approx(ref_vwap[i], rel=1e-12)
+        assert upper == pytest.approx([band[i] for band in ref_upper], rel=1e-12)
+
+    # seeding from history lands on the same state
+    seeded = cta.VWAPBandsStream(MULTIPLIERS, interval=interval)
+    assert seeded.seed(candles).vwap == pytest.approx(ref_vwap[-1], rel=1e-12)
+
+
+@pytest.mark.parametrize('interval', INTERVALS)
+def test_anchored_intervals_match_vwapbands(candles_15m, interval):
+    bands = cta.anchored_vwapbands(candles_15m, anchors=(interval,), dev_multipliers=MULTIPLIERS, sequential=True)[interval]
+    vwap, upper, lower = cta.vwapbands(candles_15m, MULTIPLIERS, sequential=True, interval=interval)
+    np.testing.assert_allclose(bands.vwap, vwap, rtol=1e-9)
+    # prefix sums over the whole history leave a little noise where the true deviation is 0,
+    # on the first bar of a session
+    np.testing.assert_allclose(bands.upper_bands, upper, rtol=1e-9, atol=2e-4)
+    np.testing.assert_allclose(bands.lower_bands, lower, rtol=1e-9, atol=2e-4)